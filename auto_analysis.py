@@ -7,13 +7,17 @@ import os
 import time
 import json
 import threading
-import subprocess
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import re
 from collections import defaultdict, deque
 import requests
 
+from llm_client import get_llm_client
+from log_llm_pipeline import analyze_lines
+from log_parser import get_log_parser
+from prompt_templates import IncrementalTypeDetector
+from metrics_exporter import ComponentMetrics, start_metrics_exporter, stop_metrics_exporter
+
 class AutoAnalyzer:
     def __init__(self, log_file: str = "realtime.log"):
         self.log_file = log_file
@@ -49,6 +53,12 @@ class AutoAnalyzer:
             "warning_count": 10,  # 10개 이상 경고
             "service_errors": 5   # 서비스당 5개 이상 에러
         }
+        
+        # Prometheus 지표 (METRICS_PORT/METRICS_TEXTFILE 설정 시 노출)
+        self.metrics = ComponentMetrics("auto_analyzer")
+        
+        # 누적 로그 중 다음 분석 대상(최근 max_logs_per_analysis개)의 분석 타입 점수 - 읽을 때 새 라인만 스캔
+        self.type_detector = IncrementalTypeDetector()
     
     def check_vllm_server(self) -> bool:
         """vLLM 서버 상태 확인"""
@@ -59,22 +69,8 @@ class AutoAnalyzer:
             return False
     
     def parse_log_line(self, line: str) -> Optional[Dict]:
-        """로그 라인 파싱"""
-        pattern = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (\w+) \[(\w+)\] (.+)'
-        match = re.match(pattern, line.strip())
-        
-        if match:
-            timestamp_str, level, service, message = match.groups()
-            timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-            
-            return {
-                "timestamp": timestamp,
-                "level": level,
-                "service": service,
-                "message": message,
-                "raw": line.strip()
-            }
-        return None
+        """로그 라인 파싱 (공용 파서 사용)"""
+        return get_log_parser().parse_line(line)
     
     def read_new_logs(self) -> List[Dict]:
         """새로운 로그 읽기"""
@@ -89,10 +85,15 @@ class AutoAnalyzer:
                 lines = f.readlines()
                 self.last_position = f.tell()
             
-            for line in lines:
-                parsed = self.parse_log_line(line)
-                if parsed:
-                    new_logs.append(parsed)
+            new_logs, failures = get_log_parser().parse_lines(lines)
+            levels = defaultdict(int)
+            for parsed in new_logs:
+                levels[parsed["level"]] += 1
+            if new_logs:
+                self.type_detector.add_text("\n".join(parsed["raw"] for parsed in new_logs))
+                self.type_detector.keep_last(self.max_logs_per_analysis)
+            
+            self.metrics.record_lines(len(lines), failures, levels)
             
         except Exception as e:
             print(f"❌ 로그 읽기 오류: {e}")
@@ -101,24 +102,28 @@ class AutoAnalyzer:
     
     def should_analyze(self, logs: List[Dict]) -> bool:
         """분석 필요 여부 확인"""
+        return self.get_trigger_reason(logs) is not None
+    
+    def get_trigger_reason(self, logs: List[Dict]) -> Optional[str]:
+        """분석 트리거 사유 (분석이 필요 없으면 None)"""
         if len(logs) < self.min_logs_for_analysis:
-            return False
+            return None
         
         # 에러율 체크
         error_count = sum(1 for log in logs if log["level"] in ["ERROR", "CRITICAL"])
         error_rate = error_count / len(logs)
         if error_rate >= self.thresholds["error_rate"]:
-            return True
+            return "error_rate"
         
         # 크리티컬 로그 체크
         critical_count = sum(1 for log in logs if log["level"] == "CRITICAL")
         if critical_count >= self.thresholds["critical_count"]:
-            return True
+            return "critical_count"
         
         # 경고 로그 체크
         warning_count = sum(1 for log in logs if log["level"] == "WARN")
         if warning_count >= self.thresholds["warning_count"]:
-            return True
+            return "warning_count"
         
         # 서비스별 에러 체크
         service_errors = defaultdict(int)
@@ -128,9 +133,9 @@ class AutoAnalyzer:
         
         for service, count in service_errors.items():
             if count >= self.thresholds["service_errors"]:
-                return True
+                return "service_errors"
         
-        return False
+        return None
     
     def analyze_with_vllm(self, logs: List[Dict]) -> Dict:
         """vLLM을 사용한 분석"""
@@ -138,81 +143,38 @@ class AutoAnalyzer:
             # 로그를 텍스트로 변환
             log_text = "\n".join([log["raw"] for log in logs])
             
-            # 분석 요청
-            payload = {
-                "model": self.model_name,
-                "messages": [
-                    {
-                        "role": "system", 
-                        "content": "You are an SRE/DevOps log expert. Analyze the logs and provide: (1) key symptoms, (2) root-cause hypotheses with priority, (3) concrete shell commands to verify, (4) mitigations/preventions, (5) confidence level. Keep answers concise but actionable."
-                    },
-                    {
-                        "role": "user", 
-                        "content": f"Analyze these logs:\n\n{log_text}"
-                    }
-                ],
-                "temperature": 0.2,
-                "max_tokens": 1200
-            }
-            
-            response = requests.post(
-                f"{self.vllm_url}/chat/completions",
-                json=payload,
-                timeout=60
+            # 분석 요청 (공용 클라이언트 - 파이프라인과 같은 적응형 동시성 한도 적용)
+            result = get_llm_client().chat_result(
+                "You are an SRE/DevOps log expert. Analyze the logs and provide: (1) key symptoms, (2) root-cause hypotheses with priority, (3) concrete shell commands to verify, (4) mitigations/preventions, (5) confidence level. Keep answers concise but actionable.",
+                f"Analyze these logs:\n\n{log_text}",
+                {"temperature": 0.2, "max_tokens": 1200, "timeout": 60}
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                analysis = result["choices"][0]["message"]["content"]
-                return {"success": True, "analysis": analysis}
-            else:
-                return {"success": False, "error": f"HTTP {response.status_code}"}
+            return {
+                "success": True,
+                "analysis": result.content,
+                "usage": {"prompt_tokens": result.prompt_tokens, "completion_tokens": result.completion_tokens}
+            }
                 
         except Exception as e:
             return {"success": False, "error": str(e)}
     
     def analyze_with_pipeline(self, logs: List[Dict]) -> Dict:
-        """파이프라인을 사용한 분석"""
+        """파이프라인을 사용한 분석 (윈도우 분할/프롬프트 템플릿 적용, 프로세스 안에서 실행)"""
         try:
-            # 임시 로그 파일 생성
-            temp_log_file = f"temp_auto_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-            with open(temp_log_file, 'w', encoding='utf-8') as f:
-                for log in logs:
-                    f.write(log["raw"] + "\n")
-            
-            # 파이프라인 스크립트 수정
-            with open("log_llm_pipeline.py", 'r') as f:
-                content = f.read()
-            
-            modified_content = content.replace(
-                'main("./scenario_1_데이터베이스_오류.log", "./analysis_results.json", meta)',
-                f'main("./{temp_log_file}", "./temp_auto_analysis_results.json", meta)'
-            )
+            meta = {"service": ",".join(sorted({log["service"] for log in logs})), "severity": "error>warning>info"}
+            # 감지기가 분석 대상과 같은 최근 라인을 들고 있을 때만 누적 점수 사용
+            scores = self.type_detector.get_scores() if len(self.type_detector) == len(logs) else None
+            records = analyze_lines([log["raw"] for log in logs], meta, analysis_scores=scores)
+            analyses = [record["analysis"] for record in records if record["analysis"]]
             
-            temp_script = f"temp_auto_pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.py"
-            with open(temp_script, 'w') as f:
-                f.write(modified_content)
-            
-            # 분석 실행
-            result = subprocess.run([
-                "python3", temp_script
-            ], capture_output=True, text=True, cwd=".", timeout=120)
-            
-            # 임시 파일 정리
-            os.remove(temp_script)
-            os.remove(temp_log_file)
-            
-            if result.returncode == 0 and os.path.exists("temp_auto_analysis_results.json"):
-                with open("temp_auto_analysis_results.json", 'r', encoding='utf-8') as f:
-                    analysis_result = json.load(f)
-                os.remove("temp_auto_analysis_results.json")
-                
-                return {
-                    "success": True, 
-                    "analysis": analysis_result[0]["analysis"] if analysis_result else "분석 결과 없음"
+            return {
+                "success": True, 
+                "analysis": "\n\n".join(analyses) if analyses else "분석 결과 없음",
+                "usage": {
+                    "prompt_tokens": sum(record.get("usage", {}).get("prompt_tokens", 0) for record in records),
+                    "completion_tokens": sum(record.get("usage", {}).get("completion_tokens", 0) for record in records)
                 }
-            else:
-                return {"success": False, "error": result.stderr}
+            }
                 
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -297,6 +259,7 @@ class AutoAnalyzer:
         print(f"실패: {self.stats['failed_analyses']}회")
         print(f"분석된 로그: {self.stats['total_logs_analyzed']}개")
         print(f"vLLM 서버: {'✅ 연결됨' if self.vllm_available else '❌ 연결 안됨'}")
+        print(f"동시성 한도: {get_llm_client().get_metrics()['concurrency_limit']}")
     
     def start_auto_analysis(self):
         """자동 분석 시작"""
@@ -310,6 +273,8 @@ class AutoAnalyzer:
         self.running = True
         last_status_time = time.time()
         accumulated_logs = []
+        self.type_detector.reset()
+        metrics_exporter = start_metrics_exporter()
         
         try:
             while self.running:
@@ -323,21 +288,31 @@ class AutoAnalyzer:
                 
                 if new_logs:
                     accumulated_logs.extend(new_logs)
+                    self.metrics.pending_lines.set(len(accumulated_logs), component="auto_analyzer")
                     print(f"📝 새 로그 {len(new_logs)}개 감지 (누적: {len(accumulated_logs)}개)")
                     
                     # 분석 필요 여부 확인
-                    if self.should_analyze(accumulated_logs):
+                    reason = self.get_trigger_reason(accumulated_logs)
+                    if reason:
                         # 분석할 로그 선택 (최근 로그)
                         analysis_logs = accumulated_logs[-self.max_logs_per_analysis:]
                         
                         # 분석 실행
+                        started = time.perf_counter()
                         analysis_result = self.run_analysis(analysis_logs)
+                        usage = analysis_result.get("usage", {})
+                        self.metrics.record_analysis(
+                            reason, time.perf_counter() - started, analysis_result["success"],
+                            usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+                        )
                         
                         # 결과 저장
                         self.save_analysis_result(analysis_logs, analysis_result)
                         
                         # 누적 로그 초기화
                         accumulated_logs = []
+                        self.type_detector.reset()
+                        self.metrics.pending_lines.set(0, component="auto_analyzer")
                 
                 # 상태 출력 (5분마다)
                 if time.time() - last_status_time >= 300:
@@ -351,6 +326,8 @@ class AutoAnalyzer:
             print(f"\n🛑 자동 분석 중단")
         finally:
             self.running = False
+            if metrics_exporter:
+                stop_metrics_exporter()
             self.print_status()
             
             # 최종 통계 저장
@@ -7,12 +7,14 @@ import os
 import sys
 import json
 import time
-import subprocess
 import requests
 from datetime import datetime
 from typing import List, Dict, Tuple
 import glob
 
+import log_llm_pipeline
+import test_pipeline
+
 class BatchTester:
     def __init__(self):
         self.test_dir = "/home/ssh/work/sliding-window-llm"
@@ -37,67 +39,22 @@ class BatchTester:
         return sorted(log_files)
     
     def run_single_test(self, log_file: str, use_vllm: bool = True) -> Dict:
-        """단일 테스트 실행"""
+        """단일 테스트 실행 - 파이프라인을 프로세스 안에서 호출해 결과를 메모리로 받음"""
         print(f"  📝 {log_file} 테스트 중...")
         
         start_time = time.time()
-        script_name = "log_llm_pipeline.py" if use_vllm else "test_pipeline.py"
-        script_path = os.path.join(self.test_dir, script_name)
-        temp_script_path = os.path.join(self.test_dir, f"temp_{script_name}")
+        analyze_file = log_llm_pipeline.analyze_file if use_vllm else test_pipeline.analyze_file
+        meta = {"service": "ordersvc", "host": "node-01", "severity": "error>warning>info"}
         
         try:
-            # 스크립트 수정
-            with open(script_path, 'r') as f:
-                content = f.read()
-            
-            # 로그 파일 경로 변경
-            if "test_log.txt" in content:
-                modified_content = content.replace("./test_log.txt", f"./{log_file}")
-            else:
-                import re
-                modified_content = re.sub(r'main\("\./[^"]+",', f'main("./{log_file}",', content)
-            
-            with open(temp_script_path, 'w') as f:
-                f.write(modified_content)
-            
-            # 테스트 실행
-            result = subprocess.run([
-                "python3", temp_script_path
-            ], capture_output=True, text=True, cwd=self.test_dir, timeout=120)
-            
-            # 임시 파일 삭제
-            os.remove(temp_script_path)
+            records = analyze_file(os.path.join(self.test_dir, log_file), meta)
             
-            end_time = time.time()
-            duration = end_time - start_time
-            
-            if result.returncode == 0:
-                # 결과 파일 찾기
-                result_files = [f for f in os.listdir(self.test_dir) 
-                              if f.startswith('analysis_results') or f.startswith('test_analysis_results')]
-                latest_result = max(result_files, key=lambda x: os.path.getmtime(os.path.join(self.test_dir, x))) if result_files else None
-                
-                return {
-                    "success": True,
-                    "log_file": log_file,
-                    "duration": duration,
-                    "result_file": latest_result,
-                    "output": result.stdout.strip()
-                }
-            else:
-                return {
-                    "success": False,
-                    "log_file": log_file,
-                    "duration": duration,
-                    "error": result.stderr.strip()
-                }
-                
-        except subprocess.TimeoutExpired:
             return {
-                "success": False,
+                "success": True,
                 "log_file": log_file,
-                "duration": 120,
-                "error": "Timeout (120초)"
+                "duration": time.time() - start_time,
+                "analysis_info": self.analyze_records(records),
+                "records": records
             }
         except Exception as e:
             return {
@@ -107,25 +64,15 @@ class BatchTester:
                 "error": str(e)
             }
     
-    def analyze_result_file(self, result_file: str) -> Dict:
-        """결과 파일 분석"""
-        if not result_file:
-            return {"windows": 0, "analysis_length": 0}
-        
-        filepath = os.path.join(self.test_dir, result_file)
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                results = json.load(f)
-            
-            total_analysis_length = sum(len(result.get('analysis', '')) for result in results)
-            
-            return {
-                "windows": len(results),
-                "analysis_length": total_analysis_length,
-                "has_analysis": total_analysis_length > 0
-            }
-        except Exception as e:
-            return {"windows": 0, "analysis_length": 0, "error": str(e)}
+    def analyze_records(self, records: List[Dict]) -> Dict:
+        """분석 결과 레코드 요약"""
+        total_analysis_length = sum(len(record.get('analysis', '')) for record in records)
+        
+        return {
+            "windows": len(records),
+            "analysis_length": total_analysis_length,
+            "has_analysis": total_analysis_length > 0
+        }
     
     def run_batch_test(self, test_vllm: bool = True, test_mock: bool = True) -> None:
         """배치 테스트 실행"""
@@ -176,7 +123,7 @@ class BatchTester:
                 self.results.append(result)
                 
                 if result["success"]:
-                    analysis_info = self.analyze_result_file(result["result_file"])
+                    analysis_info = result["analysis_info"]
                     print(f"  ✅ 성공 ({result['duration']:.1f}초, {analysis_info['windows']}윈도우)")
                 else:
                     print(f"  ❌ 실패: {result['error']}")
@@ -194,7 +141,7 @@ class BatchTester:
                 self.results.append(result)
                 
                 if result["success"]:
-                    analysis_info = self.analyze_result_file(result["result_file"])
+                    analysis_info = result["analysis_info"]
                     print(f"  ✅ 성공 ({result['duration']:.1f}초, {analysis_info['windows']}윈도우)")
                 else:
                     print(f"  ❌ 실패: {result['error']}")
@@ -247,7 +194,7 @@ class BatchTester:
         if successful_results:
             print("✅ 성공한 테스트:")
             for result in successful_results:
-                analysis_info = self.analyze_result_file(result["result_file"])
+                analysis_info = result["analysis_info"]
                 print(f"  - {result['test_type']} - {result['log_file']}: {result['duration']:.1f}초, {analysis_info['windows']}윈도우")
         
         # 결과를 JSON 파일로 저장
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+적응형 동시성 제한 모듈 - 관측된 지연시간으로 vLLM 동시 요청 수를 AIMD 방식으로 조절
+"""
+
+import time
+import threading
+import statistics
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from config import (
+    MAX_CONCURRENT_REQUESTS, ADAPTIVE_CONCURRENCY, MIN_CONCURRENCY, MAX_CONCURRENCY,
+    CONCURRENCY_LATENCY_TOLERANCE, CONCURRENCY_BACKOFF_RATIO
+)
+
+class RequestOutcome:
+    """요청 결과 분류"""
+    SUCCESS = "success"
+    OVERLOAD = "overload"   # 429/503, 타임아웃 - 서버 과부하 신호
+    ERROR = "error"         # 그 외 오류 - 지연시간 샘플로 쓰지 않음
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD 동시성 제한기
+
+    지연시간 p50이 기준치(baseline) 대비 안정적이면 한도를 1씩 늘리고,
+    p50이 tolerance 배 이상 늘거나 과부하 응답이 오면 backoff 비율로 줄인다.
+    트리아지(생성 몇 토큰)와 전체 분석처럼 지연시간 규모가 다른 요청이 한 한도를 공유하므로,
+    샘플과 기준치는 요청 종류(request_class)별로 따로 두고 같은 종류끼리만 비교한다.
+    """
+
+    def __init__(self, initial_limit: int = MAX_CONCURRENT_REQUESTS, min_limit: int = MIN_CONCURRENCY,
+                 max_limit: int = MAX_CONCURRENCY, tolerance: float = CONCURRENCY_LATENCY_TOLERANCE,
+                 backoff_ratio: float = CONCURRENCY_BACKOFF_RATIO, adaptive: bool = ADAPTIVE_CONCURRENCY,
+                 sample_size: int = 10):
+        if not adaptive:
+            # 고정 동시성 - 기존 MAX_CONCURRENT_REQUESTS 동작 유지
+            min_limit = max_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, initial_limit))
+        self.tolerance = tolerance
+        self.backoff_ratio = backoff_ratio
+        self.adaptive = adaptive
+        self.sample_size = sample_size
+
+        self.in_flight = 0
+        self._condition = threading.Condition()
+        self._samples: Dict[str, deque] = {}
+        self._baselines: Dict[str, float] = {}
+        self._peak_in_flight = 0
+        self._last_p50 = None
+        self._last_decrease = 0.0
+
+        self.stats = {
+            "increases": 0,
+            "decreases": 0,
+            "overloads": 0,
+            "errors": 0,
+            "completed": 0
+        }
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """슬롯 획득 - 한도가 차 있으면 대기"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self.in_flight >= self.limit:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self.in_flight)
+            return True
+
+    def release(self, latency: float, outcome: str = RequestOutcome.SUCCESS, request_class: str = "default"):
+        """슬롯 반환 및 관측 결과 반영"""
+        with self._condition:
+            self.in_flight -= 1
+            self.stats["completed"] += 1
+            if outcome == RequestOutcome.SUCCESS:
+                self._on_success(latency, request_class)
+            elif outcome == RequestOutcome.OVERLOAD:
+                self.stats["overloads"] += 1
+                self._on_overload()
+            else:
+                self.stats["errors"] += 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, request_class: str = "default"):
+        """with 문용 슬롯 - 호출자가 yield된 dict의 outcome을 지정하지 않으면 예외 여부로 판단
+
+        request_class는 지연시간 기준치를 따로 두는 요청 종류 (llm_client.get_request_class)
+        """
+        self.acquire()
+        result = {"outcome": None}
+        started = time.perf_counter()
+        try:
+            yield result
+        except Exception:
+            if result["outcome"] is None:
+                result["outcome"] = RequestOutcome.ERROR
+            raise
+        finally:
+            self.release(time.perf_counter() - started, result["outcome"] or RequestOutcome.SUCCESS, request_class)
+
+    def _set_limit(self, new_limit: int, reason: str):
+        """한도 변경 (min/max 범위 내)"""
+        new_limit = min(self.max_limit, max(self.min_limit, new_limit))
+        if new_limit == self.limit:
+            return
+        key = "increases" if new_limit > self.limit else "decreases"
+        self.stats[key] += 1
+        print(f"🎚️ 동시성 한도 {self.limit} -> {new_limit} ({reason})")
+        self.limit = new_limit
+
+    def _decrease(self, reason: str):
+        """곱셈 감소 - 같은 시점에 실행 중이던 요청들의 연쇄 실패로 여러 번 줄지 않도록 p50 간격으로 제한"""
+        now = time.monotonic()
+        if now - self._last_decrease < (self._last_p50 or 1.0):
+            return
+        self._last_decrease = now
+        self._set_limit(int(self.limit * self.backoff_ratio), reason)
+        # 한도가 바뀌기 전 샘플은 모든 요청 종류에서 버림
+        for samples in self._samples.values():
+            samples.clear()
+        self._peak_in_flight = self.in_flight
+
+    def _on_success(self, latency: float, request_class: str = "default"):
+        """요청 종류별로 샘플이 모이면 그 종류의 p50을 같은 종류의 기준치와 비교해 한도 조절"""
+        if not self.adaptive:
+            return
+        samples = self._samples.get(request_class)
+        if samples is None:
+            samples = self._samples[request_class] = deque(maxlen=self.sample_size)
+        samples.append(latency)
+        if len(samples) < self.sample_size:
+            return
+
+        p50 = statistics.median(samples)
+        self._last_p50 = p50
+        samples.clear()
+        baseline = self._baselines.setdefault(request_class, p50)
+
+        if p50 > baseline * self.tolerance:
+            self._decrease(f"{request_class} p50 {p50:.2f}s > 기준 {baseline:.2f}s x {self.tolerance}")
+        elif self._peak_in_flight >= self.limit:
+            # 한도를 다 쓰고 있을 때만 증가 (요청이 적어 여유가 있는 상태에서는 늘려도 의미 없음)
+            self._set_limit(self.limit + 1, f"{request_class} p50 {p50:.2f}s 안정")
+
+        # 기준치는 더 빠른 값으로 바로 내리고, 느려지는 쪽으로는 천천히 따라감 (부하 패턴 변화 반영)
+        self._baselines[request_class] = p50 if p50 < baseline else baseline * 0.95 + p50 * 0.05
+        self._peak_in_flight = self.in_flight
+
+    def _on_overload(self):
+        """429/503/타임아웃 - 즉시 감소"""
+        if self.adaptive:
+            self._decrease("서버 과부하 응답")
+
+    def get_metrics(self) -> Dict:
+        """현재 한도 및 조절 통계"""
+        with self._condition:
+            return {
+                "concurrency_limit": self.limit,
+                "in_flight": self.in_flight,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "adaptive": self.adaptive,
+                "latency_p50": self._last_p50,
+                "latency_baselines": dict(self._baselines),
+                **self.stats
+            }
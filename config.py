@@ -9,6 +9,12 @@ VLLM_HOST = os.getenv("VLLM_HOST", "127.0.0.1")
 VLLM_PORT = os.getenv("VLLM_PORT", "8000")
 VLLM_BASE_URL = f"http://{VLLM_HOST}:{VLLM_PORT}/v1"
 
+# 여러 vLLM 서버로 분산할 때 base URL 목록 (쉼표 구분, 비우면 VLLM_HOST/VLLM_PORT 한 대)
+VLLM_ENDPOINTS = [url.strip() for url in os.getenv("VLLM_ENDPOINTS", "").split(",") if url.strip()] or [VLLM_BASE_URL]
+ENDPOINT_BALANCER = os.getenv("ENDPOINT_BALANCER", "least_outstanding").lower()  # least_outstanding, p2c
+ENDPOINT_HEALTH_INTERVAL = float(os.getenv("ENDPOINT_HEALTH_INTERVAL", "10"))
+ENDPOINT_MAX_FAILURES = int(os.getenv("ENDPOINT_MAX_FAILURES", "3"))
+
 # Model Configuration
 MODEL_NAME = os.getenv("MODEL_NAME", "Qwen/Qwen2.5-7B-Instruct")
 
@@ -16,6 +22,9 @@ MODEL_NAME = os.getenv("MODEL_NAME", "Qwen/Qwen2.5-7B-Instruct")
 OPENAI_BASE = VLLM_BASE_URL
 MODEL = MODEL_NAME
 
+# 모델 컨텍스트 길이 (vLLM --max-model-len 과 동일하게 설정)
+MODEL_MAX_CONTEXT = int(os.getenv("MODEL_MAX_CONTEXT", "16384"))
+
 # Window Configuration
 DEFAULT_WINDOW_TOKENS = int(os.getenv("WINDOW_TOKENS", "5000"))
 DEFAULT_OVERLAP_RATIO = float(os.getenv("OVERLAP_RATIO", "0.15"))
@@ -26,6 +35,47 @@ DEFAULT_TEMPERATURE = float(os.getenv("DEFAULT_TEMPERATURE", "0.2"))
 DEFAULT_MAX_TOKENS = int(os.getenv("DEFAULT_MAX_TOKENS", "1200"))
 DEFAULT_TIMEOUT = int(os.getenv("DEFAULT_TIMEOUT", "120"))
 
+# Token Budget Configuration
+# 요청 전 프롬프트 토큰을 계산해 max_tokens를 남은 컨텍스트로 줄이고, 응답 여유가 MIN_COMPLETION_TOKENS보다 작으면 윈도우 분할
+# 기본은 꺼짐 - 요청마다 /tokenize 왕복이 추가되므로 WINDOW_TOKENS가 컨텍스트에 가까울 때 켜기
+PREFLIGHT_TOKEN_CHECK = os.getenv("PREFLIGHT_TOKEN_CHECK", "false").lower() == "true"
+MIN_COMPLETION_TOKENS = int(os.getenv("MIN_COMPLETION_TOKENS", "256"))
+TOKEN_BUDGET_MARGIN = int(os.getenv("TOKEN_BUDGET_MARGIN", "16"))
+
+# Prompt Layout Configuration
+# classic: [META] → [LOG WINDOW] → [TASK]
+# prefix_cache: 정적인 지시/메타를 앞에, 윈도우별 내용을 뒤에 배치 (vLLM --enable-prefix-caching 과 함께 사용)
+PROMPT_LAYOUT = os.getenv("PROMPT_LAYOUT", "classic").lower()
+PREFIX_CACHE_WARMUP = os.getenv("PREFIX_CACHE_WARMUP", "true").lower() == "true"
+
+# Output Format Configuration
+# markdown: 항목별 서술형, json: 압축 JSON 스키마 (생성 토큰 감소, 결과에 structured 필드 추가)
+OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "markdown").lower()
+# json 모드에서 서버 측 스키마 강제 방식: guided_json(vLLM), response_format(OpenAI 호환), none(프롬프트 지시만)
+STRUCTURED_OUTPUT_BACKEND = os.getenv("STRUCTURED_OUTPUT_BACKEND", "guided_json").lower()
+
+# Multi-label Analysis Configuration
+# 1보다 크면 키워드 점수 상위 K개 분석 타입의 작업을 한 요청에 모아 분석 (서술형 출력만, 윈도우당 prefill 1회)
+MULTI_LABEL_TOP_K = int(os.getenv("MULTI_LABEL_TOP_K", "1"))
+# 1위 타입 점수 대비 이 비율 이상인 타입만 함께 분석
+MULTI_LABEL_MIN_SCORE_RATIO = float(os.getenv("MULTI_LABEL_MIN_SCORE_RATIO", "0.25"))
+
+# Log Compaction Configuration
+# 프롬프트에 넣기 전 타임스탬프/서비스/레벨/반복 메시지를 짧은 표기로 변환 (토큰이 줄어드는 윈도우만)
+LOG_COMPACTION = os.getenv("LOG_COMPACTION", "false").lower() == "true"
+# 이 횟수 이상 나온 메시지 형태만 템플릿으로 묶음
+LOG_COMPACTION_MIN_REPEATS = int(os.getenv("LOG_COMPACTION_MIN_REPEATS", "2"))
+
+# Triage Cascade Configuration
+# 전체 분석 전에 짧은 yes/no 분류 요청으로 조치가 필요한 윈도우만 골라 분석 (음성 윈도우는 분석 생략)
+ENABLE_TRIAGE = os.getenv("ENABLE_TRIAGE", "false").lower() == "true"
+# 분류용 모델/서버 (비우면 분석과 같은 모델/서버 사용 - 작은 모델을 따로 띄워 비용을 더 줄일 수 있음)
+TRIAGE_MODEL = os.getenv("TRIAGE_MODEL", "") or MODEL_NAME
+TRIAGE_ENDPOINTS = [url.strip() for url in os.getenv("TRIAGE_ENDPOINTS", "").split(",") if url.strip()] or VLLM_ENDPOINTS
+TRIAGE_MAX_TOKENS = int(os.getenv("TRIAGE_MAX_TOKENS", "8"))
+TRIAGE_THRESHOLD = float(os.getenv("TRIAGE_THRESHOLD", "0.5"))  # P(yes)가 이 값 이상이면 분석
+TRIAGE_USE_LOGPROBS = os.getenv("TRIAGE_USE_LOGPROBS", "true").lower() == "true"
+
 # Log Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = os.getenv("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -44,6 +94,44 @@ MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "3"))
 REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "120"))
 RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "3"))
 
+# Pipeline Timing Configuration
+# 읽기/토큰화/윈도우 분할/렌더링/HTTP/저장 단계별 시간 측정, 실행 종료 시 <출력>_timing.json 저장 (기본은 꺼짐)
+PIPELINE_TIMING = os.getenv("PIPELINE_TIMING", "false").lower() == "true"
+
+# Adaptive Concurrency Configuration
+# 지연시간/과부하 응답에 따라 MIN~MAX 범위에서 동시 요청 수 조절 (시작값: MAX_CONCURRENT_REQUESTS)
+# 기본은 꺼짐 - MAX_CONCURRENT_REQUESTS 고정 (서버 여러 대/큰 서버에서 true로 켜기)
+ADAPTIVE_CONCURRENCY = os.getenv("ADAPTIVE_CONCURRENCY", "false").lower() == "true"
+MIN_CONCURRENCY = int(os.getenv("MIN_CONCURRENCY", "1"))
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "16"))
+CONCURRENCY_LATENCY_TOLERANCE = float(os.getenv("CONCURRENCY_LATENCY_TOLERANCE", "1.5"))
+CONCURRENCY_BACKOFF_RATIO = float(os.getenv("CONCURRENCY_BACKOFF_RATIO", "0.7"))
+
+# Single-flight Configuration (같은 프롬프트의 동시 요청을 하나로 합침)
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "true").lower() == "true"
+
+# Priority Scheduler Configuration
+# 대기 윈도우는 (분석 타입 + 심각도) 우선순위 순으로 처리, 대기 1초마다 우선순위 +SCHEDULER_AGING_RATE (기아 방지)
+SCHEDULER_AGING_RATE = float(os.getenv("SCHEDULER_AGING_RATE", "1.0"))
+
+# Batch Completions Configuration
+# 0이면 윈도우마다 /chat/completions 호출, N이면 N개 윈도우를 /completions 한 요청으로 묶음
+COMPLETIONS_BATCH_SIZE = int(os.getenv("COMPLETIONS_BATCH_SIZE", "0"))
+# auto: transformers 토크나이저의 chat template 사용 (없으면 ChatML), chatml: 항상 ChatML
+CHAT_TEMPLATE = os.getenv("CHAT_TEMPLATE", "auto").lower()
+
+# Metrics Configuration (LogMonitor/AutoAnalyzer/RealTimeLogger 지표를 Prometheus 텍스트 형식으로 노출)
+# METRICS_PORT > 0이면 METRICS_HOST:METRICS_PORT/metrics HTTP 엔드포인트, METRICS_TEXTFILE이면 node_exporter textfile collector용 파일
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", "")
+METRICS_TEXTFILE_INTERVAL = float(os.getenv("METRICS_TEXTFILE_INTERVAL", "15"))
+
+# Incident Digest Configuration (윈도우 분석 결과 map-reduce 요약)
+ENABLE_INCIDENT_DIGEST = os.getenv("ENABLE_INCIDENT_DIGEST", "true").lower() == "true"
+DIGEST_GROUP_SIZE = int(os.getenv("DIGEST_GROUP_SIZE", "8"))
+DIGEST_MAX_TOKENS = int(os.getenv("DIGEST_MAX_TOKENS", "1500"))
+
 def get_vllm_url() -> str:
     """Get the vLLM server URL"""
     return VLLM_BASE_URL
@@ -74,10 +162,39 @@ def validate_config() -> bool:
         assert DEFAULT_TEMPERATURE >= 0, "TEMPERATURE must be non-negative"
         assert DEFAULT_MAX_TOKENS > 0, "MAX_TOKENS must be positive"
         assert DEFAULT_TIMEOUT > 0, "TIMEOUT must be positive"
+        assert 0 < MIN_COMPLETION_TOKENS < MODEL_MAX_CONTEXT, "MIN_COMPLETION_TOKENS must be between 1 and MODEL_MAX_CONTEXT"
+        assert TOKEN_BUDGET_MARGIN >= 0, "TOKEN_BUDGET_MARGIN must be non-negative"
+        assert PROMPT_LAYOUT in ("classic", "prefix_cache"), "PROMPT_LAYOUT must be classic or prefix_cache"
+        assert OUTPUT_FORMAT in ("markdown", "json"), "OUTPUT_FORMAT must be markdown or json"
+        assert MULTI_LABEL_TOP_K >= 1, "MULTI_LABEL_TOP_K must be at least 1"
+        assert 0 <= MULTI_LABEL_MIN_SCORE_RATIO <= 1, "MULTI_LABEL_MIN_SCORE_RATIO must be between 0 and 1"
+        assert LOG_COMPACTION_MIN_REPEATS >= 1, "LOG_COMPACTION_MIN_REPEATS must be at least 1"
+        assert STRUCTURED_OUTPUT_BACKEND in ("guided_json", "response_format", "none"), \
+            "STRUCTURED_OUTPUT_BACKEND must be guided_json, response_format or none"
+        assert TRIAGE_MAX_TOKENS > 0, "TRIAGE_MAX_TOKENS must be positive"
+        assert 0 <= TRIAGE_THRESHOLD <= 1, "TRIAGE_THRESHOLD must be between 0 and 1"
+        assert all(url.startswith(("http://", "https://")) for url in TRIAGE_ENDPOINTS), "TRIAGE_ENDPOINTS must be http(s) URLs"
+        assert MAX_CONCURRENT_REQUESTS > 0, "MAX_CONCURRENT_REQUESTS must be positive"
+        assert 0 < MIN_CONCURRENCY <= MAX_CONCURRENCY, "MIN_CONCURRENCY must be between 1 and MAX_CONCURRENCY"
+        assert CONCURRENCY_LATENCY_TOLERANCE > 1, "CONCURRENCY_LATENCY_TOLERANCE must be greater than 1"
+        assert 0 < CONCURRENCY_BACKOFF_RATIO < 1, "CONCURRENCY_BACKOFF_RATIO must be between 0 and 1"
+        assert SCHEDULER_AGING_RATE >= 0, "SCHEDULER_AGING_RATE must be non-negative"
+        assert COMPLETIONS_BATCH_SIZE >= 0, "COMPLETIONS_BATCH_SIZE must be non-negative"
+        assert 0 <= METRICS_PORT <= 65535, "METRICS_PORT must be between 0 and 65535"
+        assert METRICS_TEXTFILE_INTERVAL > 0, "METRICS_TEXTFILE_INTERVAL must be positive"
+        assert not METRICS_TEXTFILE or METRICS_TEXTFILE.endswith(".prom"), "METRICS_TEXTFILE must end with .prom"
+        assert DIGEST_GROUP_SIZE >= 2, "DIGEST_GROUP_SIZE must be at least 2"
+        # 다이제스트 프롬프트 고정 부분과 여유 토큰(약 400)을 빼고도 분석 결과를 넣을 공간이 남아야 함
+        assert MODEL_MAX_CONTEXT - DIGEST_MAX_TOKENS >= 1024, \
+            "MODEL_MAX_CONTEXT - DIGEST_MAX_TOKENS must leave at least 1024 tokens for digest input"
         
         # Validate host format
         assert VLLM_HOST, "VLLM_HOST cannot be empty"
         assert VLLM_PORT.isdigit(), "VLLM_PORT must be numeric"
+        assert all(url.startswith(("http://", "https://")) for url in VLLM_ENDPOINTS), "VLLM_ENDPOINTS must be http(s) URLs"
+        assert ENDPOINT_BALANCER in ("least_outstanding", "p2c"), "ENDPOINT_BALANCER must be least_outstanding or p2c"
+        assert ENDPOINT_HEALTH_INTERVAL > 0, "ENDPOINT_HEALTH_INTERVAL must be positive"
+        assert ENDPOINT_MAX_FAILURES > 0, "ENDPOINT_MAX_FAILURES must be positive"
         
         return True
     except AssertionError as e:
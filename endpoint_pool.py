@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+엔드포인트 풀 모듈 - 여러 vLLM 서버로 요청 분산 (least-outstanding / power-of-two-choices, 헬스 체크)
+"""
+
+import random
+import threading
+import statistics
+from collections import deque
+from typing import Dict, List, Optional
+import requests
+
+from config import (
+    VLLM_ENDPOINTS, ENDPOINT_BALANCER, ENDPOINT_HEALTH_INTERVAL, ENDPOINT_MAX_FAILURES
+)
+
+class Endpoint:
+    """vLLM 서버 한 대의 상태 및 지표"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.server_url = self.base_url[:-3] if self.base_url.endswith("/v1") else self.base_url
+        self.healthy = True
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.latencies = deque(maxlen=200)
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "ejections": 0,
+            "readmissions": 0
+        }
+
+    def get_metrics(self) -> Dict:
+        """엔드포인트별 지연시간/오류 지표"""
+        latencies = sorted(self.latencies)
+        return {
+            "url": self.base_url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            **self.stats,
+            "error_rate": self.stats["errors"] / self.stats["requests"] if self.stats["requests"] else 0.0,
+            "latency_mean": statistics.mean(latencies) if latencies else None,
+            "latency_p50": latencies[int(0.50 * (len(latencies) - 1))] if latencies else None,
+            "latency_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None
+        }
+
+class EndpointPool:
+    """여러 vLLM 엔드포인트 중 요청을 보낼 곳 선택
+
+    - least_outstanding: 처리 중 요청이 가장 적은 엔드포인트
+    - p2c: 무작위 2개 중 처리 중 요청이 적은 쪽 (엔드포인트가 많을 때 쏠림 방지)
+    연속 ENDPOINT_MAX_FAILURES회 실패하거나 헬스 체크에 실패하면 제외하고, 헬스 체크가 성공하면 복귀시킨다.
+    """
+
+    def __init__(self, urls: List[str] = None, balancer: str = ENDPOINT_BALANCER,
+                 health_interval: float = ENDPOINT_HEALTH_INTERVAL, max_failures: int = ENDPOINT_MAX_FAILURES):
+        self.endpoints = [Endpoint(url) for url in (urls or VLLM_ENDPOINTS)]
+        self.balancer = balancer
+        self.health_interval = health_interval
+        self.max_failures = max_failures
+        self._lock = threading.Lock()
+        self._health_thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def primary(self) -> Endpoint:
+        """첫 번째 엔드포인트 (단일 서버 설정과의 호환용)"""
+        return self.endpoints[0]
+
+    def acquire(self, exclude: List[Endpoint] = None) -> Endpoint:
+        """요청을 보낼 엔드포인트 선택 후 처리 중 요청 수 증가"""
+        self.start_health_checks()
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint not in (exclude or [])]
+            healthy = [endpoint for endpoint in candidates if endpoint.healthy]
+            # 모두 비정상이면 전체 중에서 선택 (요청 자체를 막지는 않음)
+            candidates = healthy or candidates or self.endpoints
+
+            if self.balancer == "p2c" and len(candidates) > 2:
+                first, second = random.sample(candidates, 2)
+                endpoint = first if first.outstanding <= second.outstanding else second
+            else:
+                endpoint = min(candidates, key=lambda candidate: candidate.outstanding)
+
+            endpoint.outstanding += 1
+            endpoint.stats["requests"] += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, latency: Optional[float], success: bool):
+        """요청 완료 반영 - 연속 실패가 한도를 넘으면 제외 (latency=None이면 지연시간 미기록)"""
+        with self._lock:
+            endpoint.outstanding -= 1
+            if success:
+                endpoint.consecutive_failures = 0
+                if latency is not None:
+                    endpoint.latencies.append(latency)
+                return
+            endpoint.stats["errors"] += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.healthy and endpoint.consecutive_failures >= self.max_failures and len(self.endpoints) > 1:
+                self._eject(endpoint, f"연속 {endpoint.consecutive_failures}회 실패")
+
+    def _eject(self, endpoint: Endpoint, reason: str):
+        """엔드포인트 제외 (lock 보유 상태에서 호출)"""
+        endpoint.healthy = False
+        endpoint.stats["ejections"] += 1
+        print(f"🚫 엔드포인트 제외: {endpoint.base_url} ({reason})")
+
+    def _readmit(self, endpoint: Endpoint):
+        """엔드포인트 복귀 (lock 보유 상태에서 호출)"""
+        endpoint.healthy = True
+        endpoint.consecutive_failures = 0
+        endpoint.stats["readmissions"] += 1
+        print(f"✅ 엔드포인트 복귀: {endpoint.base_url}")
+
+    def check_health(self, endpoint: Endpoint) -> bool:
+        """/v1/models 응답으로 상태 확인 후 제외/복귀 처리"""
+        try:
+            ok = requests.get(f"{endpoint.base_url}/models", timeout=5).status_code == 200
+        except Exception:
+            ok = False
+
+        with self._lock:
+            if ok and not endpoint.healthy:
+                self._readmit(endpoint)
+            elif not ok and endpoint.healthy and len(self.endpoints) > 1:
+                self._eject(endpoint, "헬스 체크 실패")
+        return ok
+
+    def _health_loop(self):
+        """주기적으로 모든 엔드포인트 헬스 체크"""
+        while not self._stop_event.wait(self.health_interval):
+            for endpoint in self.endpoints:
+                self.check_health(endpoint)
+
+    def start_health_checks(self):
+        """백그라운드 헬스 체크 시작 (엔드포인트가 2개 이상일 때만)"""
+        if len(self.endpoints) < 2 or self._health_thread is not None:
+            return
+        with self._lock:
+            if self._health_thread is None:
+                self._health_thread = threading.Thread(target=self._health_loop, name="endpoint-health", daemon=True)
+                self._health_thread.start()
+
+    def stop_health_checks(self):
+        """백그라운드 헬스 체크 중지"""
+        self._stop_event.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+        self._stop_event.clear()
+
+    def get_metrics(self) -> List[Dict]:
+        """엔드포인트별 지표"""
+        with self._lock:
+            return [endpoint.get_metrics() for endpoint in self.endpoints]
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+인시던트 요약 모듈 - 윈도우별 분석 결과를 계층적으로 reduce하여 하나의 인시던트 다이제스트 생성
+"""
+
+import concurrent.futures
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from prompt_templates import get_prompt_templates, PromptTemplates
+from sliding_window import TokenCounter
+from llm_client import get_llm_client, LLMClient
+from config import MODEL_MAX_CONTEXT, DIGEST_GROUP_SIZE, DIGEST_MAX_TOKENS
+
+@dataclass
+class DigestConfig:
+    """다이제스트 설정"""
+    group_size: int = DIGEST_GROUP_SIZE          # 한 번에 reduce할 입력 수 (K)
+    context_tokens: int = MODEL_MAX_CONTEXT      # 모델 컨텍스트 길이
+    max_tokens: int = DIGEST_MAX_TOKENS          # reduce 응답 최대 토큰
+    max_workers: int = None                      # 같은 레벨 내 병렬 reduce 수 (None=클라이언트 동시성 한도)
+    safety_margin: int = 256                     # 토크나이저 오차 대비 여유 토큰
+
+@dataclass
+class DigestItem:
+    """reduce 입력/출력 단위"""
+    label: str
+    text: str
+    tokens: int
+    start_window: int
+    end_window: int
+
+class IncidentDigestReducer:
+    """윈도우 분석 결과를 K개씩 묶어 컨텍스트 예산 안에서 트리 형태로 reduce"""
+
+    def __init__(self, config: DigestConfig = None, service: str = "[unknown]",
+                 client: LLMClient = None, templates: PromptTemplates = None):
+        self.config = config or DigestConfig()
+        self.service = service
+        self.client = client or get_llm_client()
+        self.templates = templates or get_prompt_templates()
+        self.token_counter = TokenCounter()
+        self.llm_calls = 0
+        # 프롬프트 고정 부분은 바뀌지 않으므로 예산은 한 번만 계산
+        self.input_budget = self._compute_input_budget()
+        if self.input_budget <= 0:
+            raise ValueError(
+                f"다이제스트 입력 예산이 없습니다 ({self.input_budget}토큰): "
+                f"context_tokens({self.config.context_tokens})를 늘리거나 max_tokens({self.config.max_tokens})를 줄이세요"
+            )
+
+    def _compute_input_budget(self) -> int:
+        """컨텍스트 - 응답 최대 토큰 - 프롬프트 고정 토큰 - 여유 토큰"""
+        overhead = self.token_counter.count_tokens(
+            self.templates.get_digest_system_prompt()
+            + self.templates.get_digest_user_prompt(self.service, 0, 0, "")
+        )
+        return self.config.context_tokens - self.config.max_tokens - overhead - self.config.safety_margin
+
+    def get_input_budget(self) -> int:
+        """한 번의 reduce 요청에 넣을 수 있는 분석 결과 토큰 수"""
+        return self.input_budget
+
+    def _truncate(self, text: str, limit: int) -> str:
+        """토큰 한도에 맞게 텍스트 자르기 (한도가 0 이하면 빈 문자열)"""
+        if limit <= 0:
+            return ""
+        tokens = self.token_counter.count_tokens(text)
+        while tokens > limit and text:
+            text = text[:max(1, int(len(text) * limit / tokens) - 1)]
+            tokens = self.token_counter.count_tokens(text)
+        return text
+
+    def _make_item(self, label: str, text: str, start_window: int, end_window: int) -> DigestItem:
+        """입력 항목 생성 - 한 항목은 예산의 절반을 넘지 않도록 잘라 매 레벨 최소 2개씩 묶이게 함"""
+        block = f"### {label}\n{text.strip()}"
+        block = self._truncate(block, self.get_input_budget() // 2)
+        return DigestItem(
+            label=label,
+            text=block,
+            tokens=self.token_counter.count_tokens(block),
+            start_window=start_window,
+            end_window=end_window
+        )
+
+    def items_from_records(self, records: Iterable[Dict]) -> List[DigestItem]:
+        """파이프라인 결과 레코드를 reduce 입력으로 변환"""
+        items = []
+        for record in records:
+            analysis = record.get("analysis")
+            if not analysis:
+                continue
+            window_index = record.get("meta", {}).get("window_index", len(items))
+            label = f"윈도우 {window_index + 1} ({record.get('analysis_type', 'general')})"
+            items.append(self._make_item(label, analysis, window_index, window_index))
+        items.sort(key=lambda item: item.start_window)
+        return items
+
+    def group_items(self, items: List[DigestItem]) -> List[List[DigestItem]]:
+        """K개 이하 + 토큰 예산 이하로 인접 항목 묶기"""
+        budget = self.get_input_budget()
+        groups = []
+        current = []
+        current_tokens = 0
+        for item in items:
+            if current and (len(current) >= self.config.group_size or current_tokens + item.tokens > budget):
+                groups.append(current)
+                current = []
+                current_tokens = 0
+            current.append(item)
+            current_tokens += item.tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def _reduce_group(self, group: List[DigestItem], level: int) -> DigestItem:
+        """묶음 하나를 LLM으로 요약"""
+        start_window = group[0].start_window
+        end_window = group[-1].end_window
+        label = f"윈도우 {start_window + 1}-{end_window + 1} 요약"
+        if len(group) == 1:
+            return group[0]
+
+        user_prompt = self.templates.get_digest_user_prompt(
+            self.service, level, len(group), "\n\n".join(item.text for item in group)
+        )
+        config = {**self.templates.get_digest_config(), "max_tokens": self.config.max_tokens}
+        content = self.client.chat(self.templates.get_digest_system_prompt(), user_prompt, config)
+        self.llm_calls += 1
+        return self._make_item(label, content, start_window, end_window)
+
+    def reduce(self, records: Iterable[Dict]) -> Optional[Dict]:
+        """전체 reduce 실행 - 하나의 다이제스트가 남을 때까지 레벨별 병렬 처리"""
+        items = self.items_from_records(records)
+        if not items:
+            return None
+
+        input_count = len(items)
+        level = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.config.max_workers or self.client.get_max_workers()) as executor:
+            while len(items) > 1:
+                level += 1
+                groups = self.group_items(items)
+                print(f"🧮 다이제스트 reduce 레벨 {level}: {len(items)}개 -> {len(groups)}개")
+                items = list(executor.map(lambda group: self._reduce_group(group, level), groups))
+
+        digest = items[0]
+        return {
+            "service": self.service,
+            "digest": digest.text.split("\n", 1)[1] if digest.text.startswith("### ") else digest.text,
+            "input_analyses": input_count,
+            "reduce_levels": level,
+            "llm_calls": self.llm_calls,
+            "window_range": [digest.start_window, digest.end_window]
+        }
+
+def build_incident_digest(records: Iterable[Dict], service: str = "[unknown]",
+                          config: DigestConfig = None) -> Optional[Dict]:
+    """윈도우 분석 결과로 인시던트 다이제스트 생성"""
+    reducer = IncidentDigestReducer(config, service=service)
+    return reducer.reduce(records)
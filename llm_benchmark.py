@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+LLM 벤치마크 스크립트 - vLLM 서버를 대상으로 프롬프트/요청 방식별 성능 비교
+"""
+
+import glob
+import json
+import time
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from typing import Dict, List
+import requests
+
+from config import OPENAI_BASE
+from prompt_templates import get_prompt_templates, PromptLayout, OutputFormat
+from sliding_window import create_sliding_window, WindowConfig
+from llm_client import get_llm_client
+from log_llm_pipeline import build_prompts, warmup_prefix_cache
+from structured_output import parse_structured_analysis, get_structured_output_params
+from log_compactor import get_log_compactor
+
+BENCH_META = {"service": "benchsvc", "host": "node-01", "severity": "error>warning>info"}
+
+def percentile(values: List[float], pct: float) -> float:
+    """백분위수 계산 (최근접 순위)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(values: List[float]) -> Dict:
+    """지연시간 요약 통계"""
+    return {
+        "count": len(values),
+        "mean": statistics.mean(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "min": min(values) if values else 0.0,
+        "max": max(values) if values else 0.0
+    }
+
+def load_windows(patterns: List[str], window_tokens: int, limit: int) -> List[str]:
+    """로그 파일들을 윈도우로 분할해 벤치마크 입력 생성"""
+    sliding_window = create_sliding_window(WindowConfig(max_tokens=window_tokens))
+    windows = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            windows.extend(window.content for window in sliding_window.create_windows_from_file(path))
+    return windows[:limit] if limit else windows
+
+def fetch_prefix_cache_counters() -> Dict:
+    """vLLM /metrics 에서 prefix cache 카운터 조회 (지원하지 않으면 빈 dict)"""
+    server_url = OPENAI_BASE[:-3] if OPENAI_BASE.endswith("/v1") else OPENAI_BASE
+    try:
+        response = requests.get(f"{server_url}/metrics", timeout=5)
+        response.raise_for_status()
+    except Exception:
+        return {}
+
+    counters = {}
+    for line in response.text.splitlines():
+        if line.startswith("#"):
+            continue
+        for name in ("prefix_cache_hits", "prefix_cache_queries"):
+            if f"vllm:{name}" in line:
+                try:
+                    counters[name] = counters.get(name, 0.0) + float(line.rsplit(" ", 1)[1])
+                except ValueError:
+                    pass
+    return counters
+
+def measure_prefill(windows: List[str], layout: PromptLayout) -> List[float]:
+    """max_tokens=1 요청으로 윈도우별 prefill 지연시간 측정 (순차 실행)"""
+    client = get_llm_client()
+    prompt_templates = get_prompt_templates()
+    base_time = datetime(2025, 9, 12, 12, 0, 0)
+    latencies = []
+
+    for i, window in enumerate(windows):
+        # 실제 운영처럼 윈도우마다 time_range가 다름
+        start = base_time + timedelta(minutes=5 * i)
+        meta = {**BENCH_META, "time_range": f"{start:%Y-%m-%d %H:%M:%S}~{start + timedelta(minutes=5):%H:%M:%S}"}
+        analysis_type = prompt_templates.detect_analysis_type(window)
+        system_prompt, user_prompt = build_prompts(window, meta, analysis_type, layout)
+
+        started = time.perf_counter()
+        client.chat_completion(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=0.0,
+            max_tokens=1,
+            timeout=120
+        )
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def run_prefix_cache_benchmark(args) -> Dict:
+    """프롬프트 배치 방식별 prefill 지연시간 및 prefix cache 적중률 비교"""
+    windows = load_windows(args.logs, args.window_tokens, args.limit)
+    if not windows:
+        print("❌ 벤치마크할 윈도우가 없습니다.")
+        return {}
+    print(f"🧪 prefix cache 벤치마크: {len(windows)}개 윈도우, 배치 방식별 {args.repeat}회")
+
+    report = {"timestamp": datetime.now().isoformat(), "windows": len(windows), "layouts": {}}
+    for layout in (PromptLayout.CLASSIC, PromptLayout.PREFIX_CACHE):
+        if layout == PromptLayout.PREFIX_CACHE:
+            warmup_prefix_cache(BENCH_META, layout=layout)
+
+        before = fetch_prefix_cache_counters()
+        latencies = []
+        for _ in range(args.repeat):
+            latencies.extend(measure_prefill(windows, layout))
+        after = fetch_prefix_cache_counters()
+
+        result = summarize(latencies)
+        queries = after.get("prefix_cache_queries", 0.0) - before.get("prefix_cache_queries", 0.0)
+        if queries > 0:
+            result["prefix_cache_hit_rate"] = (after.get("prefix_cache_hits", 0.0) - before.get("prefix_cache_hits", 0.0)) / queries
+        report["layouts"][layout.value] = result
+
+    classic = report["layouts"][PromptLayout.CLASSIC.value]
+    prefix = report["layouts"][PromptLayout.PREFIX_CACHE.value]
+    report["p50_speedup"] = classic["p50"] / prefix["p50"] if prefix["p50"] else 0.0
+
+    print(f"\n{'배치 방식':<14}{'p50(ms)':>10}{'p95(ms)':>10}{'mean(ms)':>10}{'hit rate':>10}")
+    for name, result in report["layouts"].items():
+        hit_rate = result.get("prefix_cache_hit_rate")
+        hit_text = f"{hit_rate:.1%}" if hit_rate is not None else "N/A"
+        print(f"{name:<14}{result['p50'] * 1000:>10.1f}{result['p95'] * 1000:>10.1f}{result['mean'] * 1000:>10.1f}{hit_text:>10}")
+    print(f"p50 prefill 속도 향상: {report['p50_speedup']:.2f}x")
+    return report
+
+def measure_generation(windows: List[str], output_format: OutputFormat) -> List[Dict]:
+    """출력 형식별 윈도우 분석 요청 - 생성 토큰 수, 지연시간, JSON 파싱 성공 여부 측정"""
+    client = get_llm_client()
+    prompt_templates = get_prompt_templates()
+    extra = get_structured_output_params() if output_format == OutputFormat.JSON else {}
+    results = []
+
+    for window in windows:
+        analysis_type = prompt_templates.detect_analysis_type(window)
+        system_prompt, user_prompt = build_prompts(window, BENCH_META, analysis_type, output_format=output_format)
+        config = prompt_templates.get_analysis_config(analysis_type, output_format)
+
+        started = time.perf_counter()
+        data = client.with_structured_fallback(
+            lambda params: client.chat_completion(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=config["temperature"],
+                max_tokens=config["max_tokens"],
+                timeout=config["timeout"],
+                **params
+            ),
+            extra
+        )
+        latency = time.perf_counter() - started
+        content = data["choices"][0]["message"]["content"]
+        results.append({
+            "completion_tokens": data.get("usage", {}).get("completion_tokens", 0),
+            "latency": latency,
+            "finish_reason": data["choices"][0].get("finish_reason"),
+            "parsed": parse_structured_analysis(content) is not None if output_format == OutputFormat.JSON else None
+        })
+    return results
+
+def run_structured_output_benchmark(args) -> Dict:
+    """markdown/json 출력 형식별 생성 토큰 수 및 지연시간 비교"""
+    windows = load_windows(args.logs, args.window_tokens, args.limit)
+    if not windows:
+        print("❌ 벤치마크할 윈도우가 없습니다.")
+        return {}
+    print(f"🧪 구조화 출력 벤치마크: {len(windows)}개 윈도우")
+
+    report = {"timestamp": datetime.now().isoformat(), "windows": len(windows), "formats": {}}
+    measurements = {}
+    for output_format in (OutputFormat.MARKDOWN, OutputFormat.JSON):
+        results = measure_generation(windows, output_format)
+        measurements[output_format] = results
+        tokens = [result["completion_tokens"] for result in results]
+        report["formats"][output_format.value] = {
+            "completion_tokens": summarize(tokens),
+            "latency": summarize([result["latency"] for result in results]),
+            "truncated": sum(1 for result in results if result["finish_reason"] == "length")
+        }
+        if output_format == OutputFormat.JSON:
+            report["formats"][output_format.value]["parse_success_rate"] = \
+                sum(1 for result in results if result["parsed"]) / len(results)
+
+    # 같은 윈도우끼리 비교한 생성 토큰 감소율의 중앙값
+    reductions = [
+        1 - json_result["completion_tokens"] / markdown_result["completion_tokens"]
+        for markdown_result, json_result in zip(measurements[OutputFormat.MARKDOWN], measurements[OutputFormat.JSON])
+        if markdown_result["completion_tokens"]
+    ]
+    report["median_completion_token_reduction"] = statistics.median(reductions) if reductions else 0.0
+
+    print(f"\n{'출력 형식':<12}{'토큰 p50':>10}{'토큰 p95':>10}{'p50(s)':>10}{'잘림':>6}")
+    for name, result in report["formats"].items():
+        print(f"{name:<12}{result['completion_tokens']['p50']:>10.0f}{result['completion_tokens']['p95']:>10.0f}"
+              f"{result['latency']['p50']:>10.2f}{result['truncated']:>6}")
+    if "parse_success_rate" in report["formats"][OutputFormat.JSON.value]:
+        print(f"JSON 파싱 성공률: {report['formats'][OutputFormat.JSON.value]['parse_success_rate']:.1%}")
+    print(f"생성 토큰 감소율 (윈도우별 중앙값): {report['median_completion_token_reduction']:.1%}")
+    return report
+
+def measure_analysis_latency(system_prompt: str, user_prompt: str, config: Dict) -> Dict:
+    """분석 요청 한 건의 지연시간과 토큰 수"""
+    started = time.perf_counter()
+    data = get_llm_client().chat_completion(
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=config["temperature"],
+        max_tokens=config["max_tokens"],
+        timeout=config["timeout"]
+    )
+    usage = data.get("usage", {})
+    return {
+        "latency": time.perf_counter() - started,
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0)
+    }
+
+def run_compaction_benchmark(args) -> Dict:
+    """로그 압축 전후 윈도우별 토큰 수와 (--no-llm이 아니면) 분석 지연시간 비교"""
+    sliding_window = create_sliding_window(WindowConfig(max_tokens=args.window_tokens))
+    compactor = get_log_compactor()
+    prompt_templates = get_prompt_templates()
+    windows = []
+    for pattern in args.logs:
+        for path in sorted(glob.glob(pattern)):
+            windows.extend((path, window) for window in sliding_window.create_windows_from_file(path))
+    windows = windows[:args.limit] if args.limit else windows
+    if not windows:
+        print("❌ 벤치마크할 윈도우가 없습니다.")
+        return {}
+    print(f"🧪 로그 압축 벤치마크: {len(windows)}개 윈도우" + ("" if args.no_llm else ", 압축 전후 분석 요청"))
+
+    print(f"\n{'파일':<36}{'윈도우':>6}{'원본':>8}{'압축':>8}{'절약':>8}{'템플릿':>7}")
+    results = []
+    for i, (path, window) in enumerate(windows):
+        compaction = compactor.compact(window.content, window.token_count)
+        entry = {
+            "file": path,
+            "window_index": window.window_index,
+            "lines": compaction.lines,
+            "parsed_lines": compaction.parsed_lines,
+            "templates": compaction.templates,
+            "original_tokens": compaction.original_tokens,
+            "compact_tokens": compaction.compact_tokens,
+            "saved_tokens": compaction.saved_tokens,
+            "saved_ratio": compaction.saved_ratio
+        }
+        print(f"{path[:35]:<36}{window.window_index + 1:>6}{compaction.original_tokens:>8}{compaction.compact_tokens:>8}"
+              f"{compaction.saved_ratio:>8.0%}{compaction.templates:>7}")
+
+        if not args.no_llm:
+            analysis_type = prompt_templates.detect_analysis_type(window.content)
+            config = prompt_templates.get_analysis_config(analysis_type)
+            requests_by_mode = {
+                "original": build_prompts(window.content, BENCH_META, analysis_type),
+                "compact": build_prompts(compaction.text, BENCH_META, analysis_type, compact=True)
+            }
+            # 서버 상태 변화가 한쪽에 몰리지 않도록 윈도우마다 요청 순서를 바꿈
+            modes = ["original", "compact"] if i % 2 == 0 else ["compact", "original"]
+            for mode in modes:
+                entry[mode] = measure_analysis_latency(*requests_by_mode[mode], config)
+        results.append(entry)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "windows": len(results),
+        "window_tokens": args.window_tokens,
+        "original_tokens": sum(entry["original_tokens"] for entry in results),
+        "compact_tokens": sum(entry["compact_tokens"] for entry in results),
+        "saved_ratio": summarize([entry["saved_ratio"] for entry in results]),
+        "results": results
+    }
+    total_saved = report["original_tokens"] - report["compact_tokens"]
+    print(f"\n로그 토큰 절약: {report['original_tokens']:,} -> {report['compact_tokens']:,} "
+          f"({total_saved / report['original_tokens']:.1%}, 윈도우별 중앙값 {report['saved_ratio']['p50']:.1%})")
+
+    if not args.no_llm:
+        print(f"\n{'방식':<10}{'프롬프트':>10}{'p50(s)':>10}{'p95(s)':>10}{'mean(s)':>10}")
+        for mode in ("original", "compact"):
+            latency = summarize([entry[mode]["latency"] for entry in results])
+            prompt_tokens = sum(entry[mode]["prompt_tokens"] for entry in results)
+            report[mode] = {"latency": latency, "prompt_tokens": prompt_tokens}
+            print(f"{mode:<10}{prompt_tokens:>10,}{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['mean']:>10.2f}")
+        compact_p50 = report["compact"]["latency"]["p50"]
+        report["p50_speedup"] = report["original"]["latency"]["p50"] / compact_p50 if compact_p50 else 0.0
+        print(f"p50 지연시간 향상: {report['p50_speedup']:.2f}x")
+    return report
+
+def save_report(name: str, report: Dict):
+    """벤치마크 보고서 저장"""
+    if not report:
+        return
+    report_file = f"llm_benchmark_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 벤치마크 보고서 저장: {report_file}")
+
+def main():
+    parser = argparse.ArgumentParser(description="vLLM 대상 LLM 벤치마크")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prefix_parser = subparsers.add_parser("prefix-cache", help="프롬프트 배치 방식별 prefill 지연시간 비교")
+    prefix_parser.add_argument("--logs", nargs="+", default=["scenario_*.log"], help="입력 로그 파일 (glob)")
+    prefix_parser.add_argument("--window-tokens", type=int, default=1000, help="윈도우 토큰 수")
+    prefix_parser.add_argument("--limit", type=int, default=50, help="최대 윈도우 수 (0=전체)")
+    prefix_parser.add_argument("--repeat", type=int, default=1, help="배치 방식별 반복 횟수")
+
+    structured_parser = subparsers.add_parser("structured-output", help="markdown/json 출력 형식별 생성 토큰 수 비교")
+    structured_parser.add_argument("--logs", nargs="+", default=["scenario_*.log"], help="입력 로그 파일 (glob)")
+    structured_parser.add_argument("--window-tokens", type=int, default=1000, help="윈도우 토큰 수")
+    structured_parser.add_argument("--limit", type=int, default=20, help="최대 윈도우 수 (0=전체)")
+
+    compaction_parser = subparsers.add_parser("compaction", help="로그 압축 전후 토큰 수 및 분석 지연시간 비교")
+    compaction_parser.add_argument("--logs", nargs="+", default=["scenario_*.log"], help="입력 로그 파일 (glob)")
+    compaction_parser.add_argument("--window-tokens", type=int, default=1000, help="윈도우 토큰 수")
+    compaction_parser.add_argument("--limit", type=int, default=0, help="최대 윈도우 수 (0=전체)")
+    compaction_parser.add_argument("--no-llm", action="store_true", help="토큰 절약만 계산 (분석 요청 생략)")
+
+    args = parser.parse_args()
+    if args.command == "prefix-cache":
+        save_report("prefix_cache", run_prefix_cache_benchmark(args))
+    elif args.command == "structured-output":
+        save_report("structured_output", run_structured_output_benchmark(args))
+    elif args.command == "compaction":
+        save_report("compaction", run_compaction_benchmark(args))
+
+if __name__ == "__main__":
+    main()
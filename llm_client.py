@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+LLM 클라이언트 모듈 - vLLM OpenAI 호환 API 호출 공통 처리
+"""
+
+import time
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import requests
+
+from config import MODEL, CHAT_TEMPLATE, SINGLE_FLIGHT
+from concurrency_limiter import AdaptiveConcurrencyLimiter, RequestOutcome
+from endpoint_pool import EndpointPool
+from single_flight import SingleFlight, make_request_key
+from pipeline_timing import get_pipeline_timer
+
+@dataclass
+class ChatResult:
+    """채팅 요청 결과 - 응답 본문과 usage/지연시간"""
+    content: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    finish_reason: Optional[str] = None
+
+class ChatTemplateRenderer:
+    """채팅 메시지를 /v1/completions 용 단일 프롬프트로 렌더링 (클라이언트 측 chat template)"""
+
+    def __init__(self, model: str = MODEL, mode: str = CHAT_TEMPLATE):
+        self.model = model
+        self.mode = mode
+        self._tokenizer = None
+        
+        if mode == "auto":
+            try:
+                # transformers가 설치되어 있으면 모델의 chat template 그대로 사용
+                from transformers import AutoTokenizer
+                self._tokenizer = AutoTokenizer.from_pretrained(model, trust_remote_code=True)
+            except Exception as e:
+                print(f"⚠️ chat template 로딩 실패, ChatML 형식 사용: {e}")
+
+    def render(self, messages: List[Dict]) -> str:
+        """메시지 목록을 생성 프롬프트 문자열로 변환"""
+        if self._tokenizer is not None:
+            return self._tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        
+        # ChatML (Qwen 계열 기본 템플릿)
+        rendered = "".join(
+            f"<|im_start|>{message['role']}\n{message['content']}<|im_end|>\n" for message in messages
+        )
+        return rendered + "<|im_start|>assistant\n"
+
+    def count_tokens(self, messages: List[Dict]) -> Optional[int]:
+        """모델 토크나이저로 정확한 프롬프트 토큰 수 계산 (토크나이저가 없으면 None)"""
+        if self._tokenizer is None:
+            return None
+        return len(self._tokenizer.apply_chat_template(messages, tokenize=True, add_generation_prompt=True))
+
+def split_evenly(total: int, count: int) -> List[int]:
+    """total을 count개로 나눈 값 목록 - 나머지는 앞쪽 항목에 1씩 더해 합계를 유지"""
+    base, remainder = divmod(total, count)
+    return [base + 1 if index < remainder else base for index in range(count)]
+
+def get_request_class(path: str, payload: Dict) -> str:
+    """동시성 제한기가 지연시간 기준치를 따로 두는 요청 종류
+
+    경로/모델/max_tokens/배치 프롬프트 수가 같으면 지연시간 규모가 비슷하다고 본다
+    (트리아지, 윈도우 분석, 배치 요청, 다이제스트 요약이 서로의 기준치에 섞이지 않음).
+    """
+    prompts = payload.get("prompt")
+    batch = len(prompts) if isinstance(prompts, list) else 1
+    return f"{path}:{payload.get('model')}:{payload.get('max_tokens')}x{batch}"
+
+class LLMClient:
+    """vLLM 채팅 완성 API 클라이언트"""
+
+    def __init__(self, base_url: str = None, model: str = MODEL,
+                 limiter: AdaptiveConcurrencyLimiter = None, pool: EndpointPool = None):
+        # base_url을 주면 단일 서버, 아니면 VLLM_ENDPOINTS 전체로 분산
+        self.pool = pool or EndpointPool([base_url] if base_url else None)
+        self.base_url = self.pool.primary.base_url
+        self.model = model
+        # 연결 재사용 (윈도우마다 TCP 연결을 새로 맺지 않도록)
+        self.session = requests.Session()
+        # 모든 요청이 같은 동시성 한도를 공유 (윈도우 분석, 다이제스트, 모니터)
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self._renderer = None
+        self._renderer_lock = threading.Lock()
+        self._tokenize_supported = True
+        # 같은 내용의 동시 요청은 한 번만 전송 (모니터/자동 분석이 같은 인시던트로 동시에 트리거되는 경우)
+        self.single_flight = SingleFlight() if SINGLE_FLIGHT else None
+    
+    def get_renderer(self) -> ChatTemplateRenderer:
+        """chat template 렌더러 (처음 사용할 때 로딩)"""
+        with self._renderer_lock:
+            if self._renderer is None:
+                self._renderer = ChatTemplateRenderer(self.model)
+            return self._renderer
+
+    def get_max_workers(self) -> int:
+        """요청 스레드 풀 크기 - 동시성 한도가 최대로 늘어나도 스레드가 부족하지 않도록"""
+        return self.limiter.max_limit
+
+    def get_metrics(self) -> Dict:
+        """동시성 제한기 지표 (현재 한도, 실행 중 요청 수 등) 및 엔드포인트별 지표"""
+        metrics = {**self.limiter.get_metrics(), "endpoints": self.pool.get_metrics()}
+        if self.single_flight:
+            metrics["coalesced_requests"] = self.single_flight.get_metrics()["coalesced"]
+        return metrics
+
+    def _post(self, path: str, payload: Dict, timeout: float) -> Dict:
+        """POST 요청 - 같은 경로/내용의 요청이 실행 중이면 그 응답을 함께 사용
+        
+        합류한 호출자는 동시성 슬롯을 차지하지 않으며, 응답 dict는 호출자 간에 공유된다.
+        """
+        if self.single_flight is None:
+            return self._send(path, payload, timeout)
+        return self.single_flight.do(
+            make_request_key(path, payload),
+            lambda: self._send(path, payload, timeout)
+        )
+
+    async def _post_async(self, path: str, payload: Dict, timeout: float) -> Dict:
+        """_post의 asyncio 버전 - HTTP 요청은 스레드에서 실행"""
+        if self.single_flight is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._send, path, payload, timeout)
+        return await self.single_flight.do_async(
+            make_request_key(path, payload),
+            lambda: self._send(path, payload, timeout)
+        )
+
+    def _send(self, path: str, payload: Dict, timeout: float) -> Dict:
+        """동시성 한도 안에서 엔드포인트를 골라 POST 요청 - 429/503/타임아웃은 과부하로 기록
+        
+        연결 자체가 실패한 경우(요청이 서버에 전달되지 않음)에만 다른 엔드포인트로 재시도한다.
+        동시성 슬롯 대기는 queue, 요청/응답 수신은 http, 응답 JSON 변환은 parse 단계로 측정한다.
+        """
+        timer = get_pipeline_timer()
+        with timer.stage("queue"), self.limiter.slot(get_request_class(path, payload)) as slot:
+            tried = []
+            while True:
+                endpoint = self.pool.acquire(exclude=tried)
+                started = time.perf_counter()
+                # 응답을 받지 못하면 (예외 종류와 상관없이) 지연시간 없이 실패로 반환
+                latency, success = None, False
+                try:
+                    with timer.stage("http"):
+                        r = self.session.post(f"{endpoint.base_url}{path}", json=payload, timeout=timeout)
+                    latency, success = time.perf_counter() - started, r.status_code < 500
+                except requests.exceptions.ConnectTimeout:
+                    # ConnectionError이면서 Timeout - 연결 실패가 아니라 서버가 바빠 응답하지 못한 것으로 봄
+                    slot["outcome"] = RequestOutcome.OVERLOAD
+                    raise
+                except requests.exceptions.ConnectionError as e:
+                    tried.append(endpoint)
+                    if len(tried) < len(self.pool.endpoints):
+                        print(f"⚠️ {endpoint.base_url} 연결 실패, 다른 엔드포인트로 재시도: {e}")
+                        continue
+                    raise
+                except requests.exceptions.Timeout:
+                    slot["outcome"] = RequestOutcome.OVERLOAD
+                    raise
+                finally:
+                    self.pool.release(endpoint, latency, success)
+                
+                if r.status_code in (429, 503):
+                    slot["outcome"] = RequestOutcome.OVERLOAD
+                r.raise_for_status()
+                with timer.stage("parse"):
+                    return r.json()
+
+    def count_chat_tokens(self, messages: List[Dict]) -> Optional[int]:
+        """채팅 메시지의 정확한 프롬프트 토큰 수 - vLLM /tokenize, 실패 시 로컬 chat template 토크나이저
+        
+        둘 다 사용할 수 없으면 None을 반환한다.
+        """
+        if self._tokenize_supported:
+            endpoint = self.pool.acquire()
+            try:
+                r = self.session.post(
+                    f"{endpoint.server_url}/tokenize",
+                    json={"model": self.model, "messages": messages, "add_generation_prompt": True},
+                    timeout=10
+                )
+                if r.status_code == 404:
+                    # 구버전 vLLM 등 /tokenize 미지원 - 이후로는 시도하지 않음
+                    print("⚠️ /tokenize 미지원 서버, 로컬 토크나이저로 대체")
+                    self._tokenize_supported = False
+                else:
+                    r.raise_for_status()
+                    return r.json()["count"]
+            except Exception as e:
+                print(f"⚠️ /tokenize 요청 실패: {e}")
+            finally:
+                # 토큰 계산 요청은 생성 지연시간 지표에 섞지 않음
+                self.pool.release(endpoint, None, success=True)
+        
+        try:
+            return self.get_renderer().count_tokens(messages)
+        except Exception:
+            return None
+
+    def chat_completion(self, messages: List[Dict], temperature: float, max_tokens: int,
+                        timeout: float, **extra) -> Dict:
+        """채팅 완성 요청 - 응답 JSON 전체 반환"""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **extra
+        }
+        return self._post("/chat/completions", payload, timeout)
+
+    def completion(self, prompts: List[str], temperature: float, max_tokens: int,
+                   timeout: float, **extra) -> Dict:
+        """텍스트 완성 요청 - 여러 프롬프트를 한 요청으로 전송, 응답 JSON 전체 반환"""
+        payload = {
+            "model": self.model,
+            "prompt": prompts,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **extra
+        }
+        return self._post("/completions", payload, timeout)
+
+    def with_structured_fallback(self, request, extra: Dict) -> Dict:
+        """구조화 출력 파라미터(guided_json/response_format)를 서버가 거부(400)하면 빼고 다시 요청"""
+        try:
+            return request(extra)
+        except requests.exceptions.HTTPError as e:
+            if not extra or e.response is None or e.response.status_code != 400:
+                raise
+            print(f"⚠️ 구조화 출력 파라미터({', '.join(extra)}) 미지원 - 프롬프트 지시만으로 재요청")
+            return request({})
+
+    def chat_batch(self, conversations: List[List[Dict]], config: Dict, **extra) -> List[Optional[ChatResult]]:
+        """여러 대화를 chat template으로 렌더링해 /completions 한 번으로 요청
+        
+        응답 choices는 index로 원래 순서에 매핑하며, 응답이 없는 항목은 None으로 반환한다.
+        usage와 지연시간은 요청 전체 값이므로 항목 수로 나눠 기록한다 (토큰 수 나머지는 앞쪽 항목에 배분).
+        """
+        renderer = self.get_renderer()
+        prompts = [renderer.render(messages) for messages in conversations]
+        started = time.perf_counter()
+        data = self.with_structured_fallback(
+            lambda params: self.completion(
+                prompts,
+                temperature=config["temperature"],
+                max_tokens=config["max_tokens"],
+                # 배치 하나에 N개 생성이 들어가므로 타임아웃도 넉넉하게
+                timeout=config["timeout"] * max(1, len(prompts) // 4 + 1),
+                **params
+            ),
+            extra
+        )
+        latency = time.perf_counter() - started
+        usage = data.get("usage") or {}
+        prompt_tokens = split_evenly(usage.get("prompt_tokens", 0), len(prompts))
+        completion_tokens = split_evenly(usage.get("completion_tokens", 0), len(prompts))
+        outputs = [None] * len(prompts)
+        for position, choice in enumerate(data.get("choices", [])):
+            index = choice.get("index", position)
+            if 0 <= index < len(outputs) and choice.get("text") is not None:
+                outputs[index] = ChatResult(
+                    content=choice["text"],
+                    prompt_tokens=prompt_tokens[index],
+                    completion_tokens=completion_tokens[index],
+                    latency=latency / len(prompts),
+                    finish_reason=choice.get("finish_reason")
+                )
+        return outputs
+
+    def chat_result(self, system_prompt: str, user_prompt: str, config: Dict, **extra) -> ChatResult:
+        """시스템/사용자 프롬프트로 요청하고 응답 본문, usage, 지연시간 반환 (extra는 guided_json 등 추가 파라미터)"""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        started = time.perf_counter()
+        data = self.with_structured_fallback(
+            lambda params: self.chat_completion(
+                messages,
+                temperature=config["temperature"],
+                max_tokens=config["max_tokens"],
+                timeout=config["timeout"],
+                **params
+            ),
+            extra
+        )
+        usage = data.get("usage") or {}
+        choice = data["choices"][0]
+        return ChatResult(
+            content=choice["message"]["content"],
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            latency=time.perf_counter() - started,
+            finish_reason=choice.get("finish_reason")
+        )
+
+    def chat(self, system_prompt: str, user_prompt: str, config: Dict, **extra) -> str:
+        """시스템/사용자 프롬프트로 요청하고 응답 본문만 반환"""
+        return self.chat_result(system_prompt, user_prompt, config, **extra).content
+
+    async def chat_async(self, system_prompt: str, user_prompt: str, config: Dict) -> str:
+        """chat의 asyncio 버전 - 이벤트 루프를 막지 않으며 동기 호출과도 요청을 합침"""
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": config["temperature"],
+            "max_tokens": config["max_tokens"]
+        }
+        data = await self._post_async("/chat/completions", payload, config["timeout"])
+        return data["choices"][0]["message"]["content"]
+
+# 전역 인스턴스
+llm_client = LLMClient()
+
+def get_llm_client() -> LLMClient:
+    """LLM 클라이언트 인스턴스 반환"""
+    return llm_client
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+로그 압축 인코더 - 프롬프트에 넣기 전 타임스탬프/서비스/레벨/반복 메시지를 짧은 표기로 바꿔 토큰 절약
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sliding_window import TokenCounter
+from log_parser import get_log_parser
+from pipeline_timing import get_pipeline_timer
+from config import LOG_COMPACTION_MIN_REPEATS
+
+# 형식: YYYY-MM-DD HH:MM:SS LEVEL [SERVICE] MESSAGE
+LINE_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (\w+) \[([^\]]+)\] ?(.*)$')
+# 메시지 안의 숫자/IP/비율 등 값 부분 (영문자 바로 뒤 숫자는 이름의 일부로 보고 유지)
+PARAM_PATTERN = re.compile(r'(?<![A-Za-z0-9_.])\d+(?:[.:/]\d+)*')
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+LEVEL_CODES = {
+    "DEBUG": "D",
+    "INFO": "I",
+    "WARN": "W",
+    "WARNING": "W",
+    "ERROR": "E",
+    "CRITICAL": "C",
+    "FATAL": "F"
+}
+
+@dataclass
+class CompactionResult:
+    """윈도우 하나의 압축 결과"""
+    text: str
+    original_tokens: int
+    compact_tokens: int
+    lines: int
+    parsed_lines: int   # 형식이 맞아 압축된 라인 수 (나머지는 원문 유지)
+    templates: int      # 반복 메시지 템플릿 수
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.compact_tokens
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.saved_tokens / self.original_tokens if self.original_tokens else 0.0
+
+class LogCompactor:
+    """로그 윈도우를 범례 + 압축 라인으로 변환
+
+    출력 형식 (설명은 prompt_templates.COMPACT_LOG_SECTION):
+        t0=2025-09-12 13:35:26
+        levels I=INFO W=WARN
+        services s1=gateway s2=authsvc
+        templates
+        m1=Memory usage: *%
+        lines
+        +0 I s1 m1 45
+        +60 W s2 | Disk space low
+        ~ 형식이 맞지 않는 원문 라인
+    """
+
+    def __init__(self, min_repeats: int = LOG_COMPACTION_MIN_REPEATS, token_counter: TokenCounter = None):
+        self.min_repeats = min_repeats
+        self.token_counter = token_counter or TokenCounter()
+
+    def _parse(self, line: str) -> Optional[Tuple[datetime, str, str, str, List[str]]]:
+        """(시각, 레벨, 서비스, 메시지 템플릿, 파라미터) - 형식이 다르면 None"""
+        match = LINE_PATTERN.match(line)
+        if not match:
+            return None
+        timestamp_str, level, service, message = match.groups()
+        timestamp = get_log_parser().parse_timestamp(timestamp_str)
+        if timestamp is None:
+            return None
+        if "*" in message:
+            # 원래 있던 *는 파라미터 자리와 구분할 수 없으므로 템플릿으로 묶지 않고 원문 유지
+            return timestamp, level, service, None, []
+        params = PARAM_PATTERN.findall(message)
+        template = PARAM_PATTERN.sub("*", message) if params else message
+        return timestamp, level, service, template, params
+
+    @staticmethod
+    def _level_code(level: str, used_codes: set) -> str:
+        """레벨 약어 - 다른 레벨이 이미 쓴 약어(WARN/WARNING 등)면 원래 이름, 그것도 겹치면 L번호"""
+        for code in (LEVEL_CODES.get(level.upper()), level):
+            if code and code not in used_codes:
+                return code
+        number = len(used_codes) + 1
+        while f"L{number}" in used_codes:
+            number += 1
+        return f"L{number}"
+
+    def encode(self, lines: List[str]) -> Tuple[str, int, int]:
+        """라인 목록을 압축 형식 텍스트로 변환 - (텍스트, 압축된 라인 수, 템플릿 수)"""
+        parsed = [self._parse(line) for line in lines]
+        entries = [entry for entry in parsed if entry is not None]
+        if not entries:
+            return "\n".join(lines), 0, 0
+
+        # 시각 순이 아닌 라인이 있어도 오프셋이 음수가 되지 않도록 가장 이른 시각 기준
+        base_time = min(entry[0] for entry in entries)
+        levels = {}
+        services = {}
+        template_counts = {}
+        for _, level, service, template, _ in entries:
+            if level not in levels:
+                levels[level] = self._level_code(level, set(levels.values()))
+            services.setdefault(service, f"s{len(services) + 1}")
+            if template is not None:
+                template_counts[template] = template_counts.get(template, 0) + 1
+        # 여러 번 나온 메시지 형태만 템플릿으로 (한 번뿐이면 범례에 쓰는 만큼 손해)
+        templates = {}
+        for template, count in template_counts.items():
+            if count >= self.min_repeats:
+                templates[template] = f"m{len(templates) + 1}"
+
+        output = [f"t0={base_time.strftime(TIMESTAMP_FORMAT)}"]
+        level_legend = [f"{code}={level}" for level, code in levels.items() if code != level]
+        if level_legend:
+            output.append("levels " + " ".join(level_legend))
+        output.append("services " + " ".join(f"{alias}={service}" for service, alias in services.items()))
+        if templates:
+            output.append("templates")
+            output.extend(f"{alias}={template}" for template, alias in templates.items())
+        output.append("lines")
+
+        for line, entry in zip(lines, parsed):
+            if entry is None:
+                # 빈 라인 (윈도우 끝 줄바꿈 등)은 내용이 없으므로 생략
+                if line.strip():
+                    output.append(f"~ {line}")
+                continue
+            timestamp, level, service, template, params = entry
+            prefix = f"+{int((timestamp - base_time).total_seconds())} {levels[level]} {services[service]}"
+            alias = templates.get(template)
+            if alias is None:
+                # 템플릿이 아니면 원래 메시지 (파라미터 치환 전) 그대로
+                message = LINE_PATTERN.match(line).group(4)
+                output.append(f"{prefix} | {message}")
+            else:
+                output.append(" ".join([prefix, alias] + params))
+        return "\n".join(output), len(entries), len(templates)
+
+    def compact(self, window_text: str, original_tokens: int = None) -> CompactionResult:
+        """윈도우 텍스트 압축 및 전후 토큰 수 계산 (original_tokens를 알면 원문은 다시 세지 않음)"""
+        with get_pipeline_timer().stage("compact"):
+            lines = window_text.split("\n")
+            text, parsed_lines, templates = self.encode(lines)
+            if original_tokens is None:
+                original_tokens = self.token_counter.count_tokens(window_text)
+            compact_tokens = self.token_counter.count_tokens(text)
+        return CompactionResult(
+            text=text,
+            original_tokens=original_tokens,
+            compact_tokens=compact_tokens,
+            lines=len(lines),
+            parsed_lines=parsed_lines,
+            templates=templates
+        )
+
+# 전역 인스턴스
+log_compactor = None
+
+def get_log_compactor() -> LogCompactor:
+    """로그 압축기 인스턴스 반환"""
+    global log_compactor
+    if log_compactor is None:
+        log_compactor = LogCompactor()
+    return log_compactor
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+로그 압축 테스트 스크립트 - 압축 형식을 다시 풀어 원래 시각/레벨/서비스/메시지와 같은지 확인
+"""
+
+import sys
+import random
+from datetime import datetime, timedelta
+
+from log_compactor import LogCompactor, LINE_PATTERN, TIMESTAMP_FORMAT
+from log_generator import LogGenerator
+
+def decode(text: str) -> list:
+    """압축 형식 → 라인 목록 (prompt_templates.COMPACT_LOG_SECTION 설명대로 해석)
+
+    압축된 라인은 (시각, 레벨, 서비스, 메시지), "~ " 원문 라인은 문자열로 반환한다.
+    """
+    rows = text.split("\n")
+    base_time = datetime.strptime(rows[0][len("t0="):], TIMESTAMP_FORMAT)
+    levels, services, templates = {}, {}, {}
+    position = 1
+    if rows[position].startswith("levels "):
+        levels = dict(item.split("=", 1) for item in rows[position].split()[1:])
+        position += 1
+    services = dict(item.split("=", 1) for item in rows[position].split()[1:])
+    position += 1
+    if rows[position] == "templates":
+        position += 1
+        while rows[position] != "lines":
+            alias, template = rows[position].split("=", 1)
+            templates[alias] = template
+            position += 1
+    assert rows[position] == "lines", rows[position]
+
+    decoded = []
+    for row in rows[position + 1:]:
+        if row.startswith("~ "):
+            decoded.append(row[2:])
+            continue
+        offset, code, alias, rest = row.split(" ", 3)
+        timestamp = (base_time + timedelta(seconds=int(offset))).strftime(TIMESTAMP_FORMAT)
+        if rest.startswith("| "):
+            message = rest[2:]
+        else:
+            name, *params = rest.split(" ")
+            pieces = templates[name].split("*")
+            assert len(pieces) == len(params) + 1, (templates[name], params)
+            message = pieces[0] + "".join(param + piece for param, piece in zip(params, pieces[1:]))
+        decoded.append((timestamp, levels.get(code, code), services[alias], message))
+    return decoded
+
+def expected(lines: list) -> list:
+    """원문 라인 → 압축 후 기대값 (형식이 맞으면 필드 튜플, 아니면 원문, 빈 라인은 생략)"""
+    rows = []
+    for line in lines:
+        if not line.strip():
+            continue
+        match = LINE_PATTERN.match(line)
+        rows.append(match.groups() if match else line)
+    return rows
+
+def round_trip(compactor: LogCompactor, lines: list, invalid: tuple = ()) -> bool:
+    """압축 → 해석 결과가 원문과 같은지 (invalid: 형식은 맞지만 날짜가 잘못돼 원문으로 남는 라인)"""
+    text, parsed_lines, _ = compactor.encode(lines)
+    want = [line if line in invalid else row for line, row in zip(
+        [line for line in lines if line.strip()], expected(lines))]
+    got = decode(text)
+    mismatches = [(w, g) for w, g in zip(want, got) if w != g]
+    if len(want) != len(got) or mismatches:
+        print(f"   ❌ 라인 {len(want)}개 → {len(got)}개, 불일치 예: {mismatches[:2]}")
+        return False
+    return True
+
+def check_generated_windows(compactor: LogCompactor) -> bool:
+    """생성기 시나리오 로그: 압축을 풀면 원문과 같고 토큰이 줄어듦"""
+    random.seed(42)
+    generator = LogGenerator()
+    windows = {
+        "mixed": generator.generate_mixed_scenario(30),
+        "database": generator.generate_database_error_scenario(20),
+        "volume": generator.generate_large_volume_logs(300),
+    }
+    passed = True
+    for name, lines in windows.items():
+        result = compactor.compact("\n".join(lines))
+        ok = round_trip(compactor, lines) and result.saved_tokens > 0 and result.parsed_lines == len(lines)
+        passed = passed and ok
+        print(f"   {name}: {len(lines)}줄, 템플릿 {result.templates}개, "
+              f"토큰 {result.original_tokens} → {result.compact_tokens} ({result.saved_ratio:.0%} 절약) {'✅' if ok else '❌'}")
+    return passed
+
+def check_edge_cases(compactor: LogCompactor) -> bool:
+    """원래 있던 *, 시각 역순, 겹치는 레벨 약어, 빈 라인, 형식/날짜가 잘못된 라인"""
+    invalid_date = "2025-02-30 10:00:00 ERROR [db] Invalid calendar date 3"
+    lines = [
+        "2025-09-12 13:35:30 INFO [api] GET /orders/1234 200 12ms",
+        "2025-09-12 13:35:26 WARN [api] Slow query 4500ms",                 # t0보다 앞선 시각
+        "2025-09-12 13:35:31 WARNING [api] Slow query 4700ms",              # WARN과 같은 약어 W
+        "2025-09-12 13:35:32 W [worker] Slow query 4900ms",                 # 약어와 같은 이름의 레벨
+        "2025-09-12 13:35:33 ERROR [api] SELECT * FROM orders WHERE id=42",  # 원래 있던 *
+        "2025-09-12 13:35:33 ERROR [api] SELECT * FROM orders WHERE id=43",
+        "",
+        "   ",
+        "Traceback (most recent call last):",
+        invalid_date,
+        "2025-09-12 13:36:40 INFO [api] GET /orders/1235 200 15ms",
+        "2025-09-12 13:36:41 INFO [api] GET /orders/1236 200 9ms",
+    ]
+    text, parsed_lines, templates = compactor.encode(lines)
+    rows = text.split("\n")
+    ok = round_trip(compactor, lines, invalid=(invalid_date,))
+    no_empty_markers = all(row.strip() not in ("~", "") for row in rows)
+    star_literal = sum(row.endswith("| SELECT * FROM orders WHERE id=42") for row in rows) == 1
+    print(f"   라인 {len(lines)}개 → 압축 {parsed_lines}개, 템플릿 {templates}개, 원문 유지 "
+          f"{sum(row.startswith('~ ') for row in rows)}개")
+    print(f"   t0={rows[0][3:]}, {rows[1]}, 빈 라인 표시 없음={no_empty_markers}, * 원문 유지={star_literal}")
+    return (ok and rows[0] == "t0=2025-09-12 13:35:26" and no_empty_markers and star_literal
+            and parsed_lines == 8 and templates == 2)
+
+def check_min_repeats() -> bool:
+    """min_repeats보다 적게 나온 메시지 형태는 템플릿 없이 원래 메시지 그대로"""
+    lines = [f"2025-09-12 13:35:{second:02d} INFO [api] GET /orders/{second} 200" for second in range(3)]
+    counts = {}
+    for min_repeats in (3, 4):
+        compactor = LogCompactor(min_repeats=min_repeats)
+        _, _, counts[min_repeats] = compactor.encode(lines)
+        if not round_trip(compactor, lines):
+            return False
+    print(f"   같은 형태 3줄: min_repeats=3 → 템플릿 {counts[3]}개, min_repeats=4 → 템플릿 {counts[4]}개")
+    return counts == {3: 1, 4: 0}
+
+def check_unparsed_window() -> bool:
+    """형식이 맞는 라인이 하나도 없으면 원문 그대로 (compact에서 절약 0 이하 → 원문 사용)"""
+    lines = ["plain text line", "another line"]
+    result = LogCompactor().compact("\n".join(lines))
+    print(f"   압축 라인 {result.parsed_lines}개, 원문 유지={result.text == chr(10).join(lines)}, 절약 {result.saved_tokens}토큰")
+    return result.parsed_lines == 0 and result.text == "\n".join(lines) and result.saved_tokens <= 0
+
+def main():
+    print("=== 로그 압축 테스트 시작 ===\n")
+    compactor = LogCompactor(min_repeats=2)
+    results = {}
+
+    print("🧪 1. 생성기 로그 압축/복원")
+    results["생성기 로그 복원"] = check_generated_windows(compactor)
+
+    print("\n🧪 2. 경계 사례 복원")
+    results["경계 사례"] = check_edge_cases(compactor)
+
+    print("\n🧪 3. 템플릿 최소 반복 수")
+    results["최소 반복 수"] = check_min_repeats()
+
+    print("\n🧪 4. 형식이 다른 윈도우")
+    results["형식 불일치"] = check_unparsed_window()
+
+    print("\n=== 테스트 결과 요약 ===")
+    for name, passed in results.items():
+        print(f"{name}: {'✅ 성공' if passed else '❌ 실패'}")
+    return all(results.values())
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -9,9 +9,10 @@ import json
 import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import re
 from collections import defaultdict, deque
 
+from log_parser import get_log_parser
+
 class LogDashboard:
     def __init__(self):
         self.running = False
@@ -99,18 +100,17 @@ class LogDashboard:
                 # 최근 로그만 파싱
                 recent_lines = lines[-max_lines:] if len(lines) > max_lines else lines
                 
-                for line in recent_lines:
-                    parsed = self.parse_log_line(line.strip())
-                    if parsed:
-                        stats["by_level"][parsed["level"]] += 1
-                        stats["by_service"][parsed["service"]] += 1
-                        
-                        if parsed["level"] == "ERROR":
-                            stats["error_count"] += 1
-                        elif parsed["level"] == "CRITICAL":
-                            stats["critical_count"] += 1
-                        
-                        stats["recent_logs"].append(parsed)
+                parsed_logs, _ = get_log_parser().parse_lines(recent_lines)
+                for parsed in parsed_logs:
+                    stats["by_level"][parsed["level"]] += 1
+                    stats["by_service"][parsed["service"]] += 1
+                    
+                    if parsed["level"] == "ERROR":
+                        stats["error_count"] += 1
+                    elif parsed["level"] == "CRITICAL":
+                        stats["critical_count"] += 1
+                    
+                    stats["recent_logs"].append(parsed)
         
         except Exception as e:
             print(f"❌ 로그 파일 파싱 오류 ({filepath}): {e}")
@@ -118,22 +118,8 @@ class LogDashboard:
         return stats
     
     def parse_log_line(self, line: str) -> Optional[Dict]:
-        """로그 라인 파싱"""
-        pattern = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (\w+) \[(\w+)\] (.+)'
-        match = re.match(pattern, line)
-        
-        if match:
-            timestamp_str, level, service, message = match.groups()
-            timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-            
-            return {
-                "timestamp": timestamp,
-                "level": level,
-                "service": service,
-                "message": message,
-                "raw": line
-            }
-        return None
+        """로그 라인 파싱 (공용 파서 사용)"""
+        return get_log_parser().parse_line(line)
     
     def get_analysis_files(self) -> List[str]:
         """분석 결과 파일 목록 반환"""
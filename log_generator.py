@@ -178,10 +178,10 @@ class LogGenerator:
         
         return logs
     
-    def generate_large_volume_logs(self, num_lines: int = 1000) -> List[str]:
-        """대용량 로그 생성"""
+    def generate_large_volume_logs(self, num_lines: int = 1000, base_time: datetime = None) -> List[str]:
+        """대용량 로그 생성 (base_time과 random 시드를 고정하면 같은 로그가 생성됨)"""
         logs = []
-        base_time = datetime.now() - timedelta(hours=2)
+        base_time = base_time or datetime.now() - timedelta(hours=2)
         
         for i in range(num_lines):
             service = random.choice(self.services)
@@ -7,26 +7,233 @@
 
 # log_llm_pipeline.py
 import os, json, time
+import concurrent.futures
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Dict
-import requests
+from typing import Callable, List, Dict, Optional, Tuple
 
 # 새로운 모듈 import
-from prompt_templates import get_prompt_templates, AnalysisType
-from sliding_window import create_sliding_window, WindowConfig, WindowProcessor
-from config import OPENAI_BASE, MODEL, DEFAULT_WINDOW_TOKENS, DEFAULT_OVERLAP_RATIO, DEFAULT_MIN_TOKENS
+from prompt_templates import (
+    get_prompt_templates, AnalysisType, PromptLayout, get_default_layout, OutputFormat, get_default_output_format,
+    CompiledTemplate, top_analysis_type, top_analysis_types, split_multi_label_response
+)
+from sliding_window import create_sliding_window, SlidingWindow, WindowConfig, WindowProcessor, WindowResult
+from result_store import (
+    JsonlResultWriter, AnalysisCheckpoint, compute_file_fingerprint,
+    make_checkpoint_key, get_jsonl_path, export_json_array, iter_jsonl_records
+)
+from llm_client import get_llm_client, ChatResult
+from incident_digest import build_incident_digest
+from token_budget import get_token_budget_planner, BudgetAction, BudgetDecision, split_window_text
+from priority_scheduler import get_priority_executor, get_window_priority, print_wait_stats, summarize_wait_times
+from structured_output import parse_structured_analysis, merge_structured_analyses, get_structured_output_params
+from triage import get_triage_classifier, CascadeStats, print_cascade_report
+from pipeline_timing import get_pipeline_timer, print_timing_report
+from usage_stats import UsageStats, get_run_throughput, print_usage_report
+from log_compactor import get_log_compactor
+from log_parser import get_log_parser
+from config import (
+    MODEL, DEFAULT_WINDOW_TOKENS, DEFAULT_OVERLAP_RATIO, DEFAULT_MIN_TOKENS,
+    ENABLE_INCIDENT_DIGEST, PREFIX_CACHE_WARMUP, COMPLETIONS_BATCH_SIZE, PREFLIGHT_TOKEN_CHECK,
+    ENABLE_TRIAGE, TRIAGE_MODEL, LOG_COMPACTION, MULTI_LABEL_TOP_K, MULTI_LABEL_MIN_SCORE_RATIO
+)
 
 # 윈도우 설정
 WINDOW_CONFIG = WindowConfig(
     max_tokens=DEFAULT_WINDOW_TOKENS,
     overlap_ratio=DEFAULT_OVERLAP_RATIO,
-    min_tokens=DEFAULT_MIN_TOKENS
+    min_tokens=DEFAULT_MIN_TOKENS,
+    track_analysis_types=True
 )
 
+_sliding_window = None
+
+def get_sliding_window() -> SlidingWindow:
+    """파이프라인용 슬라이딩 윈도우 (토크나이저는 프로세스에서 한 번만 로딩)"""
+    global _sliding_window
+    if _sliding_window is None:
+        _sliding_window = create_sliding_window(WINDOW_CONFIG)
+    return _sliding_window
+
 # 기존 함수들은 새로운 모듈로 대체됨
 
-def call_llm(window_text: str, meta: Dict, analysis_type: AnalysisType = None) -> Dict:
-    """LLM 호출 함수 - 새로운 프롬프트 템플릿 사용"""
+def build_prompts(window_text: str, meta: Dict, analysis_type: AnalysisType,
+                  layout: PromptLayout = None, output_format: OutputFormat = None, compact: bool = False) -> List[str]:
+    """시스템 프롬프트와 사용자 프롬프트 생성 (미리 나눈 템플릿 앞뒤에 윈도우를 이어 붙임)
+    
+    compact면 window_text가 압축 형식(compact_window_text)이라고 보고 형식 설명이 들어간 템플릿을 사용한다.
+    """
+    compiled = get_prompt_templates().get_compiled_template(analysis_type, layout, output_format, compact)
+    return render_prompts(compiled, window_text, meta)
+
+def render_prompts(compiled: CompiledTemplate, window_text: str, meta: Dict) -> List[str]:
+    """컴파일된 템플릿으로 시스템/사용자 프롬프트 생성"""
+    with get_pipeline_timer().stage("render"):
+        user_prompt = compiled.render(
+            window_text,
+            service=meta.get('service', '[unknown]'),
+            host=meta.get('host', '[unknown]'),
+            time_range=meta.get('time_range', '[unknown]'),
+            severity=meta.get('severity', '[unknown]')
+        )
+    return [compiled.system_prompt, user_prompt]
+
+def warmup_prefix_cache(meta: Dict, analysis_types: List[AnalysisType] = None, layout: PromptLayout = None):
+    """분석 타입별로 로그 없는 프롬프트를 한 번씩 보내 vLLM prefix cache를 미리 채움"""
+    client = get_llm_client()
+    analysis_types = analysis_types or list(AnalysisType)
+    for analysis_type in analysis_types:
+        system_prompt, user_prompt = build_prompts("", {**meta, "time_range": ""}, analysis_type, layout,
+                                                   compact=LOG_COMPACTION)
+        try:
+            client.chat_completion(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=0.0,
+                max_tokens=1,
+                timeout=30
+            )
+        except Exception as e:
+            print(f"⚠️ prefix cache 워밍업 실패 ({analysis_type.value}): {e}")
+            return
+    print(f"🔥 prefix cache 워밍업 완료: {len(analysis_types)}개 분석 타입")
+
+def compact_window_text(window_text: str, original_tokens: int = None) -> Tuple[str, Optional[int]]:
+    """LOG_COMPACTION이면 윈도우를 압축 형식으로 변환 - (프롬프트에 넣을 텍스트, 압축 후 토큰 수)
+    
+    압축해도 토큰이 줄지 않으면 (라인이 적거나 형식이 다른 로그) 원문과 None을 반환한다.
+    """
+    if not LOG_COMPACTION:
+        return window_text, None
+    result = get_log_compactor().compact(window_text, original_tokens)
+    if result.saved_tokens <= 0:
+        return window_text, None
+    get_pipeline_timer().count("compaction_saved_tokens", result.saved_tokens)
+    return result.text, result.compact_tokens
+
+def estimate_prompt_tokens(meta: Dict, compiled: CompiledTemplate, compact_tokens: int = None) -> Optional[int]:
+    """템플릿 고정 토큰 + 로그 토큰 수 (압축했으면 압축 후 토큰 수, 아니면 메타의 윈도우 토큰 수)
+    
+    둘 다 없으면 None - 프롬프트를 직접 세야 함
+    """
+    content_tokens = compact_tokens if compact_tokens is not None else meta.get("window_tokens")
+    if content_tokens is None:
+        return None
+    return compiled.overhead_tokens + content_tokens
+
+def _analyze_within_budget(window_text: str, meta: Dict, analysis_types: List[AnalysisType],
+                           layout: PromptLayout = None, output_format: OutputFormat = None,
+                           depth: int = 0, budget_decision: BudgetDecision = None) -> List[ChatResult]:
+    """컨텍스트 예산 안에서 분석 - max_tokens를 줄이거나 윈도우를 반씩 나눠 요청 결과 목록 반환
+    
+    analysis_types가 여러 개면 각 타입의 작업을 한 프롬프트에 모아 한 번에 분석한다.
+    같은 프롬프트로 이미 계산한 budget_decision이 있으면 토큰을 다시 세지 않는다.
+    """
+    prompt_templates = get_prompt_templates()
+    output_format = output_format or get_default_output_format()
+    # 분할한 윈도우는 메타의 윈도우 토큰 수와 맞지 않으므로 다시 셈
+    window_tokens = meta.get("window_tokens") if depth == 0 else None
+    prompt_text, compact_tokens = compact_window_text(window_text, window_tokens)
+    compiled = prompt_templates.get_multi_label_template(analysis_types, layout, output_format,
+                                                         compact_tokens is not None)
+    system_prompt, user_prompt = render_prompts(compiled, prompt_text, meta)
+    config = prompt_templates.get_multi_label_config(analysis_types, output_format)
+    window_label = f"윈도우 {meta.get('window_index', 0) + 1}" + (f" (분할 깊이 {depth})" if depth else "")
+    
+    if PREFLIGHT_TOKEN_CHECK:
+        decision = budget_decision
+        if decision is None:
+            estimated_tokens = None
+            if depth == 0 or compact_tokens is not None:
+                estimated_tokens = estimate_prompt_tokens(meta, compiled, compact_tokens)
+            decision = get_token_budget_planner().plan(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                config["max_tokens"],
+                estimated_tokens
+            )
+        count_label = "" if decision.exact else "추정 "
+        if decision.action == BudgetAction.CLAMP:
+            print(f"✂️ {window_label}: 프롬프트 {count_label}{decision.prompt_tokens}토큰 - "
+                  f"max_tokens {decision.requested_max_tokens} -> {decision.max_tokens}")
+            config = {**config, "max_tokens": decision.max_tokens}
+        elif decision.action == BudgetAction.SPLIT:
+            parts = split_window_text(window_text)
+            if all(part.strip() for part in parts):
+                print(f"🪓 {window_label}: 프롬프트 {count_label}{decision.prompt_tokens}토큰, "
+                      f"응답 여유 {decision.max_tokens}토큰 - 윈도우를 2개로 나눠 분석")
+                analyses = []
+                for part in parts:
+                    analyses.extend(_analyze_within_budget(part, meta, analysis_types, layout, output_format, depth + 1))
+                return analyses
+            # 더 나눌 수 없으면 남은 공간으로라도 요청
+            print(f"⚠️ {window_label}: 더 이상 나눌 수 없음 - max_tokens {decision.requested_max_tokens} -> {max(1, decision.max_tokens)}")
+            config = {**config, "max_tokens": max(1, decision.max_tokens)}
+    
+    extra = get_structured_output_params() if output_format == OutputFormat.JSON else {}
+    return [get_llm_client().chat_result(system_prompt, user_prompt, config, **extra)]
+
+def build_result_record(meta: Dict, analyses: List[str], analysis_type: AnalysisType,
+                        output_format: OutputFormat = None) -> Dict:
+    """분석 응답으로 결과 레코드 생성
+    
+    JSON 출력 형식이면 응답을 StructuredAnalysis로 변환해 structured 필드에 저장하고,
+    분할 분석 결과는 하나로 병합한다. 변환에 실패하면 응답 원문만 저장한다.
+    """
+    if len(analyses) > 1:
+        meta = {**meta, "split_parts": len(analyses)}
+    
+    if (output_format or get_default_output_format()) == OutputFormat.JSON:
+        with get_pipeline_timer().stage("parse"):
+            parsed = [parse_structured_analysis(analysis) for analysis in analyses]
+        if all(parsed):
+            structured = parsed[0] if len(parsed) == 1 else merge_structured_analyses(parsed)
+            return {
+                "meta": meta,
+                "analysis": structured.to_json(),
+                "analysis_type": analysis_type.value,
+                "structured": structured.to_dict()
+            }
+        print(f"⚠️ 윈도우 {meta.get('window_index', 0) + 1}: JSON 응답 파싱 실패 - 원문 저장")
+    
+    if len(analyses) == 1:
+        content = analyses[0]
+    else:
+        content = "\n\n".join(
+            f"#### 분할 {i}/{len(analyses)}\n{analysis}" for i, analysis in enumerate(analyses, 1)
+        )
+    return {
+        "meta": meta, 
+        "analysis": content,
+        "analysis_type": analysis_type.value
+    }
+
+def get_usage_summary(results: List[ChatResult]) -> Dict:
+    """윈도우 하나의 요청 usage 합계 (분할 분석이면 여러 요청의 합)
+    
+    max_completion_tokens는 요청 하나의 최대 생성 토큰, truncated는 max_tokens에 걸려 잘린 요청 수.
+    """
+    return {
+        "prompt_tokens": sum(result.prompt_tokens for result in results),
+        "completion_tokens": sum(result.completion_tokens for result in results),
+        "latency": sum(result.latency for result in results),
+        "requests": len(results),
+        "max_completion_tokens": max((result.completion_tokens for result in results), default=0),
+        "truncated": sum(1 for result in results if result.finish_reason == "length")
+    }
+
+def call_llm(window_text: str, meta: Dict, analysis_type: AnalysisType = None, layout: PromptLayout = None,
+             output_format: OutputFormat = None, budget_decision: BudgetDecision = None) -> Dict:
+    """LLM 호출 함수 - 새로운 프롬프트 템플릿 사용
+    
+    요청 전 프롬프트 토큰을 계산해 컨텍스트를 넘지 않도록 max_tokens를 줄이거나 윈도우를 나눈다.
+    나눠서 분석한 경우 결과를 하나로 합치고 meta에 split_parts를 기록한다.
+    budget_decision은 같은 윈도우/타입으로 이미 계산한 예산 점검 결과 (배치에서 빠진 윈도우용).
+    """
     # 프롬프트 템플릿 가져오기
     prompt_templates = get_prompt_templates()
     
@@ -34,45 +241,430 @@ def call_llm(window_text: str, meta: Dict, analysis_type: AnalysisType = None) -
     if analysis_type is None:
         analysis_type = prompt_templates.detect_analysis_type(window_text)
     
-    # 시스템 프롬프트와 사용자 프롬프트 생성
-    system_prompt = prompt_templates.get_system_prompt(analysis_type)
-    user_prompt = prompt_templates.get_user_prompt(
-        analysis_type,
-        service=meta.get('service', '[unknown]'),
-        host=meta.get('host', '[unknown]'),
-        time_range=meta.get('time_range', '[unknown]'),
-        severity=meta.get('severity', '[unknown]'),
-        log_content=window_text
-    )
+    results = _analyze_within_budget(window_text, meta, [analysis_type], layout, output_format,
+                                     budget_decision=budget_decision)
+    record = build_result_record(meta, [result.content for result in results], analysis_type, output_format)
+    record["usage"] = get_usage_summary(results)
+    return record
+
+def call_llm_multi_label(window_text: str, meta: Dict, analysis_types: List[AnalysisType],
+                         layout: PromptLayout = None) -> Dict:
+    """여러 분석 타입의 작업을 한 요청으로 분석 (서술형 출력)
     
-    # 분석 설정 가져오기
-    config = prompt_templates.get_analysis_config(analysis_type)
+    응답 원문은 analysis에, 타입별로 나눈 섹션은 sections에 저장한다.
+    analysis_type은 점수가 가장 높은 타입이며 사용량도 이 타입으로 집계된다.
+    """
+    results = _analyze_within_budget(window_text, meta, analysis_types, layout, OutputFormat.MARKDOWN)
+    analyses = [result.content for result in results]
+    record = build_result_record(meta, analyses, analysis_types[0], OutputFormat.MARKDOWN)
+    sections = {}
+    for analysis in analyses:
+        for name, content in split_multi_label_response(analysis, analysis_types).items():
+            sections[name] = (sections[name] + "\n\n" + content) if name in sections else content
+    record["analysis_types"] = [analysis_type.value for analysis_type in analysis_types]
+    record["sections"] = sections
+    record["usage"] = get_usage_summary(results)
+    return record
+
+class BatchAnalysisError(Exception):
+    """배치 중 일부 윈도우만 실패 - 성공한 레코드(실패한 자리는 None)와 윈도우별 예외를 함께 전달"""
     
-    payload = {
-        "model": MODEL,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        "temperature": config["temperature"],
-        "max_tokens": config["max_tokens"],
+    def __init__(self, records: List[Optional[Dict]], errors: List[Exception]):
+        super().__init__(f"{len(errors)}개 윈도우 분석 실패: {errors[0]}")
+        self.records = records
+        self.errors = errors
+
+def call_llm_batch(items: List[Tuple[str, Dict]], analysis_type: AnalysisType = None,
+                   layout: PromptLayout = None, output_format: OutputFormat = None) -> List[Dict]:
+    """여러 윈도우를 /v1/completions 한 요청으로 묶어 분석
+    
+    items는 (윈도우 텍스트, 메타) 목록이며 결과는 같은 순서로 반환한다.
+    분석 타입마다 temperature/max_tokens가 다르므로 타입별로 나눠 요청하고,
+    요청 실패나 응답 누락 시 해당 윈도우만 call_llm으로 개별 재시도한다.
+    개별 재시도까지 실패한 윈도우가 있으면 나머지 결과를 담아 BatchAnalysisError를 발생시킨다.
+    """
+    prompt_templates = get_prompt_templates()
+    client = get_llm_client()
+    output_format = output_format or get_default_output_format()
+    extra = get_structured_output_params() if output_format == OutputFormat.JSON else {}
+    results = [None] * len(items)
+    errors = []
+    
+    def analyze_single(position: int, window_type: AnalysisType, budget_decision: BudgetDecision = None):
+        window_text, meta = items[position]
+        try:
+            results[position] = call_llm(window_text, meta, window_type, layout, output_format, budget_decision)
+        except Exception as e:
+            print(f"❌ 윈도우 {meta.get('window_index', position) + 1} 분석 실패: {e}")
+            errors.append(e)
+    
+    # 분석 타입별로 그룹화
+    groups = {}
+    for position, (window_text, meta) in enumerate(items):
+        window_type = analysis_type or prompt_templates.detect_analysis_type(window_text)
+        groups.setdefault(window_type, []).append(position)
+    
+    for window_type, positions in groups.items():
+        config = prompt_templates.get_analysis_config(window_type, output_format)
+        conversations = []
+        batch_positions = []
+        for position in positions:
+            window_text, meta = items[position]
+            prompt_text, compact_tokens = compact_window_text(window_text, meta.get("window_tokens"))
+            compiled = prompt_templates.get_compiled_template(window_type, layout, output_format,
+                                                              compact_tokens is not None)
+            system_prompt, user_prompt = render_prompts(compiled, prompt_text, meta)
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ]
+            # 배치 요청은 max_tokens가 하나뿐이므로 예산을 넘는 윈도우는 개별 요청에서 조정 (점검 결과 재사용)
+            if PREFLIGHT_TOKEN_CHECK:
+                decision = get_token_budget_planner().plan(
+                    messages, config["max_tokens"], estimate_prompt_tokens(meta, compiled, compact_tokens)
+                )
+                if decision.action != BudgetAction.OK:
+                    analyze_single(position, window_type, decision)
+                    continue
+            conversations.append(messages)
+            batch_positions.append(position)
+        
+        if not conversations:
+            continue
+        positions = batch_positions
+        try:
+            outputs = client.chat_batch(conversations, config, **extra)
+        except Exception as e:
+            print(f"⚠️ 배치 요청 실패 ({window_type.value}, {len(positions)}개 윈도우) - 윈도우별 요청으로 대체: {e}")
+            outputs = [None] * len(positions)
+        
+        for position, result in zip(positions, outputs):
+            if result is None:
+                analyze_single(position, window_type)
+            else:
+                results[position] = build_result_record(items[position][1], [result.content], window_type, output_format)
+                results[position]["usage"] = get_usage_summary([result])
+    
+    if errors:
+        raise BatchAnalysisError(results, errors)
+    return results
+
+def get_window_analysis_type(window: WindowResult) -> AnalysisType:
+    """윈도우 분할 시 누적한 타입 점수가 있으면 재사용하고, 없으면 (병합 윈도우 등) 본문을 다시 스캔"""
+    if window.analysis_scores is not None:
+        return top_analysis_type(window.analysis_scores)
+    return get_prompt_templates().detect_analysis_type(window.content)
+
+def is_multi_label_enabled(analysis_type: AnalysisType = None, output_format: OutputFormat = None) -> bool:
+    """여러 분석 타입을 한 요청으로 분석할지 여부 - 타입을 지정하지 않은 서술형 분석에서 MULTI_LABEL_TOP_K > 1"""
+    return analysis_type is None and MULTI_LABEL_TOP_K > 1 and \
+        (output_format or get_default_output_format()) == OutputFormat.MARKDOWN
+
+def get_window_analysis_types(window: WindowResult) -> List[AnalysisType]:
+    """윈도우에서 함께 분석할 상위 분석 타입 목록 (MULTI_LABEL_TOP_K, MULTI_LABEL_MIN_SCORE_RATIO)"""
+    scores = window.analysis_scores
+    if scores is None:
+        scores = dict(get_prompt_templates().rank_analysis_types(window.content))
+    return top_analysis_types(scores, MULTI_LABEL_TOP_K, MULTI_LABEL_MIN_SCORE_RATIO)
+
+def analyze_windows(windows: List[WindowResult], meta: Dict, analysis_type: AnalysisType = None,
+                    batch_size: int = COMPLETIONS_BATCH_SIZE, cascade_stats: CascadeStats = None,
+                    on_result: Callable[[Dict], None] = None) -> List[Dict]:
+    """윈도우 병렬 분석 후 결과 레코드를 윈도우 순서로 반환
+    
+    on_result는 윈도우 분석이 끝나는 순서대로 호출된다 (증분 저장용).
+    cascade_stats가 주어지면 트리아지로 조치가 필요한 윈도우만 전체 분석하고 비용을 집계한다.
+    일부 윈도우가 실패하면 나머지를 모두 처리한 뒤 첫 번째 예외를 다시 발생시킨다.
+    """
+    def get_window_meta(window):
+        return {
+            **meta, 
+            "window_index": window.window_index, 
+            "total_windows": window.total_windows,
+            "window_tokens": window.token_count,
+            "window_lines": window.end_line - window.start_line + 1
+        }
+
+    # 윈도우별 분석 타입/우선순위 (심각한 윈도우부터 처리)
+    # 여러 타입을 함께 분석하면 점수가 가장 높은 타입이 우선순위/집계 기준
+    window_labels = {}
+    if is_multi_label_enabled(analysis_type):
+        window_labels = {window.window_index: get_window_analysis_types(window) for window in windows}
+        window_types = {index: labels[0] for index, labels in window_labels.items()}
+    else:
+        window_types = {
+            window.window_index: analysis_type or get_window_analysis_type(window)
+            for window in windows
+        }
+    window_priorities = {
+        window.window_index: get_window_priority(window.content, window_types[window.window_index])
+        for window in windows
     }
+
+    triage = cascade_stats is not None
+
+    def analyze_window(window):
+        window_meta = get_window_meta(window)
+        window_type = window_types[window.window_index]
+        if triage:
+            decision = get_triage_classifier().classify(window.content, window_meta)
+            cascade_stats.record_triage(decision)
+            if not decision.actionable:
+                print(f"⏭️ 윈도우 {window.window_index + 1}/{window.total_windows} 분석 생략 (트리아지 P(yes)={decision.score:.2f})")
+                return [build_skipped_record(window_meta, decision)]
+            # 분석 타입을 지정하지 않았으면 트리아지가 고른 타입으로 분석
+            window_type = analysis_type or decision.analysis_type
+        labels = window_labels.get(window.window_index, [])
+        if len(labels) > 1:
+            # 키워드로 고른 여러 타입을 함께 분석 (트리아지가 고른 타입보다 우선)
+            print(f"🔍 윈도우 {window.window_index + 1}/{window.total_windows} 분석 중... "
+                  f"({window.token_count}토큰, {'+'.join(label.value for label in labels)})")
+            record = call_llm_multi_label(window.content, window_meta, labels)
+        else:
+            print(f"🔍 윈도우 {window.window_index + 1}/{window.total_windows} 분석 중... ({window.token_count}토큰)")
+            record = call_llm(window.content, window_meta, window_type)
+        if triage:
+            record["triage"] = decision.to_dict()
+            cascade_stats.record_analysis(record.get("usage"))
+        return [record]
+
+    def analyze_batch(batch):
+        items = [(window.content, get_window_meta(window)) for window in batch]
+        records = [None] * len(batch)
+        errors = []
+        positions = list(range(len(batch)))
+        if triage:
+            decisions = get_triage_classifier().classify_batch(items)
+            for position, decision in enumerate(decisions):
+                cascade_stats.record_triage(decision)
+                if not decision.actionable:
+                    records[position] = build_skipped_record(items[position][1], decision)
+            positions = [position for position, decision in enumerate(decisions) if decision.actionable]
+            print(f"🚦 트리아지: 배치 {len(batch)}개 중 {len(positions)}개 분석 대상")
+
+        # 여러 타입을 함께 분석하는 윈도우는 프롬프트가 달라 배치에서 빼고 개별 요청
+        for position in positions:
+            window = batch[position]
+            labels = window_labels.get(window.window_index, [])
+            if len(labels) <= 1:
+                continue
+            print(f"🔍 윈도우 {window.window_index + 1}/{window.total_windows} 분석 중... "
+                  f"({window.token_count}토큰, {'+'.join(label.value for label in labels)})")
+            try:
+                records[position] = call_llm_multi_label(window.content, items[position][1], labels)
+            except Exception as e:
+                print(f"❌ 윈도우 {window.window_index + 1} 분석 실패: {e}")
+                errors.append(e)
+                continue
+            if triage:
+                records[position]["triage"] = decisions[position].to_dict()
+                cascade_stats.record_analysis(records[position].get("usage"))
+        positions = [position for position in positions
+                     if records[position] is None and len(window_labels.get(batch[position].window_index, [])) <= 1]
+
+        # 트리아지가 고른(트리아지 미사용이면 윈도우 분할 때 감지해 둔) 분석 타입별로 나눠 요청
+        groups = {}
+        for position in positions:
+            group_type = analysis_type or (decisions[position].analysis_type if triage
+                                           else window_types[batch[position].window_index])
+            groups.setdefault(group_type, []).append(position)
+        for group_type, group_positions in groups.items():
+            print(f"🔍 윈도우 {len(group_positions)}개 배치 분석 중... "
+                  f"({', '.join(str(batch[position].window_index + 1) for position in group_positions)}/{batch[0].total_windows}, "
+                  f"{sum(batch[position].token_count for position in group_positions)}토큰)")
+            try:
+                analyzed = call_llm_batch([items[position] for position in group_positions], group_type)
+            except BatchAnalysisError as e:
+                # 실패한 윈도우만 빼고 나머지 결과는 유지
+                analyzed = e.records
+                errors.extend(e.errors)
+            for position, record in zip(group_positions, analyzed):
+                if record is None:
+                    continue
+                if triage:
+                    record["triage"] = decisions[position].to_dict()
+                    cascade_stats.record_analysis(record.get("usage"))
+                records[position] = record
+        if errors:
+            raise BatchAnalysisError(records, errors)
+        return records
+
+    if batch_size > 0:
+        # 우선순위가 비슷한 윈도우끼리 배치로 묶음
+        ordered = sorted(windows, key=lambda window: -window_priorities[window.window_index])
+        batches = [ordered[i:i + batch_size] for i in range(0, len(ordered), batch_size)]
+        tasks = [(analyze_batch, batch, batch) for batch in batches]
+    else:
+        tasks = [(analyze_window, window, [window]) for window in windows]
+
+    # map: 윈도우 병렬 분석, 완료되는 순서대로 on_result 호출
+    # 우선순위 큐에서 적응형 동시성 한도만큼만 꺼내 실행하므로 대기 중에는 우선순위(+에이징) 순서가 유지됨
+    # 실행기는 프로세스 전체가 공유 - 동시에 들어온 다른 트리거의 윈도우와도 우선순위로 경쟁
+    client = get_llm_client()
+    executor = get_priority_executor()
+    wait_times = defaultdict(list)
+    futures = []
+    for task, arg, task_windows in tasks:
+        lead = max(task_windows, key=lambda window: window_priorities[window.window_index])
+        futures.append(executor.submit(
+            task, arg,
+            priority=window_priorities[lead.window_index],
+            priority_class=window_types[lead.window_index].value,
+            wait_times=wait_times
+        ))
+    records = []
+    failures = []
     
-    r = requests.post(f"{OPENAI_BASE}/chat/completions", json=payload, timeout=config["timeout"])
-    r.raise_for_status()
-    data = r.json()
-    content = data["choices"][0]["message"]["content"]
+    def collect(task_records):
+        for record in task_records:
+            if record is None:
+                continue
+            records.append(record)
+            if on_result:
+                on_result(record)
     
+    for future in concurrent.futures.as_completed(futures):
+        try:
+            collect(future.result())
+        except BatchAnalysisError as e:
+            # 배치 중 실패한 윈도우만 빼고 성공한 결과는 저장
+            collect(e.records)
+            failures.extend(e.errors)
+        except Exception as e:
+            # 실패한 윈도우는 건너뛰고 나머지 결과는 계속 처리
+            print(f"❌ 윈도우 분석 실패: {e}")
+            failures.append(e)
+
+    print_wait_stats(summarize_wait_times(wait_times))
+    limiter_metrics = client.get_metrics()
+    print(f"🎚️ 동시성 한도: {limiter_metrics['concurrency_limit']} "
+          f"(범위 {limiter_metrics['min_limit']}-{limiter_metrics['max_limit']}, "
+          f"증가 {limiter_metrics['increases']}회, 감소 {limiter_metrics['decreases']}회, 과부하 {limiter_metrics['overloads']}회)")
+    if len(limiter_metrics["endpoints"]) > 1:
+        for endpoint in limiter_metrics["endpoints"]:
+            p50 = f"{endpoint['latency_p50']:.2f}s" if endpoint["latency_p50"] is not None else "N/A"
+            print(f"   🖥️ {endpoint['url']}: {'정상' if endpoint['healthy'] else '제외'}, "
+                  f"요청 {endpoint['requests']}개, 오류 {endpoint['errors']}개, p50 {p50}")
+
+    if cascade_stats:
+        print_cascade_report(cascade_stats.get_report())
+
+    if failures:
+        print(f"⚠️ {len(failures)}개 윈도우 분석 실패")
+        raise failures[0]
+    return sorted(records, key=lambda record: record["meta"].get("window_index", 0))
+
+def get_lines_time_range(lines: List[str]) -> str:
+    """로그 라인의 첫/마지막 타임스탬프 범위 - 같은 로그 묶음이면 항상 같은 값
+
+    처리 시각을 넣으면 같은 인시던트로 동시에 들어온 트리거의 프롬프트가 달라져 single-flight로 합쳐지지 않는다.
+    """
+    timestamps = [entry["timestamp"] for entry in get_log_parser().parse_lines(lines)[0]]
+    if not timestamps:
+        return "[unknown]"
+    return f"{min(timestamps):%Y-%m-%d %H:%M:%S}~{max(timestamps):%Y-%m-%d %H:%M:%S}"
+
+def analyze_lines(lines: List[str], meta: Dict, analysis_type: AnalysisType = None,
+                  batch_size: int = COMPLETIONS_BATCH_SIZE, triage: bool = ENABLE_TRIAGE,
+                  analysis_scores: Dict[AnalysisType, float] = None) -> List[Dict]:
+    """로그 라인을 프로세스 안에서 바로 분석해 윈도우별 결과 레코드 반환 (파일 저장/체크포인트 없음)
+    
+    모니터/자동 분석처럼 짧은 로그 묶음을 반복 분석하는 호출자용 - 토크나이저와 HTTP 연결을 재사용한다.
+    analysis_scores는 호출자가 라인을 읽을 때 IncrementalTypeDetector로 누적한 lines 전체의 타입 점수로,
+    윈도우가 하나면 라인을 다시 스캔하지 않고 그대로 사용한다 (여러 윈도우면 윈도우별로 다시 스캔).
+    """
+    lines = [line.rstrip('\n\r') for line in lines]
+    # 호출자가 준 점수가 있으면 분할하면서 라인을 다시 스캔하지 않음
+    windows = get_sliding_window().create_windows(lines, track_analysis_types=analysis_scores is None)
+    if not windows:
+        return []
+    if analysis_scores is not None and len(windows) == 1:
+        windows[0].analysis_scores = dict(analysis_scores)
+    meta = {**meta, "time_range": meta.get("time_range") or get_lines_time_range(lines)}
+    return analyze_windows(windows, meta, analysis_type, batch_size, CascadeStats() if triage else None)
+
+def analyze_file(log_path: str, meta: Dict, analysis_type: AnalysisType = None,
+                 batch_size: int = COMPLETIONS_BATCH_SIZE, triage: bool = ENABLE_TRIAGE) -> List[Dict]:
+    """로그 파일을 프로세스 안에서 바로 분석해 윈도우별 결과 레코드 반환 (저장/재개가 필요하면 main 사용)"""
+    with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.readlines()
+    return analyze_lines(lines, meta, analysis_type, batch_size, triage)
+
+def get_window_config_key(config: WindowConfig) -> Dict:
+    """체크포인트 키에 사용할 윈도우 설정 값"""
     return {
-        "meta": meta, 
-        "analysis": content,
-        "analysis_type": analysis_type.value
+        "max_tokens": config.max_tokens,
+        "overlap_ratio": config.overlap_ratio,
+        "min_tokens": config.min_tokens,
+        "tokenizer_type": config.tokenizer_type.value,
+        "encoding_name": config.encoding_name
+    }
+
+def get_digest_path(out_path: str) -> str:
+    """출력 경로에 대응하는 인시던트 다이제스트 경로 반환"""
+    return os.path.splitext(out_path)[0] + "_digest.json"
+
+def get_triage_report_path(out_path: str) -> str:
+    """출력 경로에 대응하는 트리아지 절감량 리포트 경로 반환"""
+    return os.path.splitext(out_path)[0] + "_triage.json"
+
+def build_skipped_record(meta: Dict, decision) -> Dict:
+    """트리아지에서 조치 불필요로 판별된 윈도우 레코드 (analysis가 비어 있어 다이제스트에서 제외됨)"""
+    return {
+        "meta": meta,
+        "analysis": "",
+        "analysis_type": decision.analysis_type.value,
+        "triage": decision.to_dict()
     }
 
-def main(log_path: str, out_path: str, meta: Dict, analysis_type: AnalysisType = None):
-    """메인 파이프라인 함수 - 새로운 모듈 사용"""
+def get_timing_report_path(out_path: str) -> str:
+    """출력 경로에 대응하는 단계별 시간 리포트 경로 반환"""
+    return os.path.splitext(out_path)[0] + "_timing.json"
+
+def get_usage_report_path(out_path: str) -> str:
+    """출력 경로에 대응하는 LLM 사용량 리포트 경로 반환"""
+    return os.path.splitext(out_path)[0] + "_usage.json"
+
+def save_usage_report(out_path: str, run_stats: UsageStats, wall_seconds: float, output_format: OutputFormat = None):
+    """결과 파일 전체(재개 이전 윈도우 포함)의 사용량과 이번 실행 처리량을 출력하고 JSON 저장
+    
+    output_format은 이번 실행의 출력 형식 (분석 타입별 설정 max_tokens 비교 기준)
+    """
+    file_stats = UsageStats()
+    file_stats.add_records(iter_jsonl_records(get_jsonl_path(out_path)))
+    report = file_stats.get_report(output_format or get_default_output_format())
+    run = get_run_throughput(run_stats, wall_seconds)
+    print_usage_report(report, run)
+    with open(get_usage_report_path(out_path), "w", encoding="utf-8") as f:
+        json.dump({"model": MODEL, "run": run, **report}, f, ensure_ascii=False, indent=2)
+
+def save_timing_report(out_path: str):
+    """단계별 시간 리포트 출력 및 JSON 저장 (PIPELINE_TIMING=false면 생략)"""
+    timer = get_pipeline_timer()
+    if not timer.enabled:
+        return
+    report = timer.get_report()
+    print_timing_report(report)
+    with open(get_timing_report_path(out_path), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+def main(log_path: str, out_path: str, meta: Dict, analysis_type: AnalysisType = None, resume: bool = True,
+         digest: bool = ENABLE_INCIDENT_DIGEST, batch_size: int = COMPLETIONS_BATCH_SIZE, triage: bool = ENABLE_TRIAGE):
+    """메인 파이프라인 함수 - 윈도우 병렬 분석(map) 후 인시던트 다이제스트(reduce) 생성
+    
+    윈도우별 결과는 JSONL로 증분 저장하고 중단 지점부터 재개한다.
+    batch_size > 0이면 윈도우 batch_size개를 /v1/completions 한 요청으로 묶어 보낸다.
+    triage가 켜져 있으면 짧은 분류 요청으로 조치가 필요한 윈도우만 골라 전체 분석한다.
+    PIPELINE_TIMING이 켜져 있으면 종료 시 단계별 시간 리포트를 출력하고 저장한다.
+    윈도우 분석의 LLM 사용량은 분석 타입/서비스별로 집계해 <출력>_usage.json에 저장한다.
+    """
+    timer = get_pipeline_timer()
+    timer.reset()
+    started = time.perf_counter()
+    output_format = get_default_output_format()
+
     # 슬라이딩 윈도우 생성
-    sliding_window = create_sliding_window(WINDOW_CONFIG)
+    sliding_window = get_sliding_window()
     windows = sliding_window.create_windows_from_file(log_path)
     
     if not windows:
@@ -83,30 +675,93 @@ def main(log_path: str, out_path: str, meta: Dict, analysis_type: AnalysisType =
     stats = sliding_window.get_window_stats(windows)
     print(f"📊 윈도우 통계: {stats['total_windows']}개 윈도우, {stats['total_tokens']}개 토큰")
     
-    results = []
+    # 체크포인트 키: (파일 지문, 윈도우 설정, 프롬프트 버전)
+    # 여러 타입을 함께 분석한 결과는 레코드 형식이 달라, 다중 분석 타입 설정이 바뀌면 프롬프트 버전도 바뀜
+    multi_label = is_multi_label_enabled(analysis_type, output_format)
+    key_info = {
+        "file_fingerprint": compute_file_fingerprint(log_path),
+        "window_config": get_window_config_key(WINDOW_CONFIG),
+        "prompt_version": get_prompt_templates().get_prompt_version(
+            compact=LOG_COMPACTION,
+            multi_label_top_k=MULTI_LABEL_TOP_K if multi_label else 1,
+            multi_label_min_score_ratio=MULTI_LABEL_MIN_SCORE_RATIO
+        ),
+        "prompt_layout": get_default_layout().value,
+        "output_format": output_format.value,
+        "analysis_type": analysis_type.value if analysis_type else "auto",
+        "model": MODEL,
+        "triage_model": TRIAGE_MODEL if triage else None
+    }
+    checkpoint_key = make_checkpoint_key(
+        key_info["file_fingerprint"],
+        key_info["window_config"],
+        key_info["prompt_version"],
+        analysis_type=key_info["analysis_type"],
+        model=MODEL,
+        # 트리아지를 켠 실행은 생략된 윈도우가 있으므로 끈 실행과 체크포인트를 공유하지 않음
+        **({"triage_model": TRIAGE_MODEL} if triage else {})
+    )
+    jsonl_path = get_jsonl_path(out_path)
+    checkpoint = AnalysisCheckpoint(jsonl_path, checkpoint_key, key_info)
+    completed_windows = checkpoint.begin(resume=resume)
+    if completed_windows:
+        print(f"♻️ 체크포인트 재개: {len(completed_windows)}/{len(windows)}개 윈도우 완료됨, 나머지부터 진행")
+    
     # 시간범위 메타 추출
     now = datetime.utcnow().isoformat() + "Z"
     meta = {**meta, "time_range": meta.get("time_range", f"processed_at={now}")}
 
-    for window in windows:
-        window_meta = {
-            **meta, 
-            "window_index": window.window_index, 
-            "total_windows": window.total_windows,
-            "window_tokens": window.token_count,
-            "window_lines": window.end_line - window.start_line + 1
-        }
-        
-        print(f"🔍 윈도우 {window.window_index + 1}/{window.total_windows} 분석 중... ({window.token_count}토큰)")
-        res = call_llm(window.content, window_meta, analysis_type)
-        results.append(res)
-        
-        # 백프레셔 방지
-        time.sleep(0.1)
+    pending_windows = [window for window in windows if window.window_index not in completed_windows]
+
+    # prefix caching 배치일 때 분석 타입별 공통 prefix를 미리 캐시
+    if pending_windows and PREFIX_CACHE_WARMUP and get_default_layout() == PromptLayout.PREFIX_CACHE:
+        warmup_prefix_cache(meta, [analysis_type] if analysis_type else None)
+
+    cascade_stats = CascadeStats() if triage else None
+    run_stats = UsageStats()
+    try:
+        with JsonlResultWriter(jsonl_path).open() as writer:
+            def write_record(record):
+                run_stats.add_record(record)
+                with timer.stage("write"):
+                    writer.write(record)
+
+            analyze_windows(pending_windows, meta, analysis_type, batch_size, cascade_stats, on_result=write_record)
+    except Exception:
+        print("⚠️ 같은 작업을 다시 실행하면 실패한 윈도우부터 재개합니다")
+        # 리포트 저장 오류가 원래 예외를 가리지 않도록 따로 처리
+        try:
+            save_usage_report(out_path, run_stats, time.perf_counter() - started, output_format)
+            save_timing_report(out_path)
+        except Exception as report_error:
+            print(f"⚠️ 사용량/시간 리포트 저장 실패: {report_error}")
+        raise
+    finally:
+        if cascade_stats:
+            with open(get_triage_report_path(out_path), "w", encoding="utf-8") as f:
+                json.dump({"triage_model": TRIAGE_MODEL, "analysis_model": MODEL, **cascade_stats.get_report()},
+                          f, ensure_ascii=False, indent=2)
+
+    checkpoint.finish()
+    if jsonl_path != out_path:
+        with timer.stage("write"):
+            export_json_array(jsonl_path, out_path)
+    print(f"✅ 저장 완료: {out_path} (윈도우={len(windows)}, JSONL={jsonl_path})")
+    save_usage_report(out_path, run_stats, time.perf_counter() - started, output_format)
+
+    # reduce: 윈도우 분석 결과를 하나의 인시던트 다이제스트로 요약
+    if digest:
+        with timer.stage("digest"):
+            incident_digest = build_incident_digest(iter_jsonl_records(jsonl_path), service=meta.get("service", "[unknown]"))
+        if incident_digest:
+            digest_path = get_digest_path(out_path)
+            with open(digest_path, "w", encoding="utf-8") as f:
+                json.dump(incident_digest, f, ensure_ascii=False, indent=2)
+            print(f"🧾 인시던트 다이제스트 저장: {digest_path} "
+                  f"(분석 {incident_digest['input_analyses']}개, 레벨 {incident_digest['reduce_levels']}, "
+                  f"LLM 호출 {incident_digest['llm_calls']}회)")
 
-    with open(out_path, "w") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
-    print(f"✅ 저장 완료: {out_path} (윈도우={len(windows)})")
+    save_timing_report(out_path)
 
 if __name__ == "__main__":
     # 사용 예
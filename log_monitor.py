@@ -7,12 +7,15 @@ import os
 import time
 import json
 import threading
-import subprocess
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import re
 from collections import defaultdict, deque
 
+from log_llm_pipeline import analyze_lines
+from log_parser import get_log_parser
+from prompt_templates import IncrementalTypeDetector
+from metrics_exporter import ComponentMetrics, start_metrics_exporter, stop_metrics_exporter
+
 class LogMonitor:
     def __init__(self, log_file: str = "realtime.log"):
         self.log_file = log_file
@@ -44,25 +47,17 @@ class LogMonitor:
             "critical_count": 5,  # 5개 이상 크리티컬
             "analysis_trigger": 20  # 20개 이상 새 로그
         }
+        
+        # Prometheus 지표 (METRICS_PORT/METRICS_TEXTFILE 설정 시 노출)
+        self.metrics = ComponentMetrics("log_monitor")
+        self.logs_since_analysis = 0
+        
+        # 최근 window_size개 라인의 분석 타입 점수 - 읽을 때 새 라인만 스캔해 분석 시 다시 스캔하지 않음
+        self.type_detector = IncrementalTypeDetector()
     
     def parse_log_line(self, line: str) -> Optional[Dict]:
-        """로그 라인 파싱"""
-        # 형식: YYYY-MM-DD HH:MM:SS LEVEL [SERVICE] MESSAGE
-        pattern = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (\w+) \[(\w+)\] (.+)'
-        match = re.match(pattern, line.strip())
-        
-        if match:
-            timestamp_str, level, service, message = match.groups()
-            timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-            
-            return {
-                "timestamp": timestamp,
-                "level": level,
-                "service": service,
-                "message": message,
-                "raw": line.strip()
-            }
-        return None
+        """로그 라인 파싱 (공용 파서 사용)"""
+        return get_log_parser().parse_line(line)
     
     def read_new_logs(self) -> List[Dict]:
         """새로운 로그 읽기"""
@@ -77,11 +72,18 @@ class LogMonitor:
                 lines = f.readlines()
                 self.last_position = f.tell()
             
-            for line in lines:
-                parsed = self.parse_log_line(line)
-                if parsed:
-                    new_logs.append(parsed)
-                    self.recent_logs.append(parsed)
+            new_logs, failures = get_log_parser().parse_lines(lines)
+            levels = defaultdict(int)
+            for parsed in new_logs:
+                self.recent_logs.append(parsed)
+                levels[parsed["level"]] += 1
+            if new_logs:
+                self.type_detector.add_text("\n".join(parsed["raw"] for parsed in new_logs))
+                self.type_detector.keep_last(self.window_size)
+            
+            self.metrics.record_lines(len(lines), failures, levels)
+            self.logs_since_analysis += len(new_logs)
+            self.metrics.pending_lines.set(self.logs_since_analysis, component="log_monitor")
             
         except Exception as e:
             print(f"❌ 로그 읽기 오류: {e}")
@@ -102,86 +104,57 @@ class LogMonitor:
     
     def should_analyze(self, new_logs: List[Dict]) -> bool:
         """분석 필요 여부 확인"""
+        return self.get_trigger_reason(new_logs) is not None
+    
+    def get_trigger_reason(self, new_logs: List[Dict]) -> Optional[str]:
+        """분석 트리거 사유 (분석이 필요 없으면 None)"""
         # 새 로그가 충분히 쌓였거나
         if len(new_logs) >= self.thresholds["analysis_trigger"]:
-            return True
+            return "volume"
         
         # 에러율이 임계값을 넘었거나
         if len(new_logs) > 0:
             error_count = sum(1 for log in new_logs if log["level"] in ["ERROR", "CRITICAL"])
             error_rate = error_count / len(new_logs)
             if error_rate >= self.thresholds["error_rate"]:
-                return True
+                return "error_rate"
         
         # 크리티컬 로그가 임계값을 넘었거나
         critical_count = sum(1 for log in new_logs if log["level"] == "CRITICAL")
         if critical_count >= self.thresholds["critical_count"]:
-            return True
+            return "critical_count"
         
         # 주기적 분석 (30초마다)
         if self.stats["last_analysis"] is None:
-            return True
+            return "initial"
         
         elapsed = (datetime.now() - self.stats["last_analysis"]).total_seconds()
         if elapsed >= self.analysis_interval:
-            return True
+            return "interval"
         
-        return False
+        return None
     
     def run_analysis(self, logs: List[Dict]) -> Dict:
-        """로그 분석 실행"""
+        """로그 분석 실행 - 파이프라인을 프로세스 안에서 바로 호출"""
         print(f"🔍 로그 분석 실행 중... ({len(logs)}개 로그)")
         
-        # 분석할 로그를 임시 파일로 저장
-        temp_log_file = f"temp_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        with open(temp_log_file, 'w', encoding='utf-8') as f:
-            for log in logs:
-                f.write(log["raw"] + "\n")
-        
         try:
-            # 파이프라인 스크립트 수정
-            with open("log_llm_pipeline.py", 'r') as f:
-                content = f.read()
-            
-            # 로그 파일 경로 변경
-            modified_content = content.replace(
-                'main("./scenario_1_데이터베이스_오류.log", "./analysis_results.json", meta)',
-                f'main("./{temp_log_file}", "./temp_analysis_results.json", meta)'
-            )
-            
-            temp_script = f"temp_pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.py"
-            with open(temp_script, 'w') as f:
-                f.write(modified_content)
-            
-            # 분석 실행
-            result = subprocess.run([
-                "python3", temp_script
-            ], capture_output=True, text=True, cwd=".", timeout=60)
+            meta = {"service": ",".join(sorted({log["service"] for log in logs})), "severity": "error>warning>info"}
+            # 감지기가 분석 대상과 같은 최근 라인을 들고 있을 때만 누적 점수 사용
+            scores = self.type_detector.get_scores() if len(self.type_detector) == len(logs) else None
+            records = analyze_lines([log["raw"] for log in logs], meta, analysis_scores=scores)
+            analyses = [record["analysis"] for record in records if record["analysis"]]
             
-            # 임시 파일 정리
-            os.remove(temp_script)
-            os.remove(temp_log_file)
-            
-            if result.returncode == 0:
-                # 결과 읽기
-                if os.path.exists("temp_analysis_results.json"):
-                    with open("temp_analysis_results.json", 'r', encoding='utf-8') as f:
-                        analysis_result = json.load(f)
-                    os.remove("temp_analysis_results.json")
-                    
-                    return {
-                        "success": True,
-                        "timestamp": datetime.now().isoformat(),
-                        "log_count": len(logs),
-                        "analysis": analysis_result[0]["analysis"] if analysis_result else "분석 결과 없음"
-                    }
-                else:
-                    return {"success": False, "error": "결과 파일 없음"}
-            else:
-                return {"success": False, "error": result.stderr}
-                
-        except subprocess.TimeoutExpired:
-            return {"success": False, "error": "분석 시간 초과"}
+            return {
+                "success": True,
+                "timestamp": datetime.now().isoformat(),
+                "log_count": len(logs),
+                "analysis": "\n\n".join(analyses) if analyses else "분석 결과 없음",
+                "usage": {
+                    "prompt_tokens": sum(record.get("usage", {}).get("prompt_tokens", 0) for record in records),
+                    "completion_tokens": sum(record.get("usage", {}).get("completion_tokens", 0) for record in records)
+                }
+            }
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -259,6 +232,7 @@ class LogMonitor:
         
         self.running = True
         last_status_time = time.time()
+        metrics_exporter = start_metrics_exporter()
         
         try:
             while self.running:
@@ -277,10 +251,19 @@ class LogMonitor:
                         print(alert)
                     
                     # 분석 필요 여부 확인
-                    if self.should_analyze(new_logs):
+                    reason = self.get_trigger_reason(new_logs)
+                    if reason:
                         # 최근 로그로 분석 실행
                         analysis_logs = list(self.recent_logs)[-self.window_size:]
+                        started = time.perf_counter()
                         result = self.run_analysis(analysis_logs)
+                        usage = result.get("usage", {})
+                        self.metrics.record_analysis(
+                            reason, time.perf_counter() - started, result["success"],
+                            usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+                        )
+                        self.logs_since_analysis = 0
+                        self.metrics.pending_lines.set(0, component="log_monitor")
                         
                         if result["success"]:
                             print("✅ 분석 완료")
@@ -303,6 +286,8 @@ class LogMonitor:
             print(f"\n🛑 모니터링 중단")
         finally:
             self.running = False
+            if metrics_exporter:
+                stop_metrics_exporter()
             self.print_status()
             
             # 최종 통계 저장
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+로그 라인 파서 - 실시간 모니터/자동 분석/대시보드가 공유하는 `YYYY-MM-DD HH:MM:SS LEVEL [SERVICE] MESSAGE` 파서
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 형식: YYYY-MM-DD HH:MM:SS LEVEL [SERVICE] MESSAGE
+TIMESTAMP_LENGTH = 19
+BODY_PATTERN = re.compile(r'(\w+) \[(\w+)\] (.+)')
+LOG_LINE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} ' + BODY_PATTERN.pattern)
+# 로그는 대부분 시각 순이라 최근 초 몇 천 개만 기억해도 거의 모두 캐시에서 찾음
+TIMESTAMP_CACHE_SIZE = 4096
+
+class LogParser:
+    """미리 컴파일한 정규식 + 고정 위치 타임스탬프 변환으로 로그 라인 파싱
+
+    같은 초의 타임스탬프는 캐시에서 바로 찾고, 이미 본 타임스탬프로 시작하는 라인은
+    타임스탬프 부분을 다시 검사하지 않고 나머지(레벨/서비스/메시지)만 정규식으로 나눈다.
+    """
+
+    def __init__(self, cache_size: int = TIMESTAMP_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._timestamp_cache: Dict[str, datetime] = {}
+
+    def parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
+        """`YYYY-MM-DD HH:MM:SS` 문자열을 datetime으로 변환 - 없는 날짜면 None
+
+        형식이 고정이므로 strptime(형식 문자열 해석) 대신 C로 구현된 fromisoformat을 사용한다
+        (고정 위치를 잘라 int로 바꾸는 방식보다도 10배가량 빠름).
+        """
+        timestamp = self._timestamp_cache.get(timestamp_str)
+        if timestamp is None:
+            try:
+                timestamp = datetime.fromisoformat(timestamp_str)
+            except ValueError:
+                return None
+            if len(self._timestamp_cache) >= self.cache_size:
+                self._timestamp_cache.clear()
+            self._timestamp_cache[timestamp_str] = timestamp
+        return timestamp
+
+    def parse_line(self, line: str) -> Optional[Dict]:
+        """로그 라인 하나 파싱 - 형식이 맞지 않으면 None"""
+        line = line.strip()
+        prefix = line[:TIMESTAMP_LENGTH]
+        timestamp = self._timestamp_cache.get(prefix)
+        if timestamp is not None and line[TIMESTAMP_LENGTH:TIMESTAMP_LENGTH + 1] == " ":
+            match = BODY_PATTERN.match(line, TIMESTAMP_LENGTH + 1)
+        else:
+            match = LOG_LINE_PATTERN.match(line)
+            if match is not None:
+                timestamp = self.parse_timestamp(prefix)
+        if match is None or timestamp is None:
+            return None
+
+        level, service, message = match.groups()
+        return {
+            "timestamp": timestamp,
+            "level": level,
+            "service": service,
+            "message": message,
+            "raw": line
+        }
+
+    def parse_lines(self, lines: Iterable[str]) -> Tuple[List[Dict], int]:
+        """여러 라인을 한 번에 파싱 - (파싱된 로그 목록, 형식이 맞지 않는 비어 있지 않은 라인 수)
+
+        parse_line과 같은 처리를 라인마다 메서드 호출 없이 지역 변수로 반복한다.
+        """
+        cache_get = self._timestamp_cache.get
+        parse_timestamp = self.parse_timestamp
+        match_line = LOG_LINE_PATTERN.match
+        match_body = BODY_PATTERN.match
+        entries = []
+        append = entries.append
+        failures = 0
+        for line in lines:
+            line = line.strip()
+            prefix = line[:TIMESTAMP_LENGTH]
+            timestamp = cache_get(prefix)
+            if timestamp is not None and line[TIMESTAMP_LENGTH:TIMESTAMP_LENGTH + 1] == " ":
+                match = match_body(line, TIMESTAMP_LENGTH + 1)
+            else:
+                match = match_line(line)
+                if match is not None:
+                    timestamp = parse_timestamp(prefix)
+            if match is None or timestamp is None:
+                if line:
+                    failures += 1
+                continue
+            level, service, message = match.groups()
+            append({
+                "timestamp": timestamp,
+                "level": level,
+                "service": service,
+                "message": message,
+                "raw": line
+            })
+        return entries, failures
+
+# 전역 인스턴스
+log_parser = None
+
+def get_log_parser() -> LogParser:
+    """로그 파서 인스턴스 반환"""
+    global log_parser
+    if log_parser is None:
+        log_parser = LogParser()
+    return log_parser
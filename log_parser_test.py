@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+로그 파서 테스트 스크립트 - 캐시된 타임스탬프로 시작하는 라인의 빠른 경로가 기존 정규식 + strptime 파싱과 같은지 확인
+"""
+
+import re
+import sys
+import random
+from datetime import datetime, timedelta
+
+from log_parser import LogParser
+from log_generator import LogGenerator
+
+# 공용 파서 도입 전 log_monitor/auto_analysis의 파싱 (없는 날짜는 예외 대신 None으로 비교)
+LEGACY_PATTERN = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (\w+) \[(\w+)\] (.+)'
+
+def legacy_parse_line(line: str):
+    """기존 정규식 + strptime 파싱 (비교 기준)"""
+    match = re.match(LEGACY_PATTERN, line.strip())
+    if not match:
+        return None
+    timestamp_str, level, service, message = match.groups()
+    try:
+        timestamp = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+    return {"timestamp": timestamp, "level": level, "service": service, "message": message, "raw": line.strip()}
+
+EDGE_LINES = [
+    "2025-09-12 13:35:26 ERROR [ordersvc] Database connection timeout",
+    "2025-09-12 13:35:26 INFO [gateway] same second, cached prefix",
+    "2025-09-12 13:35:26X ERROR [ordersvc] no space after cached prefix",
+    "2025-09-12 13:35:26  ERROR [ordersvc] two spaces after cached prefix",
+    "2025-09-12 13:35:26 ERROR [auth-svc] service name with a dash",
+    "2025-09-12 13:35:26 ERROR [ordersvc]",
+    "2025-09-12 13:35:26",
+    "   2025-09-12 13:35:26 WARN [gateway] leading spaces and trailing newline\n",
+    "2025-02-30 10:00:00 ERROR [ordersvc] invalid calendar date",
+    "2025-02-30 10:00:00 ERROR [ordersvc] invalid date again (not cached)",
+    "2025-9-12 13:35:26 ERROR [ordersvc] short month",
+    "Traceback (most recent call last):",
+    "",
+    "   ",
+]
+
+def check_matches_legacy(lines: list) -> bool:
+    """parse_line(캐시 유지) / 라인마다 새 파서 / parse_lines가 모두 기존 파싱과 같음"""
+    parser = LogParser()
+    legacy = [legacy_parse_line(line) for line in lines]
+    warm = [parser.parse_line(line) for line in lines]
+    cold = [LogParser().parse_line(line) for line in lines]
+    batch, failures = LogParser().parse_lines(lines)
+    expected_failures = sum(1 for line, parsed in zip(lines, legacy) if parsed is None and line.strip())
+    mismatches = [line for line, want, got in zip(lines, legacy, warm) if want != got]
+    distinct = len({line.strip()[:19] for line, parsed in zip(lines, legacy) if parsed})
+    print(f"   라인 {len(lines)}개, 파싱 {len(batch)}개, 실패 {failures}개 (기대 {expected_failures}), "
+          f"캐시 {len(parser._timestamp_cache)}개 / 서로 다른 시각 {distinct}개")
+    for line in mismatches[:3]:
+        print(f"   ❌ 불일치: {line!r}")
+    return (not mismatches and cold == legacy and batch == [parsed for parsed in legacy if parsed]
+            and failures == expected_failures and len(parser._timestamp_cache) == distinct)
+
+def check_generated_logs() -> bool:
+    """생성기 로그를 초당 20줄 버스트로 다시 찍은 라인 (대부분 캐시된 타임스탬프 경로)"""
+    random.seed(7)
+    generator = LogGenerator()
+    lines = generator.generate_large_volume_logs(2000) + generator.generate_mixed_scenario(30)
+    base_time = datetime(2025, 9, 12, 13, 35, 0)
+    lines = [
+        f"{base_time + timedelta(seconds=index // 20):%Y-%m-%d %H:%M:%S}{line[19:]}"
+        for index, line in enumerate(lines)
+    ]
+    return check_matches_legacy(lines)
+
+def check_seeded_cache() -> bool:
+    """다른 모듈(log_compactor)이 parse_timestamp로 캐시를 채운 뒤에도 라인 형식 검사는 그대로"""
+    parser = LogParser()
+    for line in EDGE_LINES:
+        parser.parse_timestamp(line.strip()[:19])
+    results = [parser.parse_line(line) for line in EDGE_LINES]
+    batch, failures = parser.parse_lines(EDGE_LINES)
+    legacy = [legacy_parse_line(line) for line in EDGE_LINES]
+    print(f"   캐시 {len(parser._timestamp_cache)}개 미리 채움, 파싱 {len(batch)}개, 실패 {failures}개")
+    return results == legacy and batch == [parsed for parsed in legacy if parsed]
+
+def check_cache_eviction() -> bool:
+    """캐시가 cache_size에 도달하면 비우고 다시 채움 (결과는 그대로)"""
+    parser = LogParser(cache_size=3)
+    lines = [f"2025-09-12 13:35:{second:02d} INFO [gateway] request {second}" for second in range(10)]
+    sizes = []
+    for line in lines + lines[:2]:
+        if parser.parse_line(line) != legacy_parse_line(line):
+            print(f"   ❌ 불일치: {line!r}")
+            return False
+        sizes.append(len(parser._timestamp_cache))
+    invalid = parser.parse_timestamp("2025-02-30 10:00:00")
+    print(f"   라인별 캐시 크기: {sizes}, 없는 날짜: {invalid}")
+    return max(sizes) <= 3 and invalid is None and "2025-02-30 10:00:00" not in parser._timestamp_cache
+
+def main():
+    print("=== 로그 파서 테스트 시작 ===\n")
+    results = {}
+
+    print("🧪 1. 경계 사례 - 기존 파싱과 비교")
+    results["경계 사례"] = check_matches_legacy(EDGE_LINES)
+
+    print("\n🧪 2. 생성기 로그 - 기존 파싱과 비교")
+    results["생성기 로그"] = check_generated_logs()
+
+    print("\n🧪 3. 미리 채운 타임스탬프 캐시")
+    results["미리 채운 캐시"] = check_seeded_cache()
+
+    print("\n🧪 4. 캐시 크기 제한")
+    results["캐시 크기"] = check_cache_eviction()
+
+    print("\n=== 테스트 결과 요약 ===")
+    for name, passed in results.items():
+        print(f"{name}: {'✅ 성공' if passed else '❌ 실패'}")
+    return all(results.values())
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+메모리 프로파일 - 윈도우 파이프라인 단계별(파일 읽기/줄바꿈 제거/윈도우 생성/결과 목록/JSON 저장) 최대 메모리와 입력 크기 대비 비율 측정
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pipeline_timing import get_pipeline_timer
+from sliding_window import SlidingWindow, WindowConfig
+from window_benchmark import parse_size, build_corpus, load_baseline
+
+def read_rss_bytes() -> Optional[int]:
+    """현재 프로세스 RSS (/proc 미지원 환경이면 None)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class RssSampler:
+    """백그라운드 스레드로 RSS를 주기적으로 읽어 현재 단계의 최대값 기록"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.stage = None
+        self.peaks = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = read_rss_bytes()
+        if rss is not None and self.stage:
+            self.peaks[self.stage] = max(self.peaks.get(self.stage, 0), rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def set_stage(self, stage: Optional[str]):
+        """단계 전환 (전환 시점에도 한 번 기록)"""
+        self._sample()
+        self.stage = stage
+        self._sample()
+
+    def start(self):
+        if read_rss_bytes() is None:
+            return self
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+class StageProfiler:
+    """단계별 tracemalloc 최대/잔존 메모리와 RSS 최대값 측정
+
+    단계 최대값은 단계 시작 시점의 할당량을 뺀 값이므로, 그 단계가 추가로 필요로 한 메모리를 뜻한다.
+    """
+
+    def __init__(self, use_tracemalloc: bool = True):
+        self.use_tracemalloc = use_tracemalloc
+        self.stages = {}
+        self.sampler = RssSampler()
+
+    def start(self):
+        if self.use_tracemalloc:
+            tracemalloc.start()
+        self.sampler.start()
+        return self
+
+    def stop(self):
+        self.sampler.stop()
+        if self.use_tracemalloc:
+            tracemalloc.stop()
+
+    def run(self, stage: str, func):
+        """단계 하나 실행 후 결과 반환"""
+        gc.collect()
+        before = None
+        if self.use_tracemalloc:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        self.sampler.set_stage(stage)
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        self.sampler.set_stage(None)
+        entry = {"seconds": elapsed, "rss_peak_bytes": self.sampler.peaks.get(stage)}
+        if self.use_tracemalloc:
+            current, peak = tracemalloc.get_traced_memory()
+            entry["peak_bytes"] = peak - before
+            entry["retained_bytes"] = current - before
+            entry["traced_peak_bytes"] = peak
+        self.stages[stage] = entry
+        return result
+
+def profile_file(log_path: str, config: WindowConfig, analysis_chars: int, use_tracemalloc: bool = True) -> Dict:
+    """create_windows_from_file과 결과 저장 경로를 단계별로 나눠 실행하며 메모리 측정
+
+    results_list/json_dump 단계는 윈도우마다 analysis_chars 글자 분석 결과가 있다고 가정한다.
+    """
+    sliding_window = SlidingWindow(config)
+    profiler = StageProfiler(use_tracemalloc).start()
+    rss_start = read_rss_bytes()
+    try:
+        def read():
+            with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.readlines()
+        lines = profiler.run("readlines", read)
+        # 원본 목록은 새 목록이 만들어진 뒤 해제되므로 두 목록이 잠시 함께 존재
+        lines = profiler.run("strip_copy", lambda: [line.rstrip('\n\r') for line in lines])
+        windows = profiler.run("window_join", lambda: sliding_window.create_windows(lines))
+        line_count = len(lines)
+        del lines
+
+        meta = {"service": "profilesvc", "host": "node-01", "severity": "error>warning>info"}
+        records = profiler.run("results_list", lambda: [
+            {
+                "meta": {**meta, "window_index": window.window_index, "total_windows": window.total_windows,
+                         "window_tokens": window.token_count, "window_lines": window.end_line - window.start_line + 1},
+                # 실제 응답처럼 윈도우마다 별도 문자열
+                "analysis": f"{window.window_index}:" + "x" * analysis_chars,
+                "analysis_type": "general"
+            }
+            for window in windows
+        ])
+
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".json", delete=False) as f:
+            out_path = f.name
+        def dump():
+            with open(out_path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False, indent=2)
+        profiler.run("json_dump", dump)
+        os.remove(out_path)
+        window_count = len(windows)
+    finally:
+        profiler.stop()
+
+    input_bytes = os.path.getsize(log_path)
+    stages = profiler.stages
+    result = {
+        "input_bytes": input_bytes,
+        "lines": line_count,
+        "windows": window_count,
+        "rss_start_bytes": rss_start,
+        "rss_peak_bytes": max((entry["rss_peak_bytes"] or 0) for entry in stages.values()) or None,
+        "stages": stages
+    }
+    if use_tracemalloc:
+        peak = max(entry["traced_peak_bytes"] for entry in stages.values())
+        result["peak_bytes"] = peak
+        result["peak_ratio"] = peak / input_bytes if input_bytes else 0.0
+        result["peak_stage"] = max(stages, key=lambda name: stages[name]["traced_peak_bytes"])
+    elif result["rss_peak_bytes"] and rss_start:
+        result["peak_bytes"] = result["rss_peak_bytes"] - rss_start
+        result["peak_ratio"] = result["peak_bytes"] / input_bytes if input_bytes else 0.0
+        result["peak_stage"] = max(stages, key=lambda name: stages[name]["rss_peak_bytes"] or 0)
+    return result
+
+def write_corpus(num_lines: int, directory: str) -> str:
+    """결정적 코퍼스를 파일로 저장"""
+    path = os.path.join(directory, f"memory_profile_{num_lines}lines.log")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(build_corpus(num_lines)))
+    return path
+
+def print_profile(label: str, result: Dict):
+    """단계별 메모리 출력"""
+    mb = 1024 * 1024
+    ratio = f", 입력 대비 {result['peak_ratio']:.2f}배" if "peak_ratio" in result else ""
+    peak = f"최대 {result['peak_bytes'] / mb:.1f}MB ({result['peak_stage']}){ratio}" if "peak_bytes" in result else ""
+    print(f"   {label}: 입력 {result['input_bytes'] / mb:.1f}MB, {result['lines']:,}라인, 윈도우 {result['windows']}개 - {peak}")
+    for name, entry in result["stages"].items():
+        traced = f"증가 최대 {entry['peak_bytes'] / mb:>8.1f}MB  잔존 {entry['retained_bytes'] / mb:>8.1f}MB" \
+            if "peak_bytes" in entry else ""
+        rss = f"RSS {entry['rss_peak_bytes'] / mb:>8.1f}MB" if entry["rss_peak_bytes"] else ""
+        print(f"      {name:<13} {entry['seconds']:>7.2f}s  {traced}  {rss}")
+
+def check_regressions(report: Dict, baseline: Optional[Dict], tolerance: float, max_ratio: Optional[float]) -> List[str]:
+    """입력 대비 최대 메모리 비율이 기준보다 tolerance 이상 커졌거나 max_ratio를 넘은 항목"""
+    alarms = []
+    for label, result in report["results"].items():
+        ratio = result.get("peak_ratio")
+        if ratio is None:
+            continue
+        if max_ratio is not None and ratio > max_ratio:
+            alarms.append(f"{label}: 입력 대비 {ratio:.2f}배 > 한도 {max_ratio:.2f}배")
+        base = (baseline or {}).get("results", {}).get(label, {}).get("peak_ratio")
+        if base and ratio > base * (1 + tolerance):
+            alarms.append(f"{label}: 입력 대비 {base:.2f}배 -> {ratio:.2f}배 (+{(ratio / base - 1) * 100:.0f}%)")
+    return alarms
+
+def main():
+    parser = argparse.ArgumentParser(description="윈도우 파이프라인 메모리 프로파일")
+    parser.add_argument("--sizes", nargs="+", default=["10k", "100k", "1M"], help="코퍼스 라인 수 (예: 10k 1M 25M)")
+    parser.add_argument("--files", nargs="*", default=[], help="코퍼스 대신(또는 함께) 프로파일할 로그 파일")
+    parser.add_argument("--window-tokens", type=int, default=5000, help="윈도우 토큰 수")
+    parser.add_argument("--analysis-chars", type=int, default=2000, help="윈도우당 가정하는 분석 결과 글자 수")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="RSS만 측정 (대용량 파일에서 빠름)")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="허용 비율 증가 (0.10=10%%)")
+    parser.add_argument("--max-ratio", type=float, help="입력 크기 대비 최대 메모리 비율 한도")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: memory_profile_<시각>.json)")
+    args = parser.parse_args()
+
+    # 측정 대상 외 할당을 줄이기 위해 단계별 시간 측정은 끔
+    get_pipeline_timer().enabled = False
+    config = WindowConfig(max_tokens=args.window_tokens)
+    use_tracemalloc = not args.no_tracemalloc
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "window_tokens": args.window_tokens,
+        "analysis_chars": args.analysis_chars,
+        "tracemalloc": use_tracemalloc,
+        "results": {}
+    }
+
+    print("💾 메모리 프로파일 시작")
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        for size in args.sizes:
+            num_lines = parse_size(size)
+            path = write_corpus(num_lines, corpus_dir)
+            result = profile_file(path, config, args.analysis_chars, use_tracemalloc)
+            os.remove(path)
+            report["results"][str(num_lines)] = result
+            print_profile(f"{num_lines:,}라인", result)
+    for path in args.files:
+        result = profile_file(path, config, args.analysis_chars, use_tracemalloc)
+        report["results"][os.path.basename(path)] = result
+        print_profile(os.path.basename(path), result)
+
+    # 입력 크기 대비 메모리 곡선 (작은 입력부터)
+    curve = sorted(
+        ({"label": label, "input_bytes": r["input_bytes"], "peak_bytes": r.get("peak_bytes"),
+          "peak_ratio": r.get("peak_ratio")} for label, r in report["results"].items()),
+        key=lambda point: point["input_bytes"]
+    )
+    report["curve"] = curve
+    print("\n📈 입력 크기 대비 최대 메모리")
+    for point in curve:
+        if point["peak_ratio"] is not None:
+            print(f"   {point['input_bytes'] / 1024 / 1024:>10.1f}MB -> {point['peak_bytes'] / 1024 / 1024:>10.1f}MB "
+                  f"({point['peak_ratio']:.2f}배)")
+
+    output = args.output or f"memory_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 메모리 프로파일 저장: {output}")
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    if args.baseline and baseline is None:
+        sys.exit(2)
+    if baseline and baseline.get("tracemalloc") != use_tracemalloc:
+        print("⚠️ 기준 결과와 측정 방식(tracemalloc/RSS)이 달라 기준 비교를 생략합니다")
+        baseline = None
+    if baseline or args.max_ratio is not None:
+        alarms = check_regressions(report, baseline, args.tolerance, args.max_ratio)
+        if alarms:
+            print(f"🚨 메모리 비율 회귀 {len(alarms)}건")
+            for alarm in alarms:
+                print(f"   {alarm}")
+            sys.exit(1)
+        print("✅ 메모리 비율 회귀 없음")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+메트릭 익스포터 모듈 - 상시 실행 컴포넌트의 지표를 Prometheus 텍스트 형식으로 노출 (내장 HTTP 서버 또는 textfile collector)
+"""
+
+import os
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from config import METRICS_HOST, METRICS_PORT, METRICS_TEXTFILE, METRICS_TEXTFILE_INTERVAL
+
+METRIC_PREFIX = "sliding_window_llm_"
+
+# 분석 지연시간 히스토그램 버킷 (초) - 짧은 모니터 분석부터 다중 윈도우 분석까지
+ANALYSIS_LATENCY_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+def _escape_label_value(value: str) -> str:
+    """라벨 값 이스케이프 (역슬래시, 따옴표, 줄바꿈)"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_value(value: float) -> str:
+    """Prometheus 숫자 표기"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Tuple, extra: Tuple = ()) -> str:
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+class _Metric:
+    """라벨별 값을 가진 지표 공통 부분"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, object] = {}
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: labels must be {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """단조 증가 카운터 (초당 값은 Prometheus rate()로 계산)"""
+
+    kind = "counter"
+
+    def inc(self, value: float = 1.0, **labels):
+        if value < 0:
+            raise ValueError("counter can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+class Gauge(_Metric):
+    """현재 값 (set) 또는 수집 시점에 호출되는 함수 값 (set_function)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[Tuple, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """수집할 때마다 function()을 호출해 값으로 사용"""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = float(function())
+            except Exception:
+                # 값을 못 구하면 해당 시계열만 생략
+                values.pop(key, None)
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램 (_bucket, _sum, _count)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = ANALYSIS_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, {**state, "buckets": list(state["buckets"])}) for key, state in sorted(self._values.items())]
+        lines = self._header()
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["buckets"]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+class MetricsRegistry:
+    """지표 등록/조회 - 같은 이름으로 다시 등록하면 기존 지표 반환 (한 프로세스에서 여러 컴포넌트 실행 가능)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Tuple[str, ...], **kwargs):
+        name = METRIC_PREFIX + name
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = ANALYSIS_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (version 0.0.4)"""
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+class MetricsExporter:
+    """레지스트리 노출 - port가 있으면 /metrics HTTP 서버, textfile이 있으면 주기적으로 파일 기록 (둘 다 가능)"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = METRICS_HOST, port: int = METRICS_PORT,
+                 textfile: str = METRICS_TEXTFILE, textfile_interval: float = METRICS_TEXTFILE_INTERVAL):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.textfile = textfile
+        self.textfile_interval = textfile_interval
+        self._server = None
+        self._threads = []
+        self._stop_event = threading.Event()
+
+    def _make_handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def write_textfile(self):
+        """textfile collector용 파일 기록 - 수집 중 잘린 파일을 읽지 않도록 임시 파일 작성 후 교체"""
+        temp_path = f"{self.textfile}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.registry.render())
+        os.replace(temp_path, self.textfile)
+
+    def _textfile_loop(self):
+        while not self._stop_event.wait(self.textfile_interval):
+            try:
+                self.write_textfile()
+            except OSError as e:
+                print(f"⚠️ 메트릭 파일 기록 실패: {e}")
+
+    def start(self):
+        """노출 시작"""
+        if self.port:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+            self._server.daemon_threads = True
+            thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+            print(f"📈 메트릭 엔드포인트: http://{self.host}:{self._server.server_address[1]}/metrics")
+        if self.textfile:
+            self.write_textfile()
+            thread = threading.Thread(target=self._textfile_loop, name="metrics-textfile", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+            print(f"📈 메트릭 파일: {self.textfile} ({self.textfile_interval:g}초마다 갱신)")
+
+    def stop(self):
+        """노출 중지 - textfile 모드는 마지막 값을 한 번 더 기록"""
+        self._stop_event.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self.textfile:
+            try:
+                self.write_textfile()
+            except OSError as e:
+                print(f"⚠️ 메트릭 파일 기록 실패: {e}")
+        self._stop_event.clear()
+
+metrics_registry = MetricsRegistry()
+_exporter: Optional[MetricsExporter] = None
+_exporter_lock = threading.Lock()
+
+def get_metrics_registry() -> MetricsRegistry:
+    """프로세스 공용 메트릭 레지스트리 반환"""
+    return metrics_registry
+
+def start_metrics_exporter() -> Optional[MetricsExporter]:
+    """설정(METRICS_PORT/METRICS_TEXTFILE)에 따라 익스포터 시작 - 둘 다 없으면 None, 이미 실행 중이면 그대로 반환"""
+    global _exporter
+    if not METRICS_PORT and not METRICS_TEXTFILE:
+        return None
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = MetricsExporter(metrics_registry)
+            _exporter.start()
+        return _exporter
+
+def stop_metrics_exporter():
+    """실행 중인 익스포터 중지"""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is not None:
+            _exporter.stop()
+            _exporter = None
+
+class ComponentMetrics:
+    """LogMonitor/AutoAnalyzer/RealTimeLogger 공통 지표 (component 라벨로 구분)"""
+
+    def __init__(self, component: str, registry: MetricsRegistry = None, llm: bool = True):
+        registry = registry or metrics_registry
+        self.component = component
+        self.ingested_lines = registry.counter(
+            "ingested_lines_total", "Log lines read or generated", ("component",))
+        self.lines_by_level = registry.counter(
+            "log_lines_by_level_total", "Parsed or generated log lines by level", ("component", "level"))
+        self.parse_failures = registry.counter(
+            "parse_failures_total", "Non-empty log lines that did not match the log format", ("component",))
+        self.write_failures = registry.counter(
+            "write_failures_total", "Failed log file writes", ("component",))
+        self.pending_lines = registry.gauge(
+            "pending_lines", "Parsed log lines waiting for the next analysis", ("component",))
+        self.triggers = registry.counter(
+            "analysis_triggers_total", "Analysis triggers by reason", ("component", "reason"))
+        self.analyses = registry.counter(
+            "analyses_total", "Finished analyses by result", ("component", "result"))
+        self.analysis_duration = registry.histogram(
+            "analysis_duration_seconds", "Wall-clock latency of one analysis", ("component",))
+        self.llm_tokens = registry.counter(
+            "llm_tokens_total", "LLM tokens used by analyses", ("component", "kind"))
+        self.pending_lines.set(0, component=component)
+        if not llm:
+            return
+
+        # LLM 클라이언트 동시성 상태 (공용 클라이언트 하나이므로 component 라벨 없음)
+        from llm_client import get_llm_client
+        registry.gauge("llm_in_flight_requests", "LLM requests currently being sent").set_function(
+            lambda: get_llm_client().limiter.get_metrics()["in_flight"])
+        registry.gauge("llm_concurrency_limit", "Current adaptive concurrency limit").set_function(
+            lambda: get_llm_client().limiter.limit)
+
+    def record_lines(self, lines: int, failures: int = 0, levels: Dict[str, int] = None):
+        """읽은 라인 수, 파싱 실패 수, 레벨별 라인 수 반영"""
+        self.ingested_lines.inc(lines, component=self.component)
+        if failures:
+            self.parse_failures.inc(failures, component=self.component)
+        for level, count in (levels or {}).items():
+            self.lines_by_level.inc(count, component=self.component, level=level)
+
+    def record_analysis(self, reason: str, seconds: float, success: bool, prompt_tokens: int = 0,
+                        completion_tokens: int = 0):
+        """분석 한 번의 트리거 사유/지연시간/결과/토큰 반영"""
+        self.triggers.inc(component=self.component, reason=reason)
+        self.analysis_duration.observe(seconds, component=self.component)
+        self.analyses.inc(component=self.component, result="success" if success else "failure")
+        if prompt_tokens:
+            self.llm_tokens.inc(prompt_tokens, component=self.component, kind="prompt")
+        if completion_tokens:
+            self.llm_tokens.inc(completion_tokens, component=self.component, kind="completion")
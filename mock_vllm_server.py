@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+모의 vLLM 서버 - GPU 없이 HTTP/동시성/스트리밍 부하 테스트를 하기 위한 OpenAI 호환 로컬 서버
+
+/v1/models, /v1/chat/completions(스트리밍 포함), /v1/completions, /tokenize 를 제공하며
+TTFT/생성 속도 분포, 동시 요청 수에 따른 감속(continuous batching 근사), 429/500/타임아웃 장애 주입을 설정할 수 있다.
+"""
+
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from dataclasses import dataclass
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from structured_output import StructuredAnalysis, Hypothesis
+
+# 모의 응답 본문에 쓰는 단어 (단어 하나를 토큰 하나로 취급)
+FILLER_WORDS = [
+    "connection", "timeout", "pool", "exhausted", "retry", "latency", "spike", "database",
+    "check", "restart", "increase", "limit", "memory", "heap", "gc", "upstream"
+]
+
+@dataclass
+class MockServerConfig:
+    """모의 서버 지연시간/출력/장애 설정
+
+    지연시간 = TTFT + 프롬프트 토큰/prefill 속도 + 생성 토큰/생성 속도.
+    생성 속도는 동시에 생성 중인 요청 수 n에 대해 1 / (1 + batch_slowdown * (n - 1)) 배로 느려진다.
+    """
+    model: str = "mock-model"
+    ttft: float = 0.05                      # 첫 토큰까지 평균 시간 (초)
+    ttft_jitter: float = 0.2                # TTFT 표준편차 / 평균 (로그정규 분포)
+    prefill_tokens_per_second: float = 0.0  # 0=프롬프트 길이 무시
+    tokens_per_second: float = 0.0          # 요청 하나의 생성 속도 (0=생성 지연 없음)
+    tokens_per_second_jitter: float = 0.1
+    output_tokens: int = 256                # 평균 생성 토큰 수 (max_tokens로 제한)
+    output_tokens_jitter: float = 0.3
+    batch_slowdown: float = 0.05            # 동시 요청 하나당 생성 속도 감소 비율
+    error_429_rate: float = 0.0
+    error_500_rate: float = 0.0
+    timeout_rate: float = 0.0               # 응답 없이 hang_seconds 동안 멈춤
+    hang_seconds: float = 30.0
+    seed: Optional[int] = None
+
+def count_text_tokens(text: str) -> int:
+    """토큰 수 근사 (4글자당 1토큰)"""
+    return max(1, len(text) // 4)
+
+class MockVLLMServer:
+    """OpenAI 호환 모의 vLLM 서버 (port=0이면 빈 포트 자동 선택)"""
+
+    def __init__(self, port: int = 0, config: MockServerConfig = None, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.config = config or MockServerConfig()
+        self.request_count = 0
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._active = 0
+        self.stats = {"requests": 0, "streamed": 0, "errors_429": 0, "errors_500": 0, "timeouts": 0,
+                      "prompt_tokens": 0, "completion_tokens": 0, "peak_active": 0}
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def get_stats(self) -> Dict:
+        """요청/장애/토큰 통계와 현재 생성 중인 요청 수"""
+        with self._lock:
+            return {**self.stats, "active": self._active}
+
+    def _sample(self, mean: float, jitter: float) -> float:
+        """평균 mean, 상대 표준편차 jitter인 로그정규 표본"""
+        if mean <= 0:
+            return 0.0
+        if jitter <= 0:
+            return mean
+        sigma = math.sqrt(math.log(1 + jitter ** 2))
+        with self._lock:
+            return self._random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+
+    def _pick_fault(self) -> Optional[str]:
+        """설정된 비율에 따라 장애 종류 선택 (없으면 None)"""
+        config = self.config
+        with self._lock:
+            value = self._random.random()
+        for fault, rate in (("429", config.error_429_rate), ("500", config.error_500_rate),
+                            ("timeout", config.timeout_rate)):
+            if value < rate:
+                return fault
+            value -= rate
+        return None
+
+    def _plan_output(self, max_tokens: int) -> Tuple[int, str]:
+        """생성 토큰 수와 finish_reason"""
+        target = max(1, round(self._sample(self.config.output_tokens, self.config.output_tokens_jitter)))
+        if target >= max_tokens:
+            return max_tokens, "length"
+        return target, "stop"
+
+    def _generate(self, prompt_tokens: int, completion_tokens: int, chunk_tokens: int = 4) -> Iterator[int]:
+        """지연시간 모델에 맞춰 대기하며 생성된 토큰 수를 chunk 단위로 반환
+
+        생성 중인 요청 수는 chunk마다 다시 읽으므로 도중에 요청이 늘면 그만큼 느려진다.
+        """
+        config = self.config
+        with self._lock:
+            self._active += 1
+            self.stats["peak_active"] = max(self.stats["peak_active"], self._active)
+        try:
+            delay = self._sample(config.ttft, config.ttft_jitter)
+            if config.prefill_tokens_per_second > 0:
+                delay += prompt_tokens / config.prefill_tokens_per_second
+            time.sleep(delay)
+
+            tokens_per_second = self._sample(config.tokens_per_second, config.tokens_per_second_jitter)
+            generated = 0
+            while generated < completion_tokens:
+                chunk = min(chunk_tokens, completion_tokens - generated)
+                if tokens_per_second > 0:
+                    slowdown = 1 + config.batch_slowdown * (self._active - 1)
+                    time.sleep(chunk / tokens_per_second * slowdown)
+                generated += chunk
+                yield chunk
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _render_content(self, completion_tokens: int, payload: Dict) -> str:
+        """모의 응답 본문 - 스키마 강제 요청이면 분석 JSON, 아니면 단어 나열"""
+        if payload.get("guided_json") or payload.get("response_format"):
+            analysis = StructuredAnalysis(
+                symptoms=["mock symptom: connection pool exhausted"],
+                hypotheses=[Hypothesis(cause=f"mock cause from :{self.port}", priority=1)],
+                commands=["kubectl logs deploy/ordersvc --tail=200"],
+                mitigations=["increase pool size"],
+                confidence="medium"
+            )
+            return analysis.to_json()
+        with self._lock:
+            words = [self._random.choice(FILLER_WORDS) for _ in range(completion_tokens)]
+        return f"mock analysis from :{self.port} " + " ".join(words)
+
+    def _first_token_logprobs(self) -> Tuple[str, Dict[str, float]]:
+        """트리아지용 첫 토큰 - yes/no와 그 logprob"""
+        with self._lock:
+            p_yes = min(max(self._random.random(), 1e-6), 1 - 1e-6)
+        return ("yes" if p_yes >= 0.5 else "no"), {"yes": math.log(p_yes), "no": math.log(1 - p_yes)}
+
+    def _make_handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, data, status=200):
+                body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_fault(self, fault: str):
+                """장애 응답 (timeout은 응답 없이 멈춘 뒤 연결 종료)"""
+                if fault == "429":
+                    mock._count("errors_429")
+                    self._send_json({"error": {"message": "mock rate limit", "type": "rate_limit"}}, 429)
+                elif fault == "500":
+                    mock._count("errors_500")
+                    self._send_json({"error": {"message": "mock internal error", "type": "server_error"}}, 500)
+                else:
+                    mock._count("timeouts")
+                    time.sleep(mock.config.hang_seconds)
+
+            def do_GET(self):
+                if self.path == "/v1/models":
+                    self._send_json({"object": "list", "data": [{"id": mock.config.model, "object": "model"}]})
+                elif self.path == "/health":
+                    self._send_json({})
+                else:
+                    self._send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json({"error": "invalid json"}, 400)
+                    return
+
+                if self.path == "/tokenize":
+                    text = "".join(message.get("content", "") for message in payload.get("messages", [])) \
+                        or payload.get("prompt", "")
+                    count = count_text_tokens(text)
+                    self._send_json({"count": count, "max_model_len": 16384, "tokens": list(range(count))})
+                    return
+                if self.path not in ("/v1/chat/completions", "/v1/completions"):
+                    self._send_json({"error": "not found"}, 404)
+                    return
+
+                mock._count("requests")
+                with mock._lock:
+                    mock.request_count += 1
+                fault = mock._pick_fault()
+                if fault:
+                    self._send_fault(fault)
+                    return
+                if self.path == "/v1/chat/completions":
+                    self._chat_completion(payload)
+                else:
+                    self._completion(payload)
+
+            def _chat_completion(self, payload: Dict):
+                prompt_tokens = count_text_tokens("".join(m.get("content", "") for m in payload.get("messages", [])))
+                completion_tokens, finish_reason = mock._plan_output(payload.get("max_tokens", 1024))
+                created = int(time.time())
+                response_id = f"chatcmpl-mock-{created}-{mock.request_count}"
+
+                if payload.get("stream"):
+                    mock._count("streamed")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Cache-Control", "no-cache")
+                    self.end_headers()
+                    words = mock._render_content(completion_tokens, payload).split(" ")
+                    position = 0
+                    for chunk in mock._generate(prompt_tokens, len(words)):
+                        delta = " ".join(words[position:position + chunk]) + " "
+                        position += chunk
+                        self._send_event({"id": response_id, "object": "chat.completion.chunk", "created": created,
+                                          "model": mock.config.model,
+                                          "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]})
+                    self._send_event({"id": response_id, "object": "chat.completion.chunk", "created": created,
+                                      "model": mock.config.model,
+                                      "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+                                      "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                                                "total_tokens": prompt_tokens + len(words)}})
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                    mock._add_usage(prompt_tokens, len(words))
+                    return
+
+                for _ in mock._generate(prompt_tokens, completion_tokens):
+                    pass
+                choice = {"index": 0, "finish_reason": finish_reason}
+                if payload.get("logprobs"):
+                    token, candidates = mock._first_token_logprobs()
+                    choice["message"] = {"role": "assistant", "content": f"{token} general" if token == "yes" else token}
+                    choice["logprobs"] = {"content": [{
+                        "token": token, "logprob": candidates[token],
+                        "top_logprobs": [{"token": name, "logprob": value} for name, value in candidates.items()]
+                    }]}
+                else:
+                    choice["message"] = {"role": "assistant", "content": mock._render_content(completion_tokens, payload)}
+                mock._add_usage(prompt_tokens, completion_tokens)
+                self._send_json({
+                    "id": response_id, "object": "chat.completion", "created": created, "model": mock.config.model,
+                    "choices": [choice],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens}
+                })
+
+            def _completion(self, payload: Dict):
+                prompts = payload.get("prompt", "")
+                prompts = prompts if isinstance(prompts, list) else [prompts]
+                max_tokens = payload.get("max_tokens", 16)
+                outputs = [mock._plan_output(max_tokens) for _ in prompts]
+                prompt_tokens = sum(count_text_tokens(prompt) for prompt in prompts)
+                completion_tokens = sum(tokens for tokens, _ in outputs)
+
+                # 배치 요청의 프롬프트들은 같은 스텝에서 함께 생성되므로 가장 긴 출력 기준으로 대기
+                for _ in mock._generate(prompt_tokens, max(tokens for tokens, _ in outputs)):
+                    pass
+                choices = []
+                for index, (tokens, finish_reason) in enumerate(outputs):
+                    choice = {"index": index, "finish_reason": finish_reason}
+                    if payload.get("logprobs"):
+                        token, candidates = mock._first_token_logprobs()
+                        choice["text"] = f" {token} general" if token == "yes" else f" {token}"
+                        choice["logprobs"] = {"tokens": [token], "top_logprobs": [candidates]}
+                    else:
+                        choice["text"] = mock._render_content(tokens, payload)
+                    choices.append(choice)
+                mock._add_usage(prompt_tokens, completion_tokens)
+                self._send_json({
+                    "id": f"cmpl-mock-{int(time.time())}-{mock.request_count}", "object": "text_completion",
+                    "created": int(time.time()), "model": mock.config.model, "choices": choices,
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens}
+                })
+
+            def _send_event(self, data: Dict):
+                self.wfile.write(f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+        return Handler
+
+    def _count(self, name: str, value: int = 1):
+        with self._lock:
+            self.stats[name] += value
+
+    def _add_usage(self, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+
+    def start(self):
+        """서버 시작 (백그라운드 스레드)"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """서버 중지 (포트 해제)"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+def start_mock_servers(count: int, config: MockServerConfig = None, base_port: int = 0,
+                       host: str = "127.0.0.1") -> List[MockVLLMServer]:
+    """모의 서버 여러 대 시작 (base_port=0이면 빈 포트 자동 선택, seed는 서버마다 1씩 증가)"""
+    servers = []
+    for i in range(count):
+        server_config = MockServerConfig(**vars(config)) if config else MockServerConfig()
+        if server_config.seed is not None:
+            server_config.seed += i
+        servers.append(MockVLLMServer(base_port + i if base_port else 0, server_config, host=host).start())
+    return servers
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 모의 vLLM 서버 (GPU 없이 부하 테스트)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000, help="첫 서버 포트")
+    parser.add_argument("--servers", type=int, default=1, help="서버 수 (포트를 1씩 증가)")
+    parser.add_argument("--model", default="Qwen/Qwen2.5-7B-Instruct", help="/v1/models 에 노출할 모델 이름")
+    parser.add_argument("--ttft", type=float, default=0.2, help="평균 TTFT (초)")
+    parser.add_argument("--ttft-jitter", type=float, default=0.2, help="TTFT 상대 표준편차")
+    parser.add_argument("--prefill-tps", type=float, default=5000.0, help="프롬프트 처리 속도 (tok/s, 0=무시)")
+    parser.add_argument("--tps", type=float, default=40.0, help="요청 하나의 생성 속도 (tok/s, 0=즉시)")
+    parser.add_argument("--tps-jitter", type=float, default=0.1, help="생성 속도 상대 표준편차")
+    parser.add_argument("--output-tokens", type=int, default=400, help="평균 생성 토큰 수")
+    parser.add_argument("--batch-slowdown", type=float, default=0.05, help="동시 요청 하나당 생성 속도 감소 비율")
+    parser.add_argument("--error-429", type=float, default=0.0, help="429 응답 비율")
+    parser.add_argument("--error-500", type=float, default=0.0, help="500 응답 비율")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="응답 없이 멈추는 비율")
+    parser.add_argument("--hang-seconds", type=float, default=30.0, help="타임아웃 장애 시 멈추는 시간")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockServerConfig(
+        model=args.model, ttft=args.ttft, ttft_jitter=args.ttft_jitter,
+        prefill_tokens_per_second=args.prefill_tps, tokens_per_second=args.tps,
+        tokens_per_second_jitter=args.tps_jitter, output_tokens=args.output_tokens,
+        batch_slowdown=args.batch_slowdown, error_429_rate=args.error_429, error_500_rate=args.error_500,
+        timeout_rate=args.timeout_rate, hang_seconds=args.hang_seconds, seed=args.seed
+    )
+    servers = start_mock_servers(args.servers, config, args.port, args.host)
+    print(f"🧪 모의 vLLM 서버 {len(servers)}대 실행 중 (TTFT {args.ttft}s, {args.tps} tok/s, 평균 {args.output_tokens}토큰)")
+    print(f"   VLLM_ENDPOINTS={','.join(server.base_url for server in servers)}")
+    print("중단하려면 Ctrl+C를 누르세요")
+    try:
+        while True:
+            time.sleep(10)
+            for server in servers:
+                stats = server.get_stats()
+                print(f"   :{server.port} 요청 {stats['requests']}개, 생성 중 {stats['active']}개 "
+                      f"(최대 {stats['peak_active']}), 429 {stats['errors_429']}, 500 {stats['errors_500']}, "
+                      f"타임아웃 {stats['timeouts']}")
+    except KeyboardInterrupt:
+        print("\n🛑 모의 서버 종료")
+    finally:
+        for server in servers:
+            server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+다중 엔드포인트 테스트 스크립트 - 서로 다른 포트의 모의 vLLM 서버 여러 대로 분산/제외/복귀 동작 확인
+"""
+
+import sys
+import time
+import concurrent.futures
+
+from endpoint_pool import EndpointPool
+from concurrency_limiter import AdaptiveConcurrencyLimiter
+from llm_client import LLMClient
+from mock_vllm_server import MockVLLMServer, MockServerConfig
+
+def send_requests(client: LLMClient, count: int, workers: int = 8) -> int:
+    """동시 요청 전송 후 성공 수 반환"""
+    config = {"temperature": 0.0, "max_tokens": 16, "timeout": 10}
+
+    def request(i):
+        return client.chat("system", f"request {i}", config)
+
+    successes = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in concurrent.futures.as_completed([executor.submit(request, i) for i in range(count)]):
+            try:
+                future.result()
+                successes += 1
+            except Exception as e:
+                print(f"   ❌ 요청 실패: {e}")
+    return successes
+
+def wait_until(condition, timeout: float) -> bool:
+    """조건이 참이 될 때까지 대기"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return False
+
+def print_endpoint_metrics(pool: EndpointPool):
+    """엔드포인트별 지표 출력"""
+    for metrics in pool.get_metrics():
+        p50 = f"{metrics['latency_p50'] * 1000:.0f}ms" if metrics["latency_p50"] is not None else "N/A"
+        print(f"   {metrics['url']}: {'정상' if metrics['healthy'] else '제외'}, 요청 {metrics['requests']}, "
+              f"오류 {metrics['errors']}, p50 {p50}, 제외 {metrics['ejections']}회, 복귀 {metrics['readmissions']}회")
+
+def main():
+    print("=== 다중 엔드포인트 테스트 시작 ===\n")
+    ports = [18001, 18002, 18003]
+    servers = [MockVLLMServer(port, MockServerConfig(ttft=0.05, ttft_jitter=0.0)) for port in ports]
+    # 세 번째 서버는 느린 서버 - least-outstanding이면 요청이 덜 가야 함
+    servers[2].config.ttft = 0.3
+    for server in servers:
+        server.start()
+
+    pool = EndpointPool([server.base_url for server in servers], balancer="least_outstanding",
+                        health_interval=0.5, max_failures=2)
+    client = LLMClient(pool=pool, limiter=AdaptiveConcurrencyLimiter(initial_limit=8, adaptive=False))
+    results = {}
+
+    try:
+        # 1. 분산
+        print("🧪 1. 요청 분산 (least-outstanding)")
+        successes = send_requests(client, 60)
+        counts = [server.request_count for server in servers]
+        print(f"   서버별 요청 수: {counts}")
+        results["분산"] = successes == 60 and all(counts) and counts[2] < min(counts[0], counts[1])
+        print_endpoint_metrics(pool)
+
+        # 2. 제외
+        print("\n🧪 2. 서버 중지 시 제외")
+        servers[1].stop()
+        before = servers[1].request_count
+        successes = send_requests(client, 30)
+        ejected = wait_until(lambda: not pool.endpoints[1].healthy, 3)
+        print(f"   성공 {successes}/30, 중지된 서버 제외: {ejected}")
+        results["제외"] = successes == 30 and ejected and servers[1].request_count == before
+        print_endpoint_metrics(pool)
+
+        # 3. 복귀
+        print("\n🧪 3. 서버 재시작 시 복귀")
+        servers[1].start()
+        readmitted = wait_until(lambda: pool.endpoints[1].healthy, 5)
+        before = servers[1].request_count
+        send_requests(client, 30)
+        print(f"   복귀: {readmitted}, 복귀 후 요청 수: {servers[1].request_count - before}")
+        results["복귀"] = readmitted and servers[1].request_count > before
+        print_endpoint_metrics(pool)
+    finally:
+        pool.stop_health_checks()
+        for server in servers:
+            server.stop()
+
+    print("\n=== 테스트 결과 요약 ===")
+    for name, passed in results.items():
+        print(f"{name}: {'✅ 성공' if passed else '❌ 실패'}")
+    return all(results.values())
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
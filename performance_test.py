@@ -1,398 +1,294 @@
 #!/usr/bin/env python3
 """
-성능 테스트 스크립트 - 대용량 로그와 동시 요청 처리 성능 측정
+성능 테스트 스크립트 - vLLM(또는 모의 서버) 대상 부하 생성기
+
+동시성/윈도우 크기를 바꿔가며 closed-loop(고정 동시성) 또는 open-loop(고정 도착률) 부하를 걸고
+지연시간 p50/p95/p99, TTFT, 생성 속도(tokens/s), 오류율을 측정한다.
 """
 
-import os
-import sys
 import json
 import time
+import random
+import argparse
 import threading
-import subprocess
-import requests
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
 import statistics
 import concurrent.futures
-from log_generator import LogGenerator
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import requests
+
+from config import OPENAI_BASE, MODEL
+from prompt_templates import get_prompt_templates
+from sliding_window import SlidingWindow, WindowConfig
+from log_llm_pipeline import build_prompts
+from llm_benchmark import percentile, BENCH_META
+from window_benchmark import build_corpus
+from mock_vllm_server import MockVLLMServer, MockServerConfig
+
+@dataclass
+class RequestResult:
+    """요청 하나의 측정 결과 (open-loop는 예정 도착 시각부터 측정)"""
+    success: bool
+    latency: float
+    ttft: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    error: Optional[str] = None
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """첫 토큰 이후 생성 속도"""
+        if not self.success or self.ttft is None or self.latency <= self.ttft or not self.completion_tokens:
+            return None
+        return self.completion_tokens / (self.latency - self.ttft)
 
 class PerformanceTester:
-    def __init__(self):
-        self.test_dir = "/home/ssh/work/sliding-window-llm"
-        self.vllm_url = "http://127.0.0.1:8000/v1"
-        self.model_name = "Qwen/Qwen2.5-7B-Instruct"
-        self.results = []
-    
+    """스트리밍 /v1/chat/completions 부하 생성기"""
+
+    def __init__(self, base_url: str = OPENAI_BASE, model: str = MODEL, max_tokens: int = 256,
+                 timeout: float = 120.0):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
     def check_vllm_server(self) -> bool:
         """vLLM 서버 상태 확인"""
         try:
-            response = requests.get(f"{self.vllm_url}/models", timeout=5)
+            response = requests.get(f"{self.base_url}/models", timeout=5)
             return response.status_code == 200
-        except:
+        except Exception:
             return False
-    
-    def generate_large_logs(self) -> List[str]:
-        """대용량 로그 파일들 생성"""
-        print("📝 대용량 로그 파일 생성 중...")
-        
-        generator = LogGenerator()
-        log_files = []
-        
-        # 다양한 크기의 로그 파일 생성
-        sizes = [
-            (100, "small"),
-            (500, "medium"), 
-            (1000, "large"),
-            (2000, "xlarge"),
-            (5000, "huge")
-        ]
-        
-        for size, name in sizes:
-            print(f"  - {name} 로그 생성 ({size}줄)...")
-            logs = generator.generate_large_volume_logs(size)
-            filename = f"perf_{name}_{size}lines.log"
-            filepath = os.path.join(self.test_dir, filename)
-            
-            with open(filepath, 'w') as f:
-                f.write('\n'.join(logs))
-            
-            log_files.append(filename)
-        
-        print(f"✅ {len(log_files)}개 대용량 로그 파일 생성 완료")
-        return log_files
-    
-    def measure_single_request_time(self, log_file: str, use_vllm: bool = True) -> Dict:
-        """단일 요청 처리 시간 측정"""
-        start_time = time.time()
-        
-        try:
-            if use_vllm:
-                # vLLM 직접 호출로 측정
-                with open(os.path.join(self.test_dir, log_file), 'r') as f:
-                    log_content = f.read()
-                
-                # 간단한 분석 요청
-                payload = {
-                    "model": self.model_name,
-                    "messages": [
-                        {"role": "system", "content": "You are a log analysis expert. Provide a brief analysis."},
-                        {"role": "user", "content": f"Analyze these logs briefly:\n{log_content[:2000]}"}
-                    ],
-                    "temperature": 0.1,
-                    "max_tokens": 200
-                }
-                
-                response = requests.post(
-                    f"{self.vllm_url}/chat/completions",
-                    json=payload,
-                    timeout=60
-                )
-                
-                if response.status_code == 200:
-                    end_time = time.time()
-                    return {
-                        "success": True,
-                        "duration": end_time - start_time,
-                        "response_length": len(response.json()["choices"][0]["message"]["content"])
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "duration": time.time() - start_time,
-                        "error": f"HTTP {response.status_code}"
-                    }
-            else:
-                # 모의 테스트
-                result = subprocess.run([
-                    "python3", "test_pipeline.py"
-                ], capture_output=True, text=True, cwd=self.test_dir, timeout=30)
-                
-                end_time = time.time()
-                return {
-                    "success": result.returncode == 0,
-                    "duration": end_time - start_time,
-                    "output": result.stdout
-                }
-                
-        except Exception as e:
-            return {
-                "success": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
-    
-    def test_concurrent_requests(self, num_requests: int = 5) -> Dict:
-        """동시 요청 처리 테스트"""
-        print(f"🔄 동시 요청 테스트 ({num_requests}개 요청)...")
-        
-        # 간단한 테스트 로그 생성
-        test_log = "2024-01-15 10:30:15 ERROR [test] Test error message\n" * 10
-        test_file = "concurrent_test.log"
-        with open(os.path.join(self.test_dir, test_file), 'w') as f:
-            f.write(test_log)
-        
-        start_time = time.time()
-        results = []
-        
-        def make_request(request_id: int) -> Dict:
-            """개별 요청 함수"""
-            req_start = time.time()
-            try:
-                payload = {
-                    "model": self.model_name,
-                    "messages": [
-                        {"role": "system", "content": "You are a log analysis expert."},
-                        {"role": "user", "content": f"Request {request_id}: Analyze this log briefly: {test_log[:500]}"}
-                    ],
-                    "temperature": 0.1,
-                    "max_tokens": 100
-                }
-                
-                response = requests.post(
-                    f"{self.vllm_url}/chat/completions",
-                    json=payload,
-                    timeout=30
-                )
-                
-                req_end = time.time()
-                return {
-                    "request_id": request_id,
-                    "success": response.status_code == 200,
-                    "duration": req_end - req_start,
-                    "status_code": response.status_code
-                }
-            except Exception as e:
-                return {
-                    "request_id": request_id,
-                    "success": False,
-                    "duration": time.time() - req_start,
-                    "error": str(e)
-                }
-        
-        # 동시 요청 실행
-        with concurrent.futures.ThreadPoolExecutor(max_workers=num_requests) as executor:
-            futures = [executor.submit(make_request, i) for i in range(num_requests)]
-            results = [future.result() for future in concurrent.futures.as_completed(futures)]
-        
-        total_time = time.time() - start_time
-        successful_requests = sum(1 for r in results if r["success"])
-        
-        # 통계 계산
-        durations = [r["duration"] for r in results if r["success"]]
-        avg_duration = statistics.mean(durations) if durations else 0
-        min_duration = min(durations) if durations else 0
-        max_duration = max(durations) if durations else 0
-        
-        return {
-            "total_requests": num_requests,
-            "successful_requests": successful_requests,
-            "total_time": total_time,
-            "requests_per_second": num_requests / total_time,
-            "avg_response_time": avg_duration,
-            "min_response_time": min_duration,
-            "max_response_time": max_duration,
-            "results": results
+
+    def build_requests(self, window_tokens: int, count: int, seed: int) -> List[List[Dict]]:
+        """결정적 코퍼스를 윈도우로 나눠 분석 프롬프트 count개 생성
+
+        윈도우가 count개보다 적으면 반복 사용한다 (반복된 프롬프트는 prefix cache에 걸릴 수 있음).
+        """
+        # 라인당 약 15토큰 기준으로 윈도우 count개에 필요한 만큼 생성
+        lines = build_corpus(min(2_000_000, max(1000, count * window_tokens // 10)), seed)
+        windows = SlidingWindow(WindowConfig(max_tokens=window_tokens, overlap_ratio=0.0)).create_windows(lines)
+        prompt_templates = get_prompt_templates()
+        conversations = []
+        for i in range(count):
+            window = windows[i % len(windows)]
+            analysis_type = prompt_templates.detect_analysis_type(window.content)
+            system_prompt, user_prompt = build_prompts(window.content, BENCH_META, analysis_type)
+            conversations.append([
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ])
+        return conversations
+
+    def send_request(self, messages: List[Dict], started: float = None) -> RequestResult:
+        """스트리밍 요청 하나 전송 - 첫 content 청크까지 TTFT, 마지막 청크까지 지연시간 측정"""
+        started = started or time.perf_counter()
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.0,
+            "max_tokens": self.max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True}
         }
-    
-    def test_memory_usage(self, log_file: str) -> Dict:
-        """메모리 사용량 테스트"""
-        print(f"💾 메모리 사용량 테스트 ({log_file})...")
-        
+        ttft = None
+        chunks = 0
+        usage = {}
         try:
-            # 프로세스 시작 전 메모리 확인
-            import psutil
-            process = psutil.Process()
-            initial_memory = process.memory_info().rss / 1024 / 1024  # MB
-            
-            # 파이프라인 실행
-            start_time = time.time()
-            result = subprocess.run([
-                "python3", "log_llm_pipeline.py"
-            ], capture_output=True, text=True, cwd=self.test_dir, timeout=120)
-            
-            end_time = time.time()
-            final_memory = process.memory_info().rss / 1024 / 1024  # MB
-            
-            return {
-                "success": result.returncode == 0,
-                "duration": end_time - start_time,
-                "initial_memory_mb": initial_memory,
-                "final_memory_mb": final_memory,
-                "memory_delta_mb": final_memory - initial_memory,
-                "output": result.stdout
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
-    
-    def test_token_processing_speed(self) -> Dict:
-        """토큰 처리 속도 테스트"""
-        print("⚡ 토큰 처리 속도 테스트...")
-        
-        # 다양한 크기의 텍스트로 토큰 처리 속도 측정
-        test_texts = [
-            "Short text",
-            "Medium length text " * 50,
-            "Long text " * 200,
-            "Very long text " * 500
-        ]
-        
-        results = []
-        
-        for i, text in enumerate(test_texts):
-            start_time = time.time()
-            
-            try:
-                import tiktoken
-                enc = tiktoken.get_encoding("cl100k_base")
-                tokens = enc.encode(text)
-                token_count = len(tokens)
-                
-                end_time = time.time()
-                duration = end_time - start_time
-                
-                results.append({
-                    "text_size": len(text),
-                    "token_count": token_count,
-                    "duration": duration,
-                    "tokens_per_second": token_count / duration if duration > 0 else 0
-                })
-            except Exception as e:
-                results.append({
-                    "text_size": len(text),
-                    "error": str(e)
-                })
-        
-        return {"token_processing_results": results}
-    
-    def run_performance_tests(self) -> None:
-        """성능 테스트 실행"""
-        print("🚀 성능 테스트 시작")
-        print("=" * 60)
-        
-        # vLLM 서버 상태 확인
-        vllm_available = self.check_vllm_server()
-        print(f"vLLM 서버 상태: {'✅ 연결됨' if vllm_available else '❌ 연결 안됨'}")
-        
-        if not vllm_available:
-            print("⚠️  vLLM 서버가 없어 일부 테스트를 건너뜁니다.")
-        
-        # 1. 대용량 로그 생성
-        large_logs = self.generate_large_logs()
-        print()
-        
-        # 2. 단일 요청 처리 시간 테스트
-        print("⏱️  단일 요청 처리 시간 테스트")
-        print("-" * 40)
-        
-        single_request_results = []
-        for log_file in large_logs:
-            print(f"  📝 {log_file} 테스트 중...")
-            result = self.measure_single_request_time(log_file, use_vllm=vllm_available)
-            result["log_file"] = log_file
-            single_request_results.append(result)
-            
-            if result["success"]:
-                print(f"    ✅ 성공: {result['duration']:.2f}초")
-            else:
-                print(f"    ❌ 실패: {result.get('error', 'Unknown error')}")
-        
-        # 3. 동시 요청 테스트 (vLLM 서버가 있을 때만)
-        concurrent_results = None
-        if vllm_available:
-            print("\n🔄 동시 요청 처리 테스트")
-            print("-" * 40)
-            concurrent_results = self.test_concurrent_requests(5)
-            print(f"  총 요청: {concurrent_results['total_requests']}개")
-            print(f"  성공: {concurrent_results['successful_requests']}개")
-            print(f"  총 시간: {concurrent_results['total_time']:.2f}초")
-            print(f"  RPS: {concurrent_results['requests_per_second']:.2f}")
-            print(f"  평균 응답 시간: {concurrent_results['avg_response_time']:.2f}초")
-        
-        # 4. 메모리 사용량 테스트
-        print("\n💾 메모리 사용량 테스트")
-        print("-" * 40)
-        memory_result = self.test_memory_usage("test_log.txt")
-        if memory_result["success"]:
-            print(f"  처리 시간: {memory_result['duration']:.2f}초")
-            print(f"  메모리 사용량: {memory_result['memory_delta_mb']:.1f}MB")
-        else:
-            print(f"  ❌ 실패: {memory_result.get('error', 'Unknown error')}")
-        
-        # 5. 토큰 처리 속도 테스트
-        print("\n⚡ 토큰 처리 속도 테스트")
-        print("-" * 40)
-        token_results = self.test_token_processing_speed()
-        for result in token_results["token_processing_results"]:
-            if "error" not in result:
-                print(f"  텍스트 크기: {result['text_size']}자, 토큰: {result['token_count']}개, 속도: {result['tokens_per_second']:.0f}토큰/초")
-        
-        # 결과 저장
-        self.save_performance_report({
-            "timestamp": datetime.now().isoformat(),
-            "vllm_available": vllm_available,
-            "single_request_results": single_request_results,
-            "concurrent_results": concurrent_results,
-            "memory_result": memory_result,
-            "token_results": token_results
-        })
-    
-    def save_performance_report(self, data: Dict) -> None:
-        """성능 테스트 보고서 저장"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        report_file = f"performance_report_{timestamp}.json"
-        report_path = os.path.join(self.test_dir, report_file)
-        
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        print(f"\n📄 성능 테스트 보고서 저장: {report_file}")
-        
-        # 요약 출력
-        print("\n📊 성능 테스트 요약")
-        print("=" * 40)
-        
-        if data["single_request_results"]:
-            successful_results = [r for r in data["single_request_results"] if r["success"]]
-            if successful_results:
-                avg_duration = statistics.mean([r["duration"] for r in successful_results])
-                print(f"평균 처리 시간: {avg_duration:.2f}초")
-        
-        if data["concurrent_results"]:
-            print(f"동시 요청 처리: {data['concurrent_results']['requests_per_second']:.2f} RPS")
-        
-        if data["memory_result"]["success"]:
-            print(f"메모리 사용량: {data['memory_result']['memory_delta_mb']:.1f}MB")
+            with self._session().post(f"{self.base_url}/chat/completions", json=payload,
+                                      timeout=self.timeout, stream=True) as response:
+                if response.status_code != 200:
+                    return RequestResult(False, time.perf_counter() - started, error=f"HTTP {response.status_code}")
+                for line in response.iter_lines():
+                    if not line or not line.startswith(b"data: "):
+                        continue
+                    data = line[6:]
+                    if data == b"[DONE]":
+                        break
+                    event = json.loads(data)
+                    if event.get("usage"):
+                        usage = event["usage"]
+                    for choice in event.get("choices", []):
+                        if choice.get("delta", {}).get("content"):
+                            if ttft is None:
+                                ttft = time.perf_counter() - started
+                            chunks += 1
+        except requests.Timeout:
+            return RequestResult(False, time.perf_counter() - started, error="timeout")
+        except requests.RequestException as e:
+            return RequestResult(False, time.perf_counter() - started, error=type(e).__name__)
+
+        return RequestResult(
+            success=True,
+            latency=time.perf_counter() - started,
+            ttft=ttft,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            # usage를 보내지 않는 서버는 청크 수로 근사
+            completion_tokens=usage.get("completion_tokens", chunks)
+        )
+
+    def run_closed_loop(self, conversations: List[List[Dict]], concurrency: int) -> Tuple[List[RequestResult], float]:
+        """고정 동시성 - 요청이 끝나면 다음 요청을 바로 보냄"""
+        started = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(self.send_request, conversations))
+        return results, time.perf_counter() - started
+
+    def run_open_loop(self, conversations: List[List[Dict]], rate: float, seed: int,
+                      max_in_flight: int = 256) -> Tuple[List[RequestResult], float]:
+        """고정 도착률(포아송) - 응답과 무관하게 예정 시각에 요청을 보냄
+
+        지연시간은 예정 도착 시각부터 측정하므로 클라이언트 쪽 대기도 포함된다 (coordinated omission 방지).
+        """
+        arrivals = random.Random(seed)
+        started = time.perf_counter()
+        scheduled = started
+        futures = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for messages in conversations:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(self.send_request, messages, scheduled))
+                scheduled += arrivals.expovariate(rate)
+            results = [future.result() for future in futures]
+        return results, time.perf_counter() - started
+
+def summarize_latencies(values: List[float]) -> Dict:
+    """지연시간 분포 요약"""
+    return {
+        "mean": statistics.mean(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0
+    }
+
+def summarize_case(results: List[RequestResult], wall_seconds: float) -> Dict:
+    """케이스 하나의 지연시간/TTFT/처리량/오류율 요약"""
+    successes = [result for result in results if result.success]
+    errors = {}
+    for result in results:
+        if not result.success:
+            errors[result.error] = errors.get(result.error, 0) + 1
+    decode_speeds = [speed for speed in (result.tokens_per_second for result in successes) if speed]
+    completion_tokens = sum(result.completion_tokens for result in successes)
+    return {
+        "requests": len(results),
+        "successes": len(successes),
+        "error_rate": (len(results) - len(successes)) / len(results) if results else 0.0,
+        "errors": errors,
+        "wall_seconds": wall_seconds,
+        "requests_per_second": len(successes) / wall_seconds if wall_seconds else 0.0,
+        "latency": summarize_latencies([result.latency for result in successes]),
+        "ttft": summarize_latencies([result.ttft for result in successes if result.ttft is not None]),
+        "avg_prompt_tokens": statistics.mean([r.prompt_tokens for r in successes]) if successes else 0.0,
+        "avg_completion_tokens": completion_tokens / len(successes) if successes else 0.0,
+        # 요청 하나가 받은 생성 속도 / 서버 전체 생성 처리량
+        "tokens_per_second_per_request": statistics.mean(decode_speeds) if decode_speeds else 0.0,
+        "output_tokens_per_second": completion_tokens / wall_seconds if wall_seconds else 0.0
+    }
+
+def print_summary_table(cases: List[Dict]):
+    """케이스별 요약 표 출력"""
+    print(f"\n{'모드':<7} {'부하':>6} {'윈도우':>6} {'요청':>5} {'오류율':>6} {'RPS':>6} "
+          f"{'p50':>7} {'p95':>7} {'p99':>7} {'TTFT p50':>9} {'TTFT p95':>9} {'tok/s/요청':>10} {'출력 tok/s':>10}")
+    for case in cases:
+        summary = case["summary"]
+        load = f"c{case['concurrency']}" if case["mode"] == "closed" else f"{case['rate']}/s"
+        print(f"{case['mode']:<7} {load:>6} {case['window_tokens']:>6} {summary['requests']:>5} "
+              f"{summary['error_rate'] * 100:>5.1f}% {summary['requests_per_second']:>6.2f} "
+              f"{summary['latency']['p50']:>6.2f}s {summary['latency']['p95']:>6.2f}s {summary['latency']['p99']:>6.2f}s "
+              f"{summary['ttft']['p50']:>8.2f}s {summary['ttft']['p95']:>8.2f}s "
+              f"{summary['tokens_per_second_per_request']:>10.1f} {summary['output_tokens_per_second']:>10.1f}")
+
+def save_performance_report(report: Dict, output: str = None) -> str:
+    """성능 테스트 보고서 저장"""
+    report_file = output or f"performance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 성능 테스트 보고서 저장: {report_file}")
+    return report_file
 
 def main():
-    tester = PerformanceTester()
-    
-    print("🎯 성능 테스트 옵션:")
-    print("1. 전체 성능 테스트")
-    print("2. 동시 요청 테스트만")
-    print("3. 메모리 사용량 테스트만")
-    print("4. 토큰 처리 속도 테스트만")
-    
-    choice = input("\n선택 (1-4): ").strip()
-    
-    if choice == "1":
-        tester.run_performance_tests()
-    elif choice == "2":
-        if tester.check_vllm_server():
-            result = tester.test_concurrent_requests(10)
-            print(f"동시 요청 결과: {result}")
-        else:
-            print("❌ vLLM 서버가 필요합니다.")
-    elif choice == "3":
-        result = tester.test_memory_usage("test_log.txt")
-        print(f"메모리 테스트 결과: {result}")
-    elif choice == "4":
-        result = tester.test_token_processing_speed()
-        print(f"토큰 처리 결과: {result}")
-    else:
-        print("❌ 잘못된 선택입니다.")
+    parser = argparse.ArgumentParser(description="vLLM/모의 서버 부하 테스트")
+    parser.add_argument("--base-url", default=OPENAI_BASE, help="OpenAI 호환 API 주소 (기본: config의 vLLM 주소)")
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed",
+                        help="closed=고정 동시성, open=고정 도착률(포아송)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8, 16], help="closed-loop 동시성 목록")
+    parser.add_argument("--rates", nargs="+", type=float, default=[1.0, 2.0, 4.0], help="open-loop 초당 요청 수 목록")
+    parser.add_argument("--window-tokens", nargs="+", type=int, default=[1000, 4000], help="윈도우 토큰 수 목록")
+    parser.add_argument("--requests", type=int, default=64, help="케이스당 요청 수")
+    parser.add_argument("--max-tokens", type=int, default=256, help="요청당 max_tokens")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청 타임아웃 (초)")
+    parser.add_argument("--seed", type=int, default=42, help="코퍼스/도착 간격 시드")
+    parser.add_argument("--mock", action="store_true", help="모의 vLLM 서버를 띄워 대상으로 사용 (GPU 불필요)")
+    parser.add_argument("--mock-ttft", type=float, default=0.2, help="모의 서버 평균 TTFT (초)")
+    parser.add_argument("--mock-tps", type=float, default=40.0, help="모의 서버 요청당 생성 속도 (tok/s)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: performance_report_<시각>.json)")
+    args = parser.parse_args()
+
+    mock_server = None
+    base_url = args.base_url
+    if args.mock:
+        mock_server = MockVLLMServer(config=MockServerConfig(
+            model=args.model, ttft=args.mock_ttft, tokens_per_second=args.mock_tps,
+            prefill_tokens_per_second=5000.0, output_tokens=args.max_tokens, seed=args.seed
+        )).start()
+        base_url = mock_server.base_url
+        print(f"🧪 모의 vLLM 서버 사용: {base_url}")
+
+    tester = PerformanceTester(base_url, args.model, args.max_tokens, args.timeout)
+    if not tester.check_vllm_server():
+        print(f"❌ 서버에 연결할 수 없습니다: {base_url} (GPU 없이 실행하려면 --mock)")
+        return
+
+    loads = args.concurrency if args.mode == "closed" else args.rates
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "base_url": base_url,
+        "model": args.model,
+        "mock": args.mock,
+        "mode": args.mode,
+        "max_tokens": args.max_tokens,
+        "seed": args.seed,
+        "cases": []
+    }
+    print(f"🚀 부하 테스트 시작 ({args.mode}-loop, 케이스당 {args.requests}개 요청)")
+    try:
+        for window_tokens in args.window_tokens:
+            conversations = tester.build_requests(window_tokens, args.requests, args.seed)
+            for load in loads:
+                label = f"동시성 {load}" if args.mode == "closed" else f"{load}/s"
+                print(f"   ▶ 윈도우 {window_tokens}토큰, {label}...")
+                if args.mode == "closed":
+                    results, wall = tester.run_closed_loop(conversations, load)
+                else:
+                    results, wall = tester.run_open_loop(conversations, load, args.seed)
+                report["cases"].append({
+                    "mode": args.mode,
+                    "concurrency": load if args.mode == "closed" else None,
+                    "rate": load if args.mode == "open" else None,
+                    "window_tokens": window_tokens,
+                    "summary": summarize_case(results, wall),
+                    "results": [asdict(result) for result in results]
+                })
+    finally:
+        if mock_server:
+            report["mock_stats"] = mock_server.get_stats()
+            mock_server.stop()
+
+    print_summary_table(report["cases"])
+    save_performance_report(report, args.output)
 
 if __name__ == "__main__":
     main()
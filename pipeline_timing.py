@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+파이프라인 단계별 시간 측정 모듈 - 읽기/토큰화/윈도우 분할/프롬프트 렌더링/HTTP/저장 단계별 타이머와 카운터
+"""
+
+import time
+import threading
+from typing import Dict
+
+from config import PIPELINE_TIMING
+
+class _NullStage:
+    """측정을 끈 경우의 빈 컨텍스트 (할당/시간 측정 없음)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    """단계 하나의 측정 컨텍스트 - 하위 단계 시간은 빼고 자기 시간만 기록
+
+    시작할 때의 스레드 상태에 기록하므로, 측정 중에 다른 스레드가 reset해도
+    버려진 상태에 쌓일 뿐 새 상태의 스택을 건드리지 않는다.
+    """
+
+    __slots__ = ("timer", "name", "started", "child_seconds", "state")
+
+    def __init__(self, timer: "PipelineTimer", name: str):
+        self.timer = timer
+        self.name = name
+        self.child_seconds = 0.0
+
+    def __enter__(self):
+        self.state = self.timer._local_state()
+        self.state["stack"].append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        state = self.state
+        state["stack"].pop()
+        self.timer._record(state, self.name, elapsed - self.child_seconds, 1)
+        if state["stack"]:
+            state["stack"][-1].child_seconds += elapsed
+        return False
+
+class PipelineTimer:
+    """단계별 monotonic 타이머와 카운터
+
+    단계는 중첩될 수 있으며 각 단계에는 하위 단계를 뺀 자기 시간만 쌓이므로 단계 합이 중복 없이 나뉜다.
+    스레드별로 따로 누적하고 리포트 시점에 합치므로 측정 경로에는 잠금이 없다.
+    여러 스레드의 시간을 합산하므로 단계 합은 실행 시간(wall)보다 클 수 있다 (비율은 단계 합 기준).
+    """
+
+    def __init__(self, enabled: bool = PIPELINE_TIMING):
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._states = []
+        self._started = time.perf_counter()
+
+    def _local_state(self) -> Dict:
+        """현재 스레드의 누적 상태 (reset 이후 처음 사용하면 새로 등록)"""
+        state = getattr(self._local, "state", None)
+        if state is None or state["generation"] != self._generation:
+            state = {"generation": self._generation, "stages": {}, "counters": {}, "stack": []}
+            self._local.state = state
+            with self._lock:
+                self._states.append(state)
+        return state
+
+    def _record(self, state: Dict, name: str, seconds: float, calls: int):
+        entry = state["stages"].get(name)
+        if entry is None:
+            entry = state["stages"][name] = [0.0, 0]
+        entry[0] += seconds
+        entry[1] += calls
+
+    def stage(self, name: str):
+        """with 블록 구간을 name 단계로 측정"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def add(self, name: str, seconds: float, calls: int = 1):
+        """직접 잰 시간 추가 (줄 단위처럼 호출이 많은 구간용) - 실행 중인 상위 단계의 자기 시간에서는 제외"""
+        if not self.enabled:
+            return
+        state = self._local_state()
+        self._record(state, name, seconds, calls)
+        if state["stack"]:
+            state["stack"][-1].child_seconds += seconds
+
+    def count(self, name: str, value: int = 1):
+        """카운터 증가 (읽은 바이트, 라인, 윈도우 수 등)"""
+        if not self.enabled:
+            return
+        counters = self._local_state()["counters"]
+        counters[name] = counters.get(name, 0) + value
+
+    def reset(self):
+        """누적값 초기화 (실행 시작 시 호출) - 진행 중인 단계의 시간은 이전 누적값에 기록되고 버려짐"""
+        with self._lock:
+            self._generation += 1
+            self._states = []
+        self._started = time.perf_counter()
+
+    def get_report(self) -> Dict:
+        """단계별 시간/호출 수/비율과 카운터 (시간 합이 큰 단계부터)"""
+        with self._lock:
+            states = list(self._states)
+
+        stages = {}
+        counters = {}
+        for state in states:
+            for name, (seconds, calls) in list(state["stages"].items()):
+                entry = stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+                entry["seconds"] += seconds
+                entry["calls"] += calls
+            for name, value in list(state["counters"].items()):
+                counters[name] = counters.get(name, 0) + value
+
+        total = sum(entry["seconds"] for entry in stages.values())
+        for entry in stages.values():
+            entry["share"] = entry["seconds"] / total if total else 0.0
+        return {
+            "enabled": self.enabled,
+            "wall_seconds": time.perf_counter() - self._started,
+            "stage_seconds": total,
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["seconds"])),
+            "counters": counters
+        }
+
+def format_timing_summary(report: Dict) -> str:
+    """"tokenize 41%, http 55%" 형태의 한 줄 요약"""
+    return ", ".join(f"{name} {entry['share'] * 100:.0f}%" for name, entry in report["stages"].items())
+
+def print_timing_report(report: Dict):
+    """단계별 시간 출력"""
+    if not report["stages"]:
+        return
+    print(f"⏱️ 단계별 시간: {format_timing_summary(report)} "
+          f"(단계 합 {report['stage_seconds']:.1f}s, 실행 {report['wall_seconds']:.1f}s)")
+    for name, entry in report["stages"].items():
+        print(f"   {name:<10} {entry['seconds']:>8.2f}s  {entry['share'] * 100:5.1f}%  {entry['calls']:>9,}회")
+
+pipeline_timer = PipelineTimer()
+
+def get_pipeline_timer() -> PipelineTimer:
+    """파이프라인 타이머 인스턴스 반환"""
+    return pipeline_timer
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+우선순위 스케줄러 모듈 - 대기 중인 윈도우 분석을 심각도/분석 타입 순으로 처리 (에이징으로 기아 방지)
+"""
+
+import re
+import time
+import heapq
+import itertools
+import threading
+import concurrent.futures
+from collections import defaultdict, deque
+from typing import Callable, Dict, List
+
+from prompt_templates import AnalysisType
+from llm_client import get_llm_client
+from config import SCHEDULER_AGING_RATE
+
+# 분석 타입별 기본 우선순위 (CRITICAL > SECURITY > ...)
+ANALYSIS_TYPE_PRIORITY = {
+    AnalysisType.CRITICAL: 60,
+    AnalysisType.SECURITY: 50,
+    AnalysisType.DATABASE: 40,
+    AnalysisType.MEMORY: 30,
+    AnalysisType.NETWORK: 30,
+    AnalysisType.PERFORMANCE: 20,
+    AnalysisType.GENERAL: 10,
+}
+
+# 로그 레벨별 심각도 가중치
+LEVEL_WEIGHTS = {"CRITICAL": 1.0, "FATAL": 1.0, "ERROR": 0.5, "WARN": 0.1, "WARNING": 0.1}
+LEVEL_PATTERN = re.compile(r'\b(CRITICAL|FATAL|ERROR|WARNING|WARN)\b')
+# 실행기별로 보관하는 클래스당 최근 대기시간 수 (공유 실행기는 프로세스가 끝날 때까지 살아 있음)
+WAIT_TIME_HISTORY = 10000
+
+def get_severity_score(window_text: str) -> float:
+    """윈도우 심각도 점수 (0~50) - 레벨 가중 비율 x 30 + CRITICAL/FATAL 포함 시 20"""
+    lines = [line for line in window_text.splitlines() if line.strip()]
+    if not lines:
+        return 0.0
+    weighted = 0.0
+    has_critical = False
+    for line in lines:
+        match = LEVEL_PATTERN.search(line)
+        if match:
+            weighted += LEVEL_WEIGHTS[match.group(1)]
+            has_critical = has_critical or match.group(1) in ("CRITICAL", "FATAL")
+    return 30.0 * weighted / len(lines) + (20.0 if has_critical else 0.0)
+
+def get_window_priority(window_text: str, analysis_type: AnalysisType) -> float:
+    """윈도우 우선순위 (클수록 먼저 처리) = 분석 타입 기본값 + 심각도 점수"""
+    return ANALYSIS_TYPE_PRIORITY.get(analysis_type, 0) + get_severity_score(window_text)
+
+class PriorityExecutor:
+    """우선순위 큐를 앞에 둔 스레드 풀
+
+    실효 우선순위 = priority + aging_rate x 대기시간(초) 이므로
+    힙 키를 (aging_rate x 제출시각 - priority)로 두면 대기 중 순서가 바뀌지 않아 힙 하나로 처리할 수 있다.
+    concurrency가 주어지면 실행 중 작업 수가 그 값(예: 적응형 동시성 한도)을 넘지 않을 때만 꺼내므로,
+    스레드가 미리 작업을 꺼내 HTTP 클라이언트 앞에서 순서 없이 대기하지 않는다.
+    파이프라인은 get_priority_executor()로 프로세스 전체가 실행기 하나를 공유한다.
+    """
+
+    def __init__(self, max_workers: int, aging_rate: float = SCHEDULER_AGING_RATE,
+                 concurrency: Callable[[], int] = None):
+        self.aging_rate = aging_rate
+        self.concurrency = concurrency
+        self._running = 0
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._wait_times = defaultdict(lambda: deque(maxlen=WAIT_TIME_HISTORY))
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"priority-worker-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable, *args, priority: float = 0.0, priority_class: str = "default",
+               wait_times: Dict[str, List[float]] = None, **kwargs) -> concurrent.futures.Future:
+        """작업 제출 - priority가 클수록, 오래 기다릴수록 먼저 실행
+
+        wait_times(defaultdict(list))를 주면 이 작업의 큐 대기시간을 priority_class별로 추가로 기록한다
+        (공유 실행기에서 호출 한 번의 대기시간만 따로 보기 위함).
+        """
+        future = concurrent.futures.Future()
+        enqueued_at = time.monotonic()
+        key = self.aging_rate * enqueued_at - priority
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("cannot submit after shutdown")
+            heapq.heappush(self._heap, (key, next(self._sequence), enqueued_at, priority_class, wait_times,
+                                        future, fn, args, kwargs))
+            self._condition.notify()
+        return future
+
+    def _worker(self):
+        """큐에서 우선순위가 가장 높은 작업을 꺼내 실행"""
+        while True:
+            with self._condition:
+                while not self._shutdown or self._heap:
+                    if self._heap and not self._is_saturated():
+                        break
+                    # 한도가 늘어나는 경우도 반영하도록 주기적으로 다시 확인
+                    self._condition.wait(0.5)
+                if not self._heap:
+                    return
+                _, _, enqueued_at, priority_class, wait_times, future, fn, args, kwargs = heapq.heappop(self._heap)
+                wait = time.monotonic() - enqueued_at
+                self._wait_times[priority_class].append(wait)
+                if wait_times is not None:
+                    wait_times[priority_class].append(wait)
+                self._running += 1
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._condition:
+                    self._running -= 1
+                    self._condition.notify_all()
+
+    def _is_saturated(self) -> bool:
+        """실행 중 작업 수가 동시성 한도에 도달했는지"""
+        return self.concurrency is not None and self._running >= max(1, self.concurrency())
+
+    def shutdown(self, wait: bool = True):
+        """남은 작업을 모두 처리한 뒤 종료"""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown(wait=True)
+
+    def get_wait_stats(self) -> Dict[str, Dict]:
+        """우선순위 클래스별 큐 대기시간 통계 (초, 클래스당 최근 WAIT_TIME_HISTORY개)"""
+        with self._condition:
+            snapshot = {name: list(waits) for name, waits in self._wait_times.items()}
+        return summarize_wait_times(snapshot)
+
+def summarize_wait_times(wait_times: Dict[str, List[float]]) -> Dict[str, Dict]:
+    """클래스별 대기시간 목록 → 개수/평균/p50/p95/최대 (초)"""
+    stats = {}
+    for name, waits in wait_times.items():
+        if not waits:
+            continue
+        waits = sorted(waits)
+        stats[name] = {
+            "count": len(waits),
+            "mean": sum(waits) / len(waits),
+            "p50": waits[int(0.50 * (len(waits) - 1))],
+            "p95": waits[int(0.95 * (len(waits) - 1))],
+            "max": waits[-1]
+        }
+    return stats
+
+def print_wait_stats(stats: Dict[str, Dict]):
+    """클래스별 대기시간 출력 (기본 우선순위 높은 순)"""
+    if not stats:
+        return
+    order = {analysis_type.value: priority for analysis_type, priority in ANALYSIS_TYPE_PRIORITY.items()}
+    names = sorted(stats, key=lambda name: -order.get(name, 0))
+    print("⏳ 우선순위 클래스별 큐 대기시간")
+    for name in names:
+        stat = stats[name]
+        print(f"   {name:<12} {stat['count']:>4}개  평균 {stat['mean']:.1f}s  p50 {stat['p50']:.1f}s  "
+              f"p95 {stat['p95']:.1f}s  최대 {stat['max']:.1f}s")
+
+# 전역 인스턴스
+priority_executor = None
+_priority_executor_lock = threading.Lock()
+
+def get_priority_executor() -> PriorityExecutor:
+    """프로세스 전체가 공유하는 우선순위 실행기 반환
+
+    모니터/자동 분석 트리거가 겹쳐도 모든 윈도우가 한 큐에서 우선순위와 대기시간(에이징)으로 경쟁하고,
+    실행 중 작업 수는 LLM 클라이언트의 동시성 한도를 함께 따른다.
+    """
+    global priority_executor
+    with _priority_executor_lock:
+        if priority_executor is None:
+            priority_executor = PriorityExecutor(
+                max_workers=get_llm_client().get_max_workers(),
+                concurrency=lambda: get_llm_client().limiter.limit
+            )
+        return priority_executor
@@ -3,9 +3,17 @@
 프롬프트 템플릿 모듈 - 다양한 분석 시나리오에 대한 프롬프트 템플릿 관리
 """
 
-from typing import Dict, List, Optional
+import re
+import json
+import hashlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
 from enum import Enum
 
+from config import DIGEST_MAX_TOKENS, PROMPT_LAYOUT, OUTPUT_FORMAT
+from pipeline_timing import get_pipeline_timer
+
 class AnalysisType(Enum):
     """분석 타입 열거형"""
     GENERAL = "general"
@@ -16,6 +24,231 @@ class AnalysisType(Enum):
     PERFORMANCE = "performance"
     CRITICAL = "critical"
 
+class PromptLayout(Enum):
+    """사용자 프롬프트 배치 방식"""
+    CLASSIC = "classic"            # [META] → [LOG WINDOW] → [TASK]
+    PREFIX_CACHE = "prefix_cache"  # [TASK] → 고정 [META] → time_range + [LOG WINDOW] (vLLM prefix caching용)
+
+class OutputFormat(Enum):
+    """분석 결과 출력 형식"""
+    MARKDOWN = "markdown"  # 항목별 서술형 (기본)
+    JSON = "json"          # 압축 JSON 스키마 (structured_output.ANALYSIS_SCHEMA)
+
+# 분석 타입별 감지 키워드 (단어 단위로 매칭, 복수형/과거형/진행형 어미 허용)
+ANALYSIS_KEYWORDS = {
+    AnalysisType.DATABASE: ['database', 'db', 'mysql', 'postgresql', 'connection', 'query', 'queries', 'sql', 'deadlock'],
+    AnalysisType.MEMORY: ['memory', 'oom', 'outofmemory', 'gc', 'heap', 'ram'],
+    AnalysisType.NETWORK: ['network', 'timeout', 'timed out', 'connection refused', 'unreachable', 'latency'],
+    AnalysisType.SECURITY: ['security', 'attack', 'breach', 'unauthorized', 'injection', 'hack'],
+    AnalysisType.PERFORMANCE: ['performance', 'slow', 'bottleneck', 'cpu', 'response time'],
+    AnalysisType.CRITICAL: ['critical', 'fatal', 'emergency', 'down', 'unavailable'],
+}
+
+# 키워드가 나온 라인의 레벨별 가중치 (레벨이 없거나 INFO/DEBUG면 1)
+DETECT_LEVEL_WEIGHTS = {"critical": 4.0, "fatal": 4.0, "error": 3.0, "warning": 2.0, "warn": 2.0}
+
+_KEYWORD_TYPES = {keyword: analysis_type for analysis_type, keywords in ANALYSIS_KEYWORDS.items() for keyword in keywords}
+
+def _build_trie_pattern(words: List[str]) -> str:
+    """단어 목록을 접두사 트리 형태의 정규식으로 변환 (위치마다 단어를 하나씩 시도하지 않도록)
+
+    하위 분기가 선택적으로 붙으므로 "connection refused"처럼 더 긴 단어가 먼저 매칭된다.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+# 키워드를 한 번에 찾는 정규식 - 줄바꿈은 str.count로 세므로 키워드가 없는 라인은 파이썬 코드를 거치지 않음
+_DETECT_PATTERN = re.compile(r'\b(?P<word>' + _build_trie_pattern(list(_KEYWORD_TYPES)) + r')(?:s|es|ed|ing)?\b')
+# 라인의 LEVEL 필드 (소문자) - `YYYY-MM-DD HH:MM:SS LEVEL [SERVICE] MESSAGE`의 타임스탬프 다음 단어,
+# 타임스탬프가 없는 라인은 첫 단어 (메시지 안의 "critical" 같은 단어는 레벨로 보지 않음)
+_LEVEL_FIELD_PATTERN = re.compile(r'[ \t]*(?:\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} )?([a-z]+)\b')
+# 점수가 같으면 예전 감지 순서를 따름
+_DETECT_ORDER = {analysis_type: index for index, analysis_type in enumerate(ANALYSIS_KEYWORDS)}
+
+def _iter_line_hits(text: str) -> Iterator[Tuple[int, float, List[AnalysisType]]]:
+    """소문자 텍스트에서 키워드가 있는 라인마다 (라인 번호, 레벨 가중치, 키워드 타입 목록)
+
+    가중치는 라인의 LEVEL 필드로만 정하고, 키워드가 있는 라인만 LEVEL 필드를 읽는다.
+    CRITICAL/FATAL 레벨 단어는 CRITICAL 타입 키워드로도 센다.
+    """
+    line_no = 0
+    position = 0
+    current = -1
+    hits = []
+    line_weight = 1.0
+    for match in _DETECT_PATTERN.finditer(text):
+        start = match.start()
+        line_no += text.count("\n", position, start)
+        position = start
+        if line_no != current:
+            if hits:
+                yield current, line_weight, hits
+                hits = []
+            current = line_no
+            level = _LEVEL_FIELD_PATTERN.match(text, text.rfind("\n", 0, start) + 1)
+            line_weight = DETECT_LEVEL_WEIGHTS.get(level.group(1), 1.0) if level else 1.0
+        hits.append(_KEYWORD_TYPES[match.group("word")])
+    if hits:
+        yield current, line_weight, hits
+
+def score_log_line(line: str) -> Dict[AnalysisType, float]:
+    """라인 하나의 타입별 키워드 점수 (키워드 수 × 라인 레벨 가중치) - 키워드가 없으면 빈 dict"""
+    scores = {}
+    for _, weight, hits in _iter_line_hits(line.lower()):
+        for analysis_type in hits:
+            scores[analysis_type] = scores.get(analysis_type, 0.0) + weight
+    return scores
+
+def rank_scores(scores: Dict[AnalysisType, float]) -> List[Tuple[AnalysisType, float]]:
+    """타입별 점수를 점수 순 (분석 타입, 점수) 목록으로 정렬 - 점수가 0인 타입은 제외"""
+    return sorted(((analysis_type, score) for analysis_type, score in scores.items() if score > 0),
+                  key=lambda item: (-item[1], _DETECT_ORDER[item[0]]))
+
+def top_analysis_type(scores: Dict[AnalysisType, float]) -> AnalysisType:
+    """점수가 가장 높은 분석 타입 (점수가 없으면 GENERAL)"""
+    ranked = rank_scores(scores)
+    return ranked[0][0] if ranked else AnalysisType.GENERAL
+
+def top_analysis_types(scores: Dict[AnalysisType, float], k: int,
+                       min_score_ratio: float = 0.0) -> List[AnalysisType]:
+    """점수 상위 k개 분석 타입 - 1위 점수의 min_score_ratio 미만인 타입은 제외 (점수가 없으면 [GENERAL])"""
+    ranked = rank_scores(scores)
+    if not ranked:
+        return [AnalysisType.GENERAL]
+    threshold = ranked[0][1] * min_score_ratio
+    return [analysis_type for analysis_type, score in ranked[:max(k, 1)] if score >= threshold]
+
+def get_default_layout() -> PromptLayout:
+    """설정(PROMPT_LAYOUT)에 지정된 기본 배치 방식 반환"""
+    try:
+        return PromptLayout(PROMPT_LAYOUT)
+    except ValueError:
+        return PromptLayout.CLASSIC
+
+def get_default_output_format() -> OutputFormat:
+    """설정(OUTPUT_FORMAT)에 지정된 기본 출력 형식 반환"""
+    try:
+        return OutputFormat(OUTPUT_FORMAT)
+    except ValueError:
+        return OutputFormat.MARKDOWN
+
+# 분석 타입별 요청 설정
+ANALYSIS_CONFIGS = {
+    AnalysisType.GENERAL: {
+        "temperature": 0.2,
+        "max_tokens": 1200,
+        "timeout": 60
+    },
+    AnalysisType.DATABASE: {
+        "temperature": 0.1,
+        "max_tokens": 1500,
+        "timeout": 90
+    },
+    AnalysisType.MEMORY: {
+        "temperature": 0.1,
+        "max_tokens": 1400,
+        "timeout": 90
+    },
+    AnalysisType.NETWORK: {
+        "temperature": 0.2,
+        "max_tokens": 1300,
+        "timeout": 75
+    },
+    AnalysisType.SECURITY: {
+        "temperature": 0.1,
+        "max_tokens": 1600,
+        "timeout": 120
+    },
+    AnalysisType.PERFORMANCE: {
+        "temperature": 0.2,
+        "max_tokens": 1400,
+        "timeout": 90
+    },
+    AnalysisType.CRITICAL: {
+        "temperature": 0.1,
+        "max_tokens": 1800,
+        "timeout": 150
+    }
+}
+
+# JSON 스키마 크기에 맞춘 max_tokens (항목 수/문장 길이 제한 기준)
+JSON_MAX_TOKENS = {
+    AnalysisType.GENERAL: 384,
+    AnalysisType.DATABASE: 448,
+    AnalysisType.MEMORY: 448,
+    AnalysisType.NETWORK: 416,
+    AnalysisType.SECURITY: 512,
+    AnalysisType.PERFORMANCE: 448,
+    AnalysisType.CRITICAL: 576
+}
+
+JSON_ANALYSIS_CONFIGS = {
+    analysis_type: {**config, "max_tokens": JSON_MAX_TOKENS[analysis_type]}
+    for analysis_type, config in ANALYSIS_CONFIGS.items()
+}
+
+@dataclass
+class CompiledTemplate:
+    """분석 타입/배치 방식/출력 형식별로 한 번만 만드는 프롬프트 - 로그 윈도우 앞뒤 부분과 고정 토큰 수"""
+    analysis_type: AnalysisType
+    system_prompt: str
+    prefix: str            # 로그 윈도우 앞부분 (메타 필드 포함 format 문자열)
+    suffix: str            # 로그 윈도우 뒷부분 (메타 필드 포함 format 문자열)
+    overhead_tokens: int   # 시스템 프롬프트 + 앞뒤 부분 토큰 수 (메타 값 제외)
+
+    def render(self, log_content: str, **fields) -> str:
+        """사용자 프롬프트 생성 - 짧은 앞뒤 부분만 format하고 로그 윈도우는 한 번만 복사"""
+        return "".join((self.prefix.format(**fields), log_content, self.suffix.format(**fields)))
+
+# JSON 출력 형식 지시 - [TASK] 항목을 이 스키마에 맞춰 짧게 답하게 함
+JSON_OUTPUT_SECTION = """[OUTPUT FORMAT]
+위 항목을 아래 형식의 JSON 객체 하나로만 답하라. 마크다운/설명 금지, 각 문자열은 한 문장 이내.
+{{"symptoms":["증상"],"hypotheses":[{{"cause":"원인","priority":1}}],"commands":["쉘 명령"],"mitigations":["조치"],"confidence":"low|medium|high"}}
+symptoms 최대 5개, hypotheses 최대 3개(priority 1이 가장 유력), commands 최대 5개, mitigations 최대 3개"""
+
+# 압축 로그 형식 설명 (log_compactor.LogCompactor 출력) - 압축한 윈도우를 보낼 때만 추가
+COMPACT_LOG_SECTION = """[LOG FORMAT]
+[LOG WINDOW]는 압축 형식이다. t0=기준 시각, levels/services/templates는 약어 정의.
+각 라인: +초(t0 기준) 레벨 서비스 뒤에 템플릿 번호와 파라미터(템플릿의 *를 순서대로 채움), 또는 "| 원문 메시지"
+"~ "로 시작하는 라인은 형식이 달라 원문 그대로 둔 라인
+답변에는 약어 대신 원래 서비스명과 시각을 쓴다"""
+
+# 여러 분석 타입을 한 요청으로 분석할 때 응답을 타입별 섹션으로 나누게 하는 지시
+MULTI_LABEL_ANSWER_SECTION = """[ANSWER FORMAT]
+위 작업마다 {headings} 순서로 제목 줄을 두고 섹션을 나눠 답하라. 여러 작업에 겹치는 내용은 처음 나온 섹션에만 쓴다."""
+
+# 응답의 "## database" 같은 섹션 제목 줄
+_SECTION_HEADING_PATTERN = re.compile(r'^#{1,4}\s*\[?([A-Za-z]+)\]?[^\n]*$', re.MULTILINE)
+
+def split_multi_label_response(text: str, analysis_types: List[AnalysisType]) -> Dict[str, str]:
+    """여러 타입을 함께 분석한 응답을 {분석 타입 값: 섹션 내용}으로 분리
+    
+    제목 줄이 없는 타입은 빠지고, 제목을 하나도 찾지 못하면 응답 전체를 첫 번째 타입 섹션으로 둔다.
+    """
+    names = {analysis_type.value for analysis_type in analysis_types}
+    matches = [match for match in _SECTION_HEADING_PATTERN.finditer(text) if match.group(1).lower() in names]
+    if not matches:
+        return {analysis_types[0].value: text.strip()}
+    sections = {}
+    for match, following in zip(matches, matches[1:] + [None]):
+        name = match.group(1).lower()
+        content = text[match.end():following.start() if following else len(text)].strip()
+        sections[name] = (sections[name] + "\n\n" + content) if name in sections else content
+    return sections
+
 class PromptTemplates:
     """프롬프트 템플릿 관리 클래스"""
     
@@ -39,6 +272,38 @@ class PromptTemplates:
             AnalysisType.PERFORMANCE: self._get_performance_user_template(),
             AnalysisType.CRITICAL: self._get_critical_user_template()
         }
+        
+        # prefix caching용 템플릿 - 같은 원본 템플릿에서 섹션 순서만 바꿔 생성
+        self.prefix_cache_templates = {
+            analysis_type: self._build_prefix_cache_template(template)
+            for analysis_type, template in self.user_prompt_templates.items()
+        }
+        
+        # JSON 출력용 템플릿 - 작업 항목 뒤에 출력 형식 지시 추가
+        self.json_templates = {
+            analysis_type: template + "\n\n" + JSON_OUTPUT_SECTION
+            for analysis_type, template in self.user_prompt_templates.items()
+        }
+        self.json_prefix_cache_templates = {
+            analysis_type: self._build_prefix_cache_template(template)
+            for analysis_type, template in self.json_templates.items()
+        }
+        
+        self._compiled_templates = {}
+        self._token_counter = None
+    
+    def _build_prefix_cache_template(self, template: str) -> str:
+        """정적인 부분(작업 지시, 고정 메타)을 앞에, 윈도우마다 달라지는 부분을 뒤에 배치
+        
+        원본: [META](time_range 포함) → [LOG WINDOW] → [TASK]
+        변환: [TASK] → [META](time_range 제외) → [LOG WINDOW](time_range + 로그)
+        """
+        sections = template.split("\n\n")
+        meta_section = next(section for section in sections if section.startswith("[META]"))
+        task_sections = [section for section in sections
+                         if not section.startswith("[META]") and not section.startswith("[LOG WINDOW]")]
+        static_meta = "\n".join(line for line in meta_section.split("\n") if not line.startswith("time_range="))
+        return "\n\n".join(task_sections + [static_meta, "[LOG WINDOW]\ntime_range={time_range}\n{log_content}"])
     
     def _get_general_system_prompt(self) -> str:
         """일반적인 로그 분석 시스템 프롬프트"""
@@ -235,75 +500,231 @@ severity_top={severity}
 5) 즉시 조치사항 및 장기 개선방안
 6) 확신도[낮음/중간/높음]"""
     
+    def get_digest_system_prompt(self) -> str:
+        """인시던트 요약(reduce) 시스템 프롬프트"""
+        return (
+            "You are an incident commander consolidating many partial log analyses into one incident digest. "
+            "Merge duplicate findings, keep only evidence-backed root causes, and rank them by impact. "
+            "Preserve concrete service names and shell commands from the inputs. "
+            "Be concise: the digest is paged to the on-call engineer."
+        )
+    
+    def get_digest_user_prompt(self, service: str, level: int, input_count: int, analyses: str) -> str:
+        """인시던트 요약(reduce) 사용자 프롬프트 - 입력이 윈도우 분석이든 중간 요약이든 같은 형식"""
+        return f"""[DIGEST META]
+service={service}
+reduce_level={level}
+inputs={input_count}
+
+[PARTIAL ANALYSES]
+{analyses}
+
+[DIGEST TASK]
+1) 근본 원인(우선순위, 근거 윈도우 범위)
+2) 영향받는 서비스
+3) 즉시 점검/복구 명령(쉘)
+4) 타임라인 요약
+5) 확신도[낮음/중간/높음]"""
+    
+    def get_digest_config(self) -> Dict:
+        """인시던트 요약 설정 반환"""
+        return {
+            "temperature": 0.1,
+            "max_tokens": DIGEST_MAX_TOKENS,
+            "timeout": 150
+        }
+    
     def get_system_prompt(self, analysis_type: AnalysisType) -> str:
         """분석 타입에 따른 시스템 프롬프트 반환"""
         return self.system_prompts.get(analysis_type, self.system_prompts[AnalysisType.GENERAL])
     
-    def get_user_prompt(self, analysis_type: AnalysisType, **kwargs) -> str:
+    def get_user_template(self, analysis_type: AnalysisType, layout: PromptLayout = None,
+                          output_format: OutputFormat = None, compact: bool = False) -> str:
+        """분석 타입, 배치 방식, 출력 형식에 따른 사용자 프롬프트 템플릿 반환 (compact면 압축 로그 형식 설명 추가)"""
+        layout = layout or get_default_layout()
+        output_format = output_format or get_default_output_format()
+        if compact:
+            template = self.user_prompt_templates.get(analysis_type, self.user_prompt_templates[AnalysisType.GENERAL])
+            return self._finish_template(template, layout, output_format, compact)
+        if output_format == OutputFormat.JSON:
+            templates = self.json_prefix_cache_templates if layout == PromptLayout.PREFIX_CACHE else self.json_templates
+        else:
+            templates = self.prefix_cache_templates if layout == PromptLayout.PREFIX_CACHE else self.user_prompt_templates
+        return templates.get(analysis_type, templates[AnalysisType.GENERAL])
+    
+    def get_compiled_template(self, analysis_type: AnalysisType, layout: PromptLayout = None,
+                              output_format: OutputFormat = None, compact: bool = False) -> CompiledTemplate:
+        """로그 윈도우 자리에서 나눈 템플릿 반환 (조합별로 처음 요청될 때 한 번만 만들고 재사용)"""
+        layout = layout or get_default_layout()
+        output_format = output_format or get_default_output_format()
+        key = (analysis_type, layout, output_format, compact)
+        compiled = self._compiled_templates.get(key)
+        if compiled is None:
+            compiled = self._compile_template(analysis_type, layout, output_format, compact)
+            self._compiled_templates[key] = compiled
+        return compiled
+    
+    def _compile_template(self, analysis_type: AnalysisType, layout: PromptLayout,
+                          output_format: OutputFormat, compact: bool = False) -> CompiledTemplate:
+        """분석 타입/배치 방식/출력 형식에 맞는 템플릿 컴파일"""
+        return self._build_compiled_template(
+            analysis_type,
+            self.get_system_prompt(analysis_type),
+            self.get_user_template(analysis_type, layout, output_format, compact)
+        )
+    
+    def _build_compiled_template(self, analysis_type: AnalysisType, system_prompt: str,
+                                 user_template: str) -> CompiledTemplate:
+        """사용자 템플릿을 {log_content} 앞뒤로 나누고 메타 값을 비운 상태의 토큰 수 계산"""
+        # sliding_window가 이 모듈을 import하므로 순환 import를 피해 여기서 로딩
+        from sliding_window import TokenCounter
+        
+        prefix, suffix = user_template.split("{log_content}")
+        if self._token_counter is None:
+            self._token_counter = TokenCounter()
+        empty_fields = {"service": "", "host": "", "time_range": "", "severity": ""}
+        overhead_tokens = self._token_counter.count_tokens(
+            system_prompt + prefix.format(**empty_fields) + suffix.format(**empty_fields)
+        )
+        return CompiledTemplate(
+            analysis_type=analysis_type,
+            system_prompt=system_prompt,
+            prefix=prefix,
+            suffix=suffix,
+            overhead_tokens=overhead_tokens
+        )
+    
+    def get_prompt_overhead_tokens(self, analysis_type: AnalysisType, layout: PromptLayout = None,
+                                   output_format: OutputFormat = None, compact: bool = False) -> int:
+        """로그 윈도우를 제외한 프롬프트 토큰 수 (메타 값 제외) - 더미 프롬프트를 만들지 않고 바로 조회"""
+        return self.get_compiled_template(analysis_type, layout, output_format, compact).overhead_tokens
+    
+    def _finish_template(self, template: str, layout: PromptLayout, output_format: OutputFormat,
+                         compact: bool) -> str:
+        """기본 배치 템플릿에 출력 형식/압축 로그 지시를 붙이고 배치 방식 적용"""
+        if output_format == OutputFormat.JSON:
+            template += "\n\n" + JSON_OUTPUT_SECTION
+        if compact:
+            template += "\n\n" + COMPACT_LOG_SECTION
+        return self._build_prefix_cache_template(template) if layout == PromptLayout.PREFIX_CACHE else template
+    
+    def get_multi_label_user_template(self, analysis_types: List[AnalysisType], layout: PromptLayout = None,
+                                      compact: bool = False) -> str:
+        """여러 분석 타입의 작업 섹션을 로그 윈도우 하나에 모은 템플릿 (서술형 출력 전용)"""
+        layout = layout or get_default_layout()
+        base_sections = self.user_prompt_templates[AnalysisType.GENERAL].split("\n\n")
+        sections = [section for section in base_sections
+                    if section.startswith("[META]") or section.startswith("[LOG WINDOW]")]
+        for analysis_type in analysis_types:
+            template = self.user_prompt_templates.get(analysis_type, self.user_prompt_templates[AnalysisType.GENERAL])
+            sections.extend(section for section in template.split("\n\n")
+                            if not section.startswith("[META]") and not section.startswith("[LOG WINDOW]"))
+        headings = ", ".join(f'"## {analysis_type.value}"' for analysis_type in analysis_types)
+        sections.append(MULTI_LABEL_ANSWER_SECTION.format(headings=headings))
+        return self._finish_template("\n\n".join(sections), layout, OutputFormat.MARKDOWN, compact)
+    
+    def get_multi_label_system_prompt(self, analysis_types: List[AnalysisType]) -> str:
+        """여러 분석 타입을 함께 다루는 시스템 프롬프트"""
+        areas = ", ".join(analysis_type.value for analysis_type in analysis_types)
+        return (
+            f"You are an SRE/DevOps log expert covering several areas at once: {areas}. "
+            "Be factual and concise. Analyze the provided logs once and answer every requested area "
+            "in its own section, without repeating the same finding across sections."
+        )
+    
+    def get_multi_label_template(self, analysis_types: List[AnalysisType], layout: PromptLayout = None,
+                                 output_format: OutputFormat = None, compact: bool = False) -> CompiledTemplate:
+        """여러 분석 타입을 한 요청으로 분석하는 컴파일된 템플릿 (타입이 하나면 단일 타입 템플릿)"""
+        if len(analysis_types) == 1:
+            return self.get_compiled_template(analysis_types[0], layout, output_format, compact)
+        layout = layout or get_default_layout()
+        key = (tuple(analysis_types), layout, OutputFormat.MARKDOWN, compact)
+        compiled = self._compiled_templates.get(key)
+        if compiled is None:
+            compiled = self._build_compiled_template(
+                analysis_types[0],
+                self.get_multi_label_system_prompt(analysis_types),
+                self.get_multi_label_user_template(analysis_types, layout, compact)
+            )
+            self._compiled_templates[key] = compiled
+        return compiled
+    
+    def get_multi_label_config(self, analysis_types: List[AnalysisType], output_format: OutputFormat = None) -> Dict:
+        """여러 분석 타입을 한 요청으로 분석할 때의 설정
+        
+        max_tokens는 가장 큰 타입 값 + 나머지 타입 값의 절반 (섹션마다 겹치는 내용은 한 번만 쓰므로),
+        timeout은 max_tokens에 비례해 늘리고 temperature는 가장 낮은 값을 사용한다.
+        """
+        configs = [self.get_analysis_config(analysis_type, output_format) for analysis_type in analysis_types]
+        if len(configs) == 1:
+            return configs[0]
+        largest = max(configs, key=lambda config: config["max_tokens"])
+        max_tokens = largest["max_tokens"] + sum(config["max_tokens"] for config in configs if config is not largest) // 2
+        return {
+            "temperature": min(config["temperature"] for config in configs),
+            "max_tokens": max_tokens,
+            "timeout": int(largest["timeout"] * max_tokens / largest["max_tokens"])
+        }
+    
+    def get_user_prompt(self, analysis_type: AnalysisType, layout: PromptLayout = None,
+                        output_format: OutputFormat = None, log_content: str = "", compact: bool = False,
+                        **kwargs) -> str:
         """분석 타입에 따른 사용자 프롬프트 반환"""
-        template = self.user_prompt_templates.get(analysis_type, self.user_prompt_templates[AnalysisType.GENERAL])
-        return template.format(**kwargs)
+        with get_pipeline_timer().stage("render"):
+            return self.get_compiled_template(analysis_type, layout, output_format, compact).render(log_content, **kwargs)
     
     def detect_analysis_type(self, log_content: str) -> AnalysisType:
         """로그 내용을 기반으로 분석 타입 자동 감지"""
-        log_lower = log_content.lower()
-        
-        # 키워드 기반 분석 타입 감지
-        if any(keyword in log_lower for keyword in ['database', 'db', 'mysql', 'postgresql', 'connection', 'query', 'sql']):
-            return AnalysisType.DATABASE
-        elif any(keyword in log_lower for keyword in ['memory', 'oom', 'outofmemory', 'gc', 'heap', 'ram']):
-            return AnalysisType.MEMORY
-        elif any(keyword in log_lower for keyword in ['network', 'timeout', 'connection refused', 'unreachable', 'latency']):
-            return AnalysisType.NETWORK
-        elif any(keyword in log_lower for keyword in ['security', 'attack', 'breach', 'unauthorized', 'injection', 'hack']):
-            return AnalysisType.SECURITY
-        elif any(keyword in log_lower for keyword in ['performance', 'slow', 'bottleneck', 'cpu', 'response time']):
-            return AnalysisType.PERFORMANCE
-        elif any(keyword in log_lower for keyword in ['critical', 'fatal', 'emergency', 'down', 'unavailable']):
-            return AnalysisType.CRITICAL
-        else:
-            return AnalysisType.GENERAL
-    
-    def get_analysis_config(self, analysis_type: AnalysisType) -> Dict:
-        """분석 타입에 따른 설정 반환"""
-        configs = {
-            AnalysisType.GENERAL: {
-                "temperature": 0.2,
-                "max_tokens": 1200,
-                "timeout": 60
-            },
-            AnalysisType.DATABASE: {
-                "temperature": 0.1,
-                "max_tokens": 1500,
-                "timeout": 90
-            },
-            AnalysisType.MEMORY: {
-                "temperature": 0.1,
-                "max_tokens": 1400,
-                "timeout": 90
-            },
-            AnalysisType.NETWORK: {
-                "temperature": 0.2,
-                "max_tokens": 1300,
-                "timeout": 75
-            },
-            AnalysisType.SECURITY: {
-                "temperature": 0.1,
-                "max_tokens": 1600,
-                "timeout": 120
-            },
-            AnalysisType.PERFORMANCE: {
-                "temperature": 0.2,
-                "max_tokens": 1400,
-                "timeout": 90
-            },
-            AnalysisType.CRITICAL: {
-                "temperature": 0.1,
-                "max_tokens": 1800,
-                "timeout": 150
+        with get_pipeline_timer().stage("detect"):
+            return self._detect_analysis_type(log_content)
+    
+    def _detect_analysis_type(self, log_content: str) -> AnalysisType:
+        """키워드 점수가 가장 높은 분석 타입 (키워드가 없으면 GENERAL)"""
+        ranked = self._rank_analysis_types(log_content)
+        return ranked[0][0] if ranked else AnalysisType.GENERAL
+    
+    def rank_analysis_types(self, log_content: str) -> List[Tuple[AnalysisType, float]]:
+        """키워드 점수 순으로 정렬한 (분석 타입, 점수) 목록 - 키워드가 하나도 없으면 빈 목록"""
+        with get_pipeline_timer().stage("detect"):
+            return self._rank_analysis_types(log_content)
+    
+    def _rank_analysis_types(self, log_content: str) -> List[Tuple[AnalysisType, float]]:
+        """정규식 한 번으로 윈도우를 훑어 타입별 키워드 수를 라인 레벨 가중치로 합산"""
+        scores = {}
+        for _, weight, hits in _iter_line_hits(log_content.lower()):
+            for analysis_type in hits:
+                scores[analysis_type] = scores.get(analysis_type, 0.0) + weight
+        return rank_scores(scores)
+    
+    def get_analysis_config(self, analysis_type: AnalysisType, output_format: OutputFormat = None) -> Dict:
+        """분석 타입과 출력 형식에 따른 설정 반환 (공용 테이블이므로 바꿀 때는 복사해서 사용)"""
+        configs = JSON_ANALYSIS_CONFIGS if (output_format or get_default_output_format()) == OutputFormat.JSON \
+            else ANALYSIS_CONFIGS
+        return configs.get(analysis_type, configs[AnalysisType.GENERAL])
+    
+    def get_prompt_version(self, layout: PromptLayout = None, output_format: OutputFormat = None,
+                           compact: bool = False, multi_label_top_k: int = 1,
+                           multi_label_min_score_ratio: float = 0.0) -> str:
+        """프롬프트 버전 반환 - 템플릿/설정/배치 방식/출력 형식/로그 압축/다중 분석 타입 설정이 바뀌면 값도 바뀜
+
+        다중 분석 타입 설정은 multi_label_top_k > 1일 때만 반영한다 (단일 타입 실행의 버전은 그대로).
+        """
+        payload = {
+            analysis_type.value: {
+                "system": self.get_system_prompt(analysis_type),
+                "user": self.get_user_template(analysis_type, layout, output_format, compact),
+                "config": self.get_analysis_config(analysis_type, output_format)
             }
+            for analysis_type in AnalysisType
         }
-        return configs.get(analysis_type, configs[AnalysisType.GENERAL])
+        if multi_label_top_k > 1:
+            payload["multi_label"] = {
+                "top_k": multi_label_top_k,
+                "min_score_ratio": multi_label_min_score_ratio,
+                "answer_section": MULTI_LABEL_ANSWER_SECTION
+            }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:16]
 
 # 전역 인스턴스
 prompt_templates = PromptTemplates()
@@ -311,3 +732,79 @@ prompt_templates = PromptTemplates()
 def get_prompt_templates() -> PromptTemplates:
     """프롬프트 템플릿 인스턴스 반환"""
     return prompt_templates
+
+class IncrementalTypeDetector:
+    """스트리밍용 분석 타입 감지기 - 라인 점수는 들어올 때 한 번만 계산하고 윈도우 점수는 누적합으로 유지
+
+    윈도우가 밀릴 때 빠지는 라인의 점수만 빼므로, 오버랩 라인을 다시 스캔하지 않고
+    윈도우 경계마다 타입 수에 비례하는 비용으로 감지한다.
+    라인 번호로 윈도우 범위를 관리하고 점수는 키워드가 있는 라인만 보관한다.
+    """
+
+    def __init__(self):
+        self._line_hits = deque()  # (라인 번호, 가중치, 키워드 타입 목록) - 키워드가 있는 라인만
+        self._totals = {}
+        self._start = 0            # 윈도우 첫 라인 번호
+        self._end = 0              # 다음에 추가될 라인 번호
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def add_line(self, line: str) -> Dict[AnalysisType, float]:
+        """라인을 윈도우 끝에 추가하고 그 라인의 점수 반환"""
+        scores = score_log_line(line)
+        self.add_scores(scores)
+        return scores
+
+    def add_scores(self, scores: Dict[AnalysisType, float]):
+        """미리 계산한 라인 점수를 윈도우 끝에 추가"""
+        for analysis_type, score in scores.items():
+            self._line_hits.append((self._end, score, (analysis_type,)))
+            self._totals[analysis_type] = self._totals.get(analysis_type, 0.0) + score
+        self._end += 1
+
+    def add_text(self, text: str) -> int:
+        """줄바꿈으로 이은 여러 라인을 윈도우 끝에 추가하고 추가한 라인 수 반환
+
+        라인마다 따로 스캔하지 않고 정규식 한 번으로 훑는다 (윈도우 분할처럼 라인이 묶음으로 들어올 때).
+        """
+        totals = self._totals
+        append = self._line_hits.append
+        for line_offset, weight, hits in _iter_line_hits(text.lower()):
+            append((self._end + line_offset, weight, hits))
+            for analysis_type in hits:
+                totals[analysis_type] = totals.get(analysis_type, 0.0) + weight
+        added = text.count("\n") + 1
+        self._end += added
+        return added
+
+    def remove_oldest(self, count: int = 1):
+        """윈도우 앞쪽 라인 count개 제거"""
+        self._start = min(self._start + max(count, 0), self._end)
+        while self._line_hits and self._line_hits[0][0] < self._start:
+            _, weight, hits = self._line_hits.popleft()
+            for analysis_type in hits:
+                self._totals[analysis_type] -= weight
+
+    def keep_last(self, count: int):
+        """최근 라인 count개만 남김 (스트리밍 호출자가 다음 분석 대상 라인만 유지)"""
+        if len(self) > count:
+            self.remove_oldest(len(self) - count)
+
+    def reset(self):
+        """윈도우 비우기"""
+        self._line_hits.clear()
+        self._totals = {}
+        self._start = self._end
+
+    def get_scores(self) -> Dict[AnalysisType, float]:
+        """현재 윈도우의 타입별 점수 (점수가 0인 타입 제외)"""
+        return {analysis_type: score for analysis_type, score in self._totals.items() if score > 0}
+
+    def rank(self) -> List[Tuple[AnalysisType, float]]:
+        """현재 윈도우의 (분석 타입, 점수) 순위"""
+        return rank_scores(self._totals)
+
+    def detect(self) -> AnalysisType:
+        """현재 윈도우에서 점수가 가장 높은 분석 타입"""
+        return top_analysis_type(self._totals)
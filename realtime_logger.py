@@ -13,6 +13,8 @@ from typing import List, Dict
 import json
 import os
 
+from metrics_exporter import ComponentMetrics, start_metrics_exporter, stop_metrics_exporter
+
 class RealTimeLogger:
     def __init__(self, log_file: str = "realtime.log"):
         self.log_file = log_file
@@ -24,6 +26,7 @@ class RealTimeLogger:
         ]
         self.hosts = ["node-01", "node-02", "node-03", "web-01", "web-02", "db-01", "cache-01"]
         self.levels = ["DEBUG", "INFO", "WARN", "ERROR", "CRITICAL"]
+        self.metrics = ComponentMetrics("realtime_logger", llm=False)
         self.users = ["user123", "admin", "guest", "service_account", "api_user", "bot"]
         
         # 로그 패턴 정의
@@ -187,6 +190,7 @@ class RealTimeLogger:
         self.stats["total_logs"] += 1
         self.stats["by_level"][level] += 1
         self.stats["by_service"][service] += 1
+        self.metrics.record_lines(1, levels={level: 1})
         
         return log_entry
     
@@ -196,6 +200,7 @@ class RealTimeLogger:
             with open(self.log_file, "a", encoding="utf-8") as f:
                 f.write(log_entry + "\n")
         except Exception as e:
+            self.metrics.write_failures.inc(component="realtime_logger")
             print(f"❌ 로그 쓰기 오류: {e}")
     
     def print_stats(self):
@@ -243,6 +248,7 @@ class RealTimeLogger:
         
         self.running = True
         log_count = 0
+        metrics_exporter = start_metrics_exporter()
         
         try:
             while self.running:
@@ -267,6 +273,8 @@ class RealTimeLogger:
             print(f"\n🛑 사용자에 의해 중단되었습니다.")
         finally:
             self.running = False
+            if metrics_exporter:
+                stop_metrics_exporter()
             self.print_final_stats()
 
 class LogRotator:
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+결과 저장 모듈 - 윈도우 분석 결과를 JSONL로 증분 저장하고 체크포인트로 재개 지원
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Set
+
+def compute_file_fingerprint(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """파일 내용 기반 지문 계산 (sha256 + 크기)"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return f"sha256:{digest.hexdigest()}:{size}"
+
+def make_checkpoint_key(file_fingerprint: str, window_config: Dict, prompt_version: str, **extra) -> str:
+    """(파일 지문, 윈도우 설정, 프롬프트 버전)으로 체크포인트 키 생성 - extra는 분석 타입/모델 등 추가 구분값"""
+    payload = json.dumps(
+        {
+            "file": file_fingerprint,
+            "window": window_config,
+            "prompt": prompt_version,
+            **extra
+        },
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get_jsonl_path(out_path: str) -> str:
+    """출력 경로에 대응하는 JSONL 경로 반환"""
+    if out_path.endswith(".jsonl"):
+        return out_path
+    return os.path.splitext(out_path)[0] + ".jsonl"
+
+def iter_jsonl_records(jsonl_path: str) -> Iterator[Dict]:
+    """JSONL 파일의 레코드를 하나씩 읽기 (손상된 라인은 건너뜀)"""
+    if not os.path.exists(jsonl_path):
+        return
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+class JsonlResultWriter:
+    """윈도우 결과를 한 줄씩 추가하고 즉시 디스크에 반영하는 JSONL 작성기"""
+
+    def __init__(self, jsonl_path: str, fsync: bool = True):
+        self.jsonl_path = jsonl_path
+        self.fsync = fsync
+        self._file = None
+
+    def open(self, truncate: bool = False):
+        """파일 열기 (truncate=True면 기존 내용 삭제)"""
+        self._file = open(self.jsonl_path, 'w' if truncate else 'a', encoding='utf-8')
+        return self
+
+    def write(self, record: Dict):
+        """레코드 한 개 추가 후 flush"""
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """파일 닫기"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class AnalysisCheckpoint:
+    """분석 작업 체크포인트 - 같은 작업 재실행 시 완료된 윈도우를 건너뜀"""
+
+    def __init__(self, jsonl_path: str, key: str, key_info: Dict = None):
+        self.jsonl_path = jsonl_path
+        self.checkpoint_path = jsonl_path + ".ckpt"
+        self.key = key
+        self.key_info = key_info or {}
+
+    def _load(self) -> Optional[Dict]:
+        """체크포인트 파일 읽기"""
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _save(self, completed: bool = False):
+        """체크포인트 파일을 원자적으로 저장"""
+        data = {
+            "key": self.key,
+            **self.key_info,
+            "completed": completed,
+            "updated_at": datetime.now().isoformat()
+        }
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _truncate_partial_tail(self):
+        """비정상 종료로 잘린 마지막 라인 제거"""
+        with open(self.jsonl_path, 'rb+') as f:
+            valid_end = 0
+            offset = 0
+            for raw_line in f:
+                offset += len(raw_line)
+                if not raw_line.endswith(b"\n"):
+                    break
+                try:
+                    json.loads(raw_line)
+                except ValueError:
+                    break
+                valid_end = offset
+            f.truncate(valid_end)
+
+    def begin(self, resume: bool = True) -> Set[int]:
+        """작업 시작 - 재개 가능하면 완료된 윈도우 인덱스 집합 반환"""
+        saved = self._load()
+        if resume and saved and saved.get("key") == self.key and os.path.exists(self.jsonl_path):
+            self._truncate_partial_tail()
+            done = set()
+            for record in iter_jsonl_records(self.jsonl_path):
+                window_index = record.get("meta", {}).get("window_index")
+                if window_index is not None:
+                    done.add(window_index)
+            self._save()
+            return done
+
+        # 새 작업 (키 불일치 또는 재개 비활성화)
+        open(self.jsonl_path, 'w').close()
+        self._save()
+        return set()
+
+    def finish(self):
+        """작업 완료 표시"""
+        self._save(completed=True)
+
+def export_json_array(jsonl_path: str, out_path: str):
+    """JSONL 결과를 기존 JSON 배열 형식으로 스트리밍 변환 (윈도우 순서로 정렬)"""
+    # 레코드 본문은 메모리에 올리지 않고 (윈도우 인덱스, 파일 오프셋)만 모아 정렬
+    positions = []
+    with open(jsonl_path, 'rb') as f:
+        offset = 0
+        for raw_line in f:
+            if raw_line.strip():
+                try:
+                    record = json.loads(raw_line)
+                    window_index = record.get("meta", {}).get("window_index", len(positions))
+                    positions.append((window_index, offset))
+                except ValueError:
+                    pass
+            offset += len(raw_line)
+    positions.sort(key=lambda position: position[0])
+
+    temp_path = out_path + ".tmp"
+    with open(jsonl_path, 'rb') as src, open(temp_path, 'w', encoding='utf-8') as out:
+        out.write("[")
+        for i, (_, offset) in enumerate(positions):
+            src.seek(offset)
+            out.write("\n  " if i == 0 else ",\n  ")
+            out.write(src.readline().decode('utf-8').rstrip("\n"))
+        out.write("\n]\n" if positions else "]\n")
+    os.replace(temp_path, out_path)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+결과 저장 테스트 스크립트 - JSONL 증분 저장, 체크포인트 재개(잘린 라인 제거), JSON 배열 변환 확인
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+from result_store import AnalysisCheckpoint, JsonlResultWriter, export_json_array, iter_jsonl_records
+
+def make_record(window_index: int) -> dict:
+    """윈도우 결과 레코드 (한글/줄바꿈 포함)"""
+    return {
+        "meta": {"window_index": window_index},
+        "analysis": f"윈도우 {window_index} 분석\n원인: DB",
+        "analysis_type": "database"
+    }
+
+def write_records(jsonl_path: str, indexes, truncate: bool = False):
+    """레코드를 JSONL에 추가"""
+    with JsonlResultWriter(jsonl_path, fsync=False).open(truncate=truncate) as writer:
+        for window_index in indexes:
+            writer.write(make_record(window_index))
+
+def check_resume_after_partial_write(directory: str) -> bool:
+    """마지막 라인이 쓰다 만 상태(줄바꿈 없음)면 잘라내고 완료된 윈도우만 재개 대상에서 제외"""
+    jsonl_path = os.path.join(directory, "partial.jsonl")
+    checkpoint = AnalysisCheckpoint(jsonl_path, "key-a")
+    checkpoint.begin()
+    write_records(jsonl_path, [2, 0, 1])
+    with open(jsonl_path, 'a', encoding='utf-8') as f:
+        f.write('{"meta": {"window_index": 3}, "analysis": "잘린')
+
+    done = AnalysisCheckpoint(jsonl_path, "key-a").begin(resume=True)
+    with open(jsonl_path, 'rb') as f:
+        ends_with_newline = f.read().endswith(b"\n")
+    # 재개 후 이어 쓴 레코드도 정상적으로 읽혀야 함
+    write_records(jsonl_path, [3])
+    indexes = [record["meta"]["window_index"] for record in iter_jsonl_records(jsonl_path)]
+    print(f"   재개 대상 제외: {sorted(done)}, 잘라낸 뒤 줄바꿈으로 끝남: {ends_with_newline}, 이어 쓴 뒤 레코드: {indexes}")
+    return done == {0, 1, 2} and ends_with_newline and indexes == [2, 0, 1, 3]
+
+def check_resume_after_corrupt_line(directory: str) -> bool:
+    """줄바꿈까지 쓰였지만 JSON이 깨진 마지막 라인도 잘라냄"""
+    jsonl_path = os.path.join(directory, "corrupt.jsonl")
+    AnalysisCheckpoint(jsonl_path, "key-b").begin()
+    write_records(jsonl_path, [0, 1])
+    with open(jsonl_path, 'a', encoding='utf-8') as f:
+        f.write('{"meta": {"window_index": 2}, "analysis": \n')
+
+    done = AnalysisCheckpoint(jsonl_path, "key-b").begin(resume=True)
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    print(f"   재개 대상 제외: {sorted(done)}, 남은 라인 {len(lines)}개")
+    return done == {0, 1} and len(lines) == 2
+
+def check_new_run_on_key_change(directory: str) -> bool:
+    """키가 바뀌거나(프롬프트/설정 변경) resume=False면 기존 결과를 비우고 처음부터"""
+    jsonl_path = os.path.join(directory, "key.jsonl")
+    AnalysisCheckpoint(jsonl_path, "key-c").begin()
+    write_records(jsonl_path, [0, 1])
+    changed = AnalysisCheckpoint(jsonl_path, "key-d").begin(resume=True)
+    changed_size = os.path.getsize(jsonl_path)
+
+    write_records(jsonl_path, [0])
+    disabled = AnalysisCheckpoint(jsonl_path, "key-d").begin(resume=False)
+    disabled_size = os.path.getsize(jsonl_path)
+    print(f"   키 변경: 재개 {sorted(changed)}, 크기 {changed_size}B / 재개 끔: 재개 {sorted(disabled)}, 크기 {disabled_size}B")
+    return changed == set() and changed_size == 0 and disabled == set() and disabled_size == 0
+
+def check_finish_marks_completed(directory: str) -> bool:
+    """finish 후 체크포인트 파일에 키/추가 정보와 completed=True 기록"""
+    jsonl_path = os.path.join(directory, "finish.jsonl")
+    checkpoint = AnalysisCheckpoint(jsonl_path, "key-e", {"model": "test-model"})
+    checkpoint.begin()
+    checkpoint.finish()
+    with open(checkpoint.checkpoint_path, 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    print(f"   체크포인트: key={saved['key']}, model={saved.get('model')}, completed={saved['completed']}")
+    return saved["key"] == "key-e" and saved.get("model") == "test-model" and saved["completed"] is True
+
+def check_export_json_array(directory: str) -> bool:
+    """완료 순서로 쌓인 JSONL을 윈도우 순서 JSON 배열로 변환 (빈 결과는 빈 배열)"""
+    jsonl_path = os.path.join(directory, "export.jsonl")
+    out_path = os.path.join(directory, "export.json")
+    write_records(jsonl_path, [3, 1, 0, 2], truncate=True)
+    export_json_array(jsonl_path, out_path)
+    with open(out_path, 'r', encoding='utf-8') as f:
+        exported = json.load(f)
+
+    empty_path = os.path.join(directory, "empty.jsonl")
+    open(empty_path, 'w').close()
+    export_json_array(empty_path, out_path)
+    with open(out_path, 'r', encoding='utf-8') as f:
+        empty = json.load(f)
+    print(f"   변환 순서: {[record['meta']['window_index'] for record in exported]}, 빈 결과: {empty}")
+    return exported == [make_record(i) for i in range(4)] and empty == []
+
+def main():
+    print("=== 결과 저장 테스트 시작 ===\n")
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        print("🧪 1. 쓰다 만 마지막 라인 제거 후 재개")
+        results["잘린 라인 재개"] = check_resume_after_partial_write(directory)
+
+        print("\n🧪 2. 깨진 마지막 라인 제거 후 재개")
+        results["깨진 라인 재개"] = check_resume_after_corrupt_line(directory)
+
+        print("\n🧪 3. 키 변경 / 재개 끔")
+        results["새 작업"] = check_new_run_on_key_change(directory)
+
+        print("\n🧪 4. 완료 표시")
+        results["완료 표시"] = check_finish_marks_completed(directory)
+
+        print("\n🧪 5. JSON 배열 변환")
+        results["JSON 변환"] = check_export_json_array(directory)
+
+    print("\n=== 테스트 결과 요약 ===")
+    for name, passed in results.items():
+        print(f"{name}: {'✅ 성공' if passed else '❌ 실패'}")
+    return all(results.values())
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+단일 실행(single-flight) 모듈 - 같은 키로 동시에 들어온 요청을 하나로 합쳐 결과 공유
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import concurrent.futures
+from typing import Any, Callable, Dict, Tuple
+
+def make_request_key(*parts: Any) -> str:
+    """요청 내용으로 키 생성 (JSON 직렬화 후 sha256)"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class SingleFlight:
+    """같은 키의 요청이 실행 중이면 새로 실행하지 않고 그 결과를 기다림
+
+    스레드에서는 do(), asyncio 코루틴에서는 do_async()를 사용하며 둘은 같은 실행을 공유한다.
+    결과 객체는 모든 호출자가 공유하므로 수정하지 않아야 한다.
+    완료된 결과는 보관하지 않는다 (캐시가 아니라 동시 실행 중복 제거).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, concurrent.futures.Future] = {}
+        self.stats = {
+            "executed": 0,
+            "coalesced": 0
+        }
+
+    def _join_or_lead(self, key: str) -> Tuple[concurrent.futures.Future, bool]:
+        """실행 중인 요청에 합류하거나, 없으면 새 실행의 주체가 됨"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = concurrent.futures.Future()
+            self._calls[key] = future
+            self.stats["executed"] += 1
+            return future, True
+
+    def _run(self, key: str, future: concurrent.futures.Future, fn: Callable):
+        """실행 후 결과 전달 - 결과를 알리기 전에 키를 제거해 완료된 결과가 재사용되지 않게 함
+
+        공유 future가 이미 완료/취소됐으면 결과를 버린다 (InvalidStateError 방지).
+        """
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            if not future.done():
+                future.set_exception(e)
+        else:
+            with self._lock:
+                self._calls.pop(key, None)
+            if not future.done():
+                future.set_result(result)
+
+    def do(self, key: str, fn: Callable) -> Any:
+        """동기 실행 - 같은 키가 실행 중이면 그 결과를 기다림"""
+        future, leader = self._join_or_lead(key)
+        if leader:
+            self._run(key, future, fn)
+        return future.result()
+
+    async def do_async(self, key: str, fn: Callable, executor: concurrent.futures.Executor = None) -> Any:
+        """비동기 실행 - fn은 executor 스레드에서 실행하고 이벤트 루프는 막지 않음
+
+        호출자마다 별도의 asyncio future로 결과를 받으므로, 한 호출자가 취소돼도
+        공유 실행과 다른 호출자(스레드/코루틴)는 영향을 받지 않는다.
+        """
+        loop = asyncio.get_running_loop()
+        future, leader = self._join_or_lead(key)
+        if leader:
+            loop.run_in_executor(executor, self._run, key, future, fn)
+        waiter = loop.create_future()
+
+        def deliver(shared: concurrent.futures.Future):
+            if waiter.done():
+                return
+            if shared.cancelled():
+                waiter.cancel()
+            elif shared.exception() is not None:
+                waiter.set_exception(shared.exception())
+            else:
+                waiter.set_result(shared.result())
+
+        def on_done(shared: concurrent.futures.Future):
+            try:
+                loop.call_soon_threadsafe(deliver, shared)
+            except RuntimeError:
+                # 기다리던 이벤트 루프가 이미 닫힘
+                pass
+
+        future.add_done_callback(on_done)
+        return await waiter
+
+    def get_metrics(self) -> Dict:
+        """실행/합류 통계"""
+        with self._lock:
+            return {
+                **self.stats,
+                "in_flight": len(self._calls)
+            }
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+single-flight 테스트 스크립트 - 모의 vLLM 서버로 같은 요청의 동시 호출이 한 번만 전송되는지 확인
+"""
+
+import sys
+import asyncio
+import threading
+
+import llm_client
+from llm_client import LLMClient
+from concurrency_limiter import AdaptiveConcurrencyLimiter
+from log_llm_pipeline import analyze_lines
+from mock_vllm_server import MockVLLMServer, MockServerConfig
+
+CONFIG = {"temperature": 0.0, "max_tokens": 16, "timeout": 10}
+INCIDENT_LINES = [
+    "2025-09-12 13:35:26 ERROR [ordersvc] Database connection timeout after 30s",
+    "2025-09-12 13:35:27 ERROR [ordersvc] Connection pool exhausted (50/50)",
+    "2025-09-12 13:35:29 WARN [gateway] Upstream ordersvc latency 4500ms"
+]
+
+def run_threads_and_tasks(count: int, thread_call, async_call) -> list:
+    """스레드 count개와 asyncio 태스크 count개를 동시에 실행해 결과 목록 반환"""
+    start = threading.Barrier(count + 1)
+    results = []
+    results_lock = threading.Lock()
+
+    def worker():
+        start.wait()
+        result = thread_call()
+        with results_lock:
+            results.append(result)
+
+    async def run_tasks():
+        # 이벤트 루프 스레드도 배리어에 합류해 스레드와 태스크가 같은 시점에 요청
+        await asyncio.get_running_loop().run_in_executor(None, start.wait)
+        return await asyncio.gather(*(async_call() for _ in range(count)))
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    task_results = asyncio.run(run_tasks())
+    for thread in threads:
+        thread.join()
+    return results + list(task_results)
+
+def check_client_coalescing(server: MockVLLMServer, count: int) -> bool:
+    """같은 프롬프트로 스레드 count개 + 태스크 count개 → 업스트림 요청 1개, 합류 2*count-1개"""
+    client = LLMClient(base_url=server.base_url, limiter=AdaptiveConcurrencyLimiter(initial_limit=4, adaptive=False))
+    before = server.request_count
+    results = run_threads_and_tasks(
+        count,
+        lambda: client.chat("system", "same incident", CONFIG),
+        lambda: client.chat_async("system", "same incident", CONFIG)
+    )
+    sent = server.request_count - before
+    coalesced = client.get_metrics()["coalesced_requests"]
+    print(f"   호출 {len(results)}개, 업스트림 요청 {sent}개, 합류 {coalesced}개, 응답 종류 {len(set(results))}개")
+    return len(results) == 2 * count and sent == 1 and coalesced == 2 * count - 1 and len(set(results)) == 1
+
+def check_pipeline_coalescing(server: MockVLLMServer, count: int) -> bool:
+    """같은 로그 묶음으로 analyze_lines를 동시에 호출 (모니터/자동 분석 트리거) → 윈도우당 요청 1개"""
+    client = LLMClient(base_url=server.base_url, limiter=AdaptiveConcurrencyLimiter(initial_limit=4, adaptive=False))
+    original, llm_client.llm_client = llm_client.llm_client, client
+    meta = {"service": "gateway,ordersvc", "severity": "error>warning>info"}
+    records = []
+    records_lock = threading.Lock()
+
+    def trigger():
+        result = analyze_lines(INCIDENT_LINES, meta, triage=False)
+        with records_lock:
+            records.append(result)
+
+    before = server.request_count
+    try:
+        threads = [threading.Thread(target=trigger) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        llm_client.llm_client = original
+    sent = server.request_count - before
+    windows = len(records[0]) if records else 0
+    coalesced = client.get_metrics()["coalesced_requests"]
+    print(f"   트리거 {len(records)}개, 윈도우 {windows}개, 업스트림 요청 {sent}개, 합류 {coalesced}개")
+    return len(records) == count and windows > 0 and sent == windows and coalesced == (count - 1) * windows
+
+def main():
+    print("=== single-flight 테스트 시작 ===\n")
+    # 첫 요청이 끝나기 전에 나머지 호출이 모두 합류하도록 응답을 늦춤
+    server = MockVLLMServer(0, MockServerConfig(ttft=1.0, ttft_jitter=0.0, output_tokens=8)).start()
+    results = {}
+
+    try:
+        print("🧪 1. 스레드 8개 + asyncio 태스크 8개, 같은 요청")
+        results["클라이언트 합치기"] = check_client_coalescing(server, 8)
+
+        print("\n🧪 2. 같은 인시던트로 analyze_lines 4번 동시 트리거")
+        results["파이프라인 합치기"] = check_pipeline_coalescing(server, 4)
+    finally:
+        server.stop()
+
+    print("\n=== 테스트 결과 요약 ===")
+    for name, passed in results.items():
+        print(f"{name}: {'✅ 성공' if passed else '❌ 실패'}")
+    return all(results.values())
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
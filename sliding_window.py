@@ -3,11 +3,16 @@
 슬라이딩 윈도우 모듈 - 로그 파일을 토큰 기반으로 슬라이딩 윈도우로 분할
 """
 
+import os
+import time
 import tiktoken
 from typing import List, Dict, Optional, Generator, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from pipeline_timing import get_pipeline_timer
+from prompt_templates import IncrementalTypeDetector, score_log_line
+
 class TokenizerType(Enum):
     """토크나이저 타입"""
     TIKTOKEN = "tiktoken"
@@ -21,6 +26,7 @@ class WindowConfig:
     min_tokens: int = 100
     tokenizer_type: TokenizerType = TokenizerType.TIKTOKEN
     encoding_name: str = "cl100k_base"
+    track_analysis_types: bool = False  # 분할하면서 윈도우별 분석 타입 점수 누적
 
 @dataclass
 class WindowResult:
@@ -31,6 +37,7 @@ class WindowResult:
     token_count: int
     window_index: int
     total_windows: int
+    analysis_scores: Optional[Dict] = None  # 분석 타입별 키워드 점수 (track_analysis_types일 때만)
 
 class TokenCounter:
     """토큰 카운터 클래스"""
@@ -48,6 +55,16 @@ class TokenCounter:
                 self.tokenizer_type = TokenizerType.SIMPLE
     
     def count_tokens(self, text: str) -> int:
+        """텍스트의 토큰 수 계산 (단계별 시간 측정 시 tokenize 단계로 기록)"""
+        timer = get_pipeline_timer()
+        if not timer.enabled:
+            return self._count_tokens(text)
+        started = time.perf_counter()
+        count = self._count_tokens(text)
+        timer.add("tokenize", time.perf_counter() - started)
+        return count
+
+    def _count_tokens(self, text: str) -> int:
         """텍스트의 토큰 수 계산"""
         if self.tokenizer_type == TokenizerType.TIKTOKEN and self._encoder:
             try:
@@ -68,11 +85,37 @@ class SlidingWindow:
             self.config.encoding_name
         )
     
-    def create_windows(self, lines: List[str]) -> List[WindowResult]:
-        """라인 리스트를 슬라이딩 윈도우로 분할"""
+    def create_windows(self, lines: List[str], track_analysis_types: Optional[bool] = None) -> List[WindowResult]:
+        """라인 리스트를 슬라이딩 윈도우로 분할 (track_analysis_types가 None이면 설정값 사용)"""
         if not lines:
             return []
         
+        if track_analysis_types is None:
+            track_analysis_types = self.config.track_analysis_types
+        with get_pipeline_timer().stage("window"):
+            windows = self._create_windows(lines, track_analysis_types)
+        get_pipeline_timer().count("windows", len(windows))
+        return windows
+    
+    def _track_new_lines(self, detector: IncrementalTypeDetector, window: List[str], content: str) -> Dict:
+        """윈도우에서 아직 점수를 매기지 않은 (오버랩이 아닌) 라인을 한 번에 감지기에 추가하고 윈도우 점수 반환
+        
+        새 라인은 윈도우 본문에서 잘라 정규식 한 번으로 훑으며, detect 단계는 윈도우마다 한 번 기록한다.
+        """
+        with get_pipeline_timer().stage("detect"):
+            scored = len(detector)
+            if scored < len(window):
+                # 오버랩 라인 + 줄바꿈 길이만큼 건너뛴 나머지가 새 라인
+                detector.add_text(content[sum(map(len, window[:scored])) + scored:])
+            return detector.get_scores()
+
+    def _create_windows(self, lines: List[str], track_analysis_types: bool) -> List[WindowResult]:
+        """토큰 수 기준으로 라인을 채워 윈도우 생성 (오버랩 포함)
+        
+        track_analysis_types면 윈도우를 만들 때 새로 들어온 라인만 스캔해 윈도우 점수를 누적합으로 유지한다
+        (오버랩으로 남는 라인은 다시 스캔하지 않음).
+        """
+        detector = IncrementalTypeDetector() if track_analysis_types else None
         windows = []
         current_window = []
         current_tokens = 0
@@ -92,21 +135,27 @@ class SlidingWindow:
                 # 윈도우가 가득 찬 경우
                 if current_window:
                     # 현재 윈도우 저장
+                    content = "\n".join(current_window)
                     window_result = WindowResult(
-                        content="\n".join(current_window),
+                        content=content,
                         start_line=line_index - len(current_window),
                         end_line=line_index - 1,
                         token_count=current_tokens,
                         window_index=window_index,
-                        total_windows=0  # 나중에 업데이트
+                        total_windows=0,  # 나중에 업데이트
+                        analysis_scores=self._track_new_lines(detector, current_window, content)
+                        if detector is not None else None
                     )
                     windows.append(window_result)
                     window_index += 1
                     
                     # 오버랩을 위한 윈도우 조정
+                    window_size = len(current_window)
                     current_window, current_tokens = self._adjust_window_for_overlap(
                         current_window, current_tokens
                     )
+                    if detector is not None:
+                        detector.remove_oldest(window_size - len(current_window))
                 else:
                     # 단일 라인이 윈도우 크기를 초과하는 경우
                     # 라인을 그대로 윈도우로 만듦
@@ -116,7 +165,8 @@ class SlidingWindow:
                         end_line=line_index,
                         token_count=line_tokens,
                         window_index=window_index,
-                        total_windows=0
+                        total_windows=0,
+                        analysis_scores=score_log_line(line) if detector is not None else None
                     )
                     windows.append(window_result)
                     window_index += 1
@@ -124,13 +174,16 @@ class SlidingWindow:
         
         # 마지막 윈도우 처리
         if current_window:
+            content = "\n".join(current_window)
             window_result = WindowResult(
-                content="\n".join(current_window),
+                content=content,
                 start_line=line_index - len(current_window),
                 end_line=line_index - 1,
                 token_count=current_tokens,
                 window_index=window_index,
-                total_windows=0
+                total_windows=0,
+                analysis_scores=self._track_new_lines(detector, current_window, content)
+                if detector is not None else None
             )
             windows.append(window_result)
         
@@ -169,11 +222,15 @@ class SlidingWindow:
     def create_windows_from_file(self, file_path: str) -> List[WindowResult]:
         """파일에서 직접 윈도우 생성"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-            
-            # 줄바꿈 문자 제거
-            lines = [line.rstrip('\n\r') for line in lines]
+            timer = get_pipeline_timer()
+            with timer.stage("read"):
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    lines = f.readlines()
+                
+                # 줄바꿈 문자 제거
+                lines = [line.rstrip('\n\r') for line in lines]
+            timer.count("lines", len(lines))
+            timer.count("bytes_read", os.path.getsize(file_path))
             
             return self.create_windows(lines)
         except Exception as e:
@@ -12,6 +12,7 @@ python3 -m vllm.entrypoints.openai.api_server \
   --tensor-parallel-size 1 \
   --host 0.0.0.0 \
   --port 8000 \
+  --enable-prefix-caching \
   --trust-remote-code
 
 echo "Qwen 7B server started on http://0.0.0.0:8000"
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+구조화 출력 모듈 - 분석 결과를 압축 JSON 스키마로 받아 타입이 있는 레코드로 변환
+"""
+
+import re
+import json
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+from config import STRUCTURED_OUTPUT_BACKEND
+
+CONFIDENCE_LEVELS = ["low", "medium", "high"]
+
+# 분석 결과 JSON 스키마 - 항목 수/길이를 제한해 생성 토큰을 줄임
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "symptoms": {
+            "type": "array",
+            "items": {"type": "string", "maxLength": 160},
+            "maxItems": 5
+        },
+        "hypotheses": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "cause": {"type": "string", "maxLength": 200},
+                    "priority": {"type": "integer", "minimum": 1, "maximum": 5}
+                },
+                "required": ["cause", "priority"]
+            },
+            "maxItems": 3
+        },
+        "commands": {
+            "type": "array",
+            "items": {"type": "string", "maxLength": 160},
+            "maxItems": 5
+        },
+        "mitigations": {
+            "type": "array",
+            "items": {"type": "string", "maxLength": 160},
+            "maxItems": 3
+        },
+        "confidence": {"type": "string", "enum": CONFIDENCE_LEVELS}
+    },
+    "required": ["symptoms", "hypotheses", "commands", "confidence"]
+}
+
+@dataclass
+class Hypothesis:
+    """원인 가설 (priority 1이 가장 유력)"""
+    cause: str
+    priority: int = 1
+
+@dataclass
+class StructuredAnalysis:
+    """구조화된 분석 결과"""
+    symptoms: List[str] = field(default_factory=list)
+    hypotheses: List[Hypothesis] = field(default_factory=list)
+    commands: List[str] = field(default_factory=list)
+    mitigations: List[str] = field(default_factory=list)
+    confidence: str = "low"
+
+    def to_dict(self) -> Dict:
+        """JSON 저장용 dict"""
+        return asdict(self)
+
+    def to_json(self) -> str:
+        """압축 JSON 문자열"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+def _string_list(value) -> List[str]:
+    """문자열 목록으로 정규화"""
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """응답에서 JSON 객체 부분만 추출 (코드 블록/앞뒤 설명 제거)"""
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    start = text.find("{")
+    end = text.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    return text[start:end + 1]
+
+def parse_structured_analysis(text: str) -> Optional[StructuredAnalysis]:
+    """모델 응답을 StructuredAnalysis로 변환 (JSON이 아니면 None)"""
+    raw = _extract_json_object(text or "")
+    if raw is None:
+        return None
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    hypotheses = []
+    for i, item in enumerate(data.get("hypotheses") or [], 1):
+        if isinstance(item, dict) and item.get("cause"):
+            try:
+                priority = int(item.get("priority", i))
+            except (TypeError, ValueError):
+                priority = i
+            hypotheses.append(Hypothesis(cause=str(item["cause"]).strip(), priority=priority))
+        elif isinstance(item, str) and item.strip():
+            hypotheses.append(Hypothesis(cause=item.strip(), priority=i))
+    hypotheses.sort(key=lambda hypothesis: hypothesis.priority)
+
+    confidence = str(data.get("confidence", "low")).strip().lower()
+    return StructuredAnalysis(
+        symptoms=_string_list(data.get("symptoms")),
+        hypotheses=hypotheses,
+        commands=_string_list(data.get("commands")),
+        mitigations=_string_list(data.get("mitigations")),
+        confidence=confidence if confidence in CONFIDENCE_LEVELS else "low"
+    )
+
+def merge_structured_analyses(analyses: List[StructuredAnalysis]) -> StructuredAnalysis:
+    """분할 분석 결과 병합 - 중복 제거, 확신도는 가장 낮은 값"""
+    def unique(items):
+        return list(dict.fromkeys(items))
+
+    hypotheses = {}
+    for analysis in analyses:
+        for hypothesis in analysis.hypotheses:
+            known = hypotheses.get(hypothesis.cause)
+            if known is None or hypothesis.priority < known.priority:
+                hypotheses[hypothesis.cause] = hypothesis
+
+    return StructuredAnalysis(
+        symptoms=unique(symptom for analysis in analyses for symptom in analysis.symptoms),
+        hypotheses=sorted(hypotheses.values(), key=lambda hypothesis: hypothesis.priority),
+        commands=unique(command for analysis in analyses for command in analysis.commands),
+        mitigations=unique(mitigation for analysis in analyses for mitigation in analysis.mitigations),
+        confidence=min((analysis.confidence for analysis in analyses), key=CONFIDENCE_LEVELS.index, default="low")
+    )
+
+def get_structured_output_params(schema: Dict = None, backend: str = STRUCTURED_OUTPUT_BACKEND) -> Dict:
+    """서버 측 스키마 강제용 요청 파라미터
+
+    - guided_json: vLLM guided decoding (extra 파라미터)
+    - response_format: OpenAI 호환 json_schema 응답 형식
+    - none: 프롬프트 지시만 사용
+    """
+    schema = schema or ANALYSIS_SCHEMA
+    if backend == "guided_json":
+        return {"guided_json": schema}
+    if backend == "response_format":
+        return {"response_format": {"type": "json_schema", "json_schema": {"name": "log_analysis", "schema": schema}}}
+    return {}
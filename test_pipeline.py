@@ -128,15 +128,15 @@ journalctl -u ordersvc -f --since "10 minutes ago"
         "analysis_type": analysis_type.value
     }
 
-def main(log_path: str, out_path: str, meta: Dict, analysis_type: AnalysisType = None):
-    """메인 파이프라인 함수 - 새로운 모듈 사용"""
+def analyze_file(log_path: str, meta: Dict, analysis_type: AnalysisType = None) -> List[Dict]:
+    """로그 파일을 모의 분석해 윈도우별 결과 레코드 반환 (log_llm_pipeline.analyze_file의 모의 버전)"""
     # 슬라이딩 윈도우 생성
     sliding_window = create_sliding_window(WINDOW_CONFIG)
     windows = sliding_window.create_windows_from_file(log_path)
     
     if not windows:
         print("❌ 윈도우 생성 실패")
-        return
+        return []
     
     # 윈도우 통계 출력
     stats = sliding_window.get_window_stats(windows)
@@ -162,10 +162,17 @@ def main(log_path: str, out_path: str, meta: Dict, analysis_type: AnalysisType =
         
         # 백프레셔 방지
         time.sleep(0.1)
+    return results
+
+def main(log_path: str, out_path: str, meta: Dict, analysis_type: AnalysisType = None):
+    """메인 파이프라인 함수 - 새로운 모듈 사용"""
+    results = analyze_file(log_path, meta, analysis_type)
+    if not results:
+        return
 
     with open(out_path, "w") as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
-    print(f"✅ 저장 완료: {out_path} (윈도우={len(windows)})")
+    print(f"✅ 저장 완료: {out_path} (윈도우={len(results)})")
 
 if __name__ == "__main__":
     # 사용 예
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+토큰 예산 모듈 - 요청 전 프롬프트 토큰을 계산해 max_tokens를 컨텍스트 안으로 조정
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sliding_window import TokenCounter
+from pipeline_timing import get_pipeline_timer
+from llm_client import get_llm_client, LLMClient
+from config import MODEL_MAX_CONTEXT, MIN_COMPLETION_TOKENS, TOKEN_BUDGET_MARGIN
+
+class BudgetAction:
+    """예산 점검 결과"""
+    OK = "ok"         # 요청한 max_tokens 그대로 사용
+    CLAMP = "clamp"   # 남은 컨텍스트에 맞게 max_tokens 축소
+    SPLIT = "split"   # 응답 공간이 너무 작음 - 입력을 나눠야 함
+
+@dataclass
+class BudgetDecision:
+    """프롬프트 한 건의 예산 점검 결과"""
+    prompt_tokens: int
+    requested_max_tokens: int
+    max_tokens: int
+    action: str
+    exact: bool       # 서버/모델 토크나이저로 센 값인지 (False면 추정치)
+
+class TokenBudgetPlanner:
+    """요청 전 프롬프트 토큰 수로 max_tokens 결정"""
+
+    def __init__(self, client: LLMClient = None, context_tokens: int = MODEL_MAX_CONTEXT,
+                 min_completion_tokens: int = MIN_COMPLETION_TOKENS, margin: int = TOKEN_BUDGET_MARGIN):
+        self.client = client or get_llm_client()
+        self.context_tokens = context_tokens
+        self.min_completion_tokens = min_completion_tokens
+        self.margin = margin
+        self.token_counter = TokenCounter()
+
+    def count_prompt_tokens(self, messages: List[Dict], estimated_tokens: Optional[int] = None) -> Tuple[int, bool]:
+        """프롬프트 토큰 수와 정확한 값인지 여부 반환
+        
+        estimated_tokens(템플릿 고정 토큰 + 윈도우 토큰처럼 이미 아는 값)가 있으면 추정 시 메시지를 다시 세지 않는다.
+        """
+        count = self.client.count_chat_tokens(messages)
+        if count is not None:
+            return count, True
+
+        # 정확한 토크나이저를 쓸 수 없으면 추정치에 10% 여유 + 메시지별 템플릿 토큰
+        if estimated_tokens is None:
+            estimated_tokens = sum(self.token_counter.count_tokens(message["content"]) for message in messages)
+        return int(estimated_tokens * 1.1) + 8 * len(messages), False
+
+    def plan(self, messages: List[Dict], max_tokens: int, estimated_tokens: Optional[int] = None) -> BudgetDecision:
+        """남은 컨텍스트 기준으로 max_tokens 조정"""
+        with get_pipeline_timer().stage("budget"):
+            prompt_tokens, exact = self.count_prompt_tokens(messages, estimated_tokens)
+        margin = self.margin if exact else self.margin * 4
+        available = self.context_tokens - prompt_tokens - margin
+
+        if available >= max_tokens:
+            action, allowed = BudgetAction.OK, max_tokens
+        elif available >= self.min_completion_tokens:
+            action, allowed = BudgetAction.CLAMP, available
+        else:
+            action, allowed = BudgetAction.SPLIT, max(0, available)
+
+        return BudgetDecision(
+            prompt_tokens=prompt_tokens,
+            requested_max_tokens=max_tokens,
+            max_tokens=allowed,
+            action=action,
+            exact=exact
+        )
+
+def split_window_text(window_text: str) -> List[str]:
+    """윈도우를 절반으로 분할 (라인 단위, 한 줄이면 문자 단위)"""
+    lines = window_text.splitlines()
+    if len(lines) > 1:
+        middle = len(lines) // 2
+        return ["\n".join(lines[:middle]), "\n".join(lines[middle:])]
+    middle = len(window_text) // 2
+    return [window_text[:middle], window_text[middle:]]
+
+# 전역 인스턴스
+token_budget_planner = None
+
+def get_token_budget_planner() -> TokenBudgetPlanner:
+    """토큰 예산 점검기 인스턴스 반환"""
+    global token_budget_planner
+    if token_budget_planner is None:
+        token_budget_planner = TokenBudgetPlanner()
+    return token_budget_planner
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+토큰 예산 테스트 스크립트 - 모의 vLLM 서버(/tokenize)로 max_tokens 유지/축소/윈도우 분할 결정 확인
+"""
+
+import sys
+
+import llm_client
+import token_budget
+import log_llm_pipeline
+from llm_client import LLMClient
+from concurrency_limiter import AdaptiveConcurrencyLimiter
+from token_budget import TokenBudgetPlanner, BudgetAction, split_window_text
+from mock_vllm_server import MockVLLMServer, MockServerConfig, count_text_tokens
+from prompt_templates import AnalysisType, get_prompt_templates, get_default_output_format
+
+CONTEXT = 1000
+MARGIN = 16
+MIN_COMPLETION = 100
+WINDOW_LINES = [
+    f"2025-09-12 13:35:{second:02d} ERROR [ordersvc] Database connection timeout after 30s (pool {second}/50)"
+    for second in range(40)
+]
+
+class NoTokenizerClient(LLMClient):
+    """서버/로컬 토크나이저를 모두 쓸 수 없는 클라이언트 (추정치 경로 확인용)"""
+
+    def count_chat_tokens(self, messages):
+        return None
+
+def make_messages(prompt_tokens: int) -> list:
+    """모의 서버 기준 정확히 prompt_tokens 토큰인 메시지 (4글자당 1토큰)"""
+    return [{"role": "system", "content": "s" * 4}, {"role": "user", "content": "u" * 4 * (prompt_tokens - 1)}]
+
+def check_decision_boundaries(planner: TokenBudgetPlanner) -> bool:
+    """정확한 토큰 수 기준 경계: 여유 = 컨텍스트 - 프롬프트 - 마진"""
+    max_tokens = 300
+    cases = [
+        # (프롬프트 토큰, 기대 결정, 기대 max_tokens)
+        (CONTEXT - MARGIN - max_tokens, BudgetAction.OK, max_tokens),
+        (CONTEXT - MARGIN - max_tokens + 1, BudgetAction.CLAMP, max_tokens - 1),
+        (CONTEXT - MARGIN - MIN_COMPLETION, BudgetAction.CLAMP, MIN_COMPLETION),
+        (CONTEXT - MARGIN - MIN_COMPLETION + 1, BudgetAction.SPLIT, MIN_COMPLETION - 1),
+        (CONTEXT + 50, BudgetAction.SPLIT, 0),
+    ]
+    passed = True
+    for prompt_tokens, action, allowed in cases:
+        decision = planner.plan(make_messages(prompt_tokens), max_tokens)
+        ok = (decision.prompt_tokens == prompt_tokens and decision.exact
+              and decision.action == action and decision.max_tokens == allowed)
+        passed = passed and ok
+        print(f"   프롬프트 {prompt_tokens}토큰 → {decision.action} (max_tokens {decision.max_tokens}) "
+              f"{'✅' if ok else f'❌ 기대값 {action} ({allowed})'}")
+    return passed
+
+def check_estimated_margin(server: MockVLLMServer) -> bool:
+    """토크나이저가 없으면 추정치(+10%, 메시지당 8토큰)와 4배 마진으로 더 보수적으로 결정"""
+    messages = make_messages(500)
+    exact = TokenBudgetPlanner(LLMClient(base_url=server.base_url), context_tokens=CONTEXT,
+                               min_completion_tokens=MIN_COMPLETION, margin=MARGIN).plan(messages, 400)
+    client = NoTokenizerClient(base_url=server.base_url)
+    planner = TokenBudgetPlanner(client, context_tokens=CONTEXT, min_completion_tokens=MIN_COMPLETION, margin=MARGIN)
+    decision = planner.plan(messages, 400, estimated_tokens=500)
+    expected_prompt = int(500 * 1.1) + 8 * len(messages)
+    expected_allowed = CONTEXT - expected_prompt - 4 * MARGIN
+    print(f"   정확: 프롬프트 {exact.prompt_tokens}토큰 → {exact.action} (max_tokens {exact.max_tokens})")
+    print(f"   추정: 프롬프트 {decision.prompt_tokens}토큰 (기대 {expected_prompt}) → "
+          f"{decision.action} (max_tokens {decision.max_tokens}, 기대 {expected_allowed})")
+    return (exact.exact and exact.action == BudgetAction.OK
+            and not decision.exact and decision.prompt_tokens == expected_prompt
+            and decision.action == BudgetAction.CLAMP and decision.max_tokens == expected_allowed)
+
+def check_split_window_text() -> bool:
+    """분할한 두 조각을 이으면 원래 윈도우 (라인 단위, 한 줄이면 문자 단위)"""
+    window_text = "\n".join(WINDOW_LINES[:5])
+    parts = split_window_text(window_text)
+    single = split_window_text(WINDOW_LINES[0])
+    print(f"   5줄 → {[len(part.splitlines()) for part in parts]}줄, 한 줄 → {[len(part) for part in single]}글자")
+    return ("\n".join(parts) == window_text and all(parts)
+            and "".join(single) == WINDOW_LINES[0] and all(single))
+
+def plan_window(planner: TokenBudgetPlanner, window_text: str, meta: dict):
+    """call_llm이 보낼 프롬프트 그대로 예산 점검"""
+    prompt_templates = get_prompt_templates()
+    output_format = get_default_output_format()
+    compiled = prompt_templates.get_multi_label_template([AnalysisType.DATABASE], None, output_format, False)
+    system_prompt, user_prompt = log_llm_pipeline.render_prompts(compiled, window_text, meta)
+    config = prompt_templates.get_multi_label_config([AnalysisType.DATABASE], output_format)
+    messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+    return planner.plan(messages, config["max_tokens"])
+
+def check_pipeline_clamp_and_split(server: MockVLLMServer) -> bool:
+    """call_llm: 응답 여유가 작으면 줄인 max_tokens로 요청, 더 작으면 윈도우를 반씩 나눠 요청"""
+    client = LLMClient(base_url=server.base_url, limiter=AdaptiveConcurrencyLimiter(initial_limit=2, adaptive=False))
+    window_text = "\n".join(WINDOW_LINES)
+    meta = {"service": "ordersvc", "severity": "error>warning>info", "window_index": 0}
+    probe = TokenBudgetPlanner(client, context_tokens=10 ** 6, min_completion_tokens=MIN_COMPLETION, margin=MARGIN)
+    full = plan_window(probe, window_text, meta)
+    half = max(plan_window(probe, part, meta).prompt_tokens for part in split_window_text(window_text))
+
+    original_client, llm_client.llm_client = llm_client.llm_client, client
+    original_planner = token_budget.token_budget_planner
+    original_check = log_llm_pipeline.PREFLIGHT_TOKEN_CHECK
+    log_llm_pipeline.PREFLIGHT_TOKEN_CHECK = True
+    try:
+        # 여유가 요청한 max_tokens보다 50 작음 → 축소 (모의 서버는 max_tokens까지 생성)
+        token_budget.token_budget_planner = TokenBudgetPlanner(
+            client, context_tokens=full.prompt_tokens + MARGIN + full.requested_max_tokens - 50,
+            min_completion_tokens=MIN_COMPLETION, margin=MARGIN)
+        before = server.request_count
+        clamped = log_llm_pipeline.call_llm(window_text, meta, AnalysisType.DATABASE)
+        clamp_requests = server.request_count - before
+        clamp_tokens = clamped["usage"]["completion_tokens"]
+
+        # 여유가 최소 응답 토큰보다 1 작음 → 분할 (반쪽 프롬프트는 여유가 충분)
+        token_budget.token_budget_planner = TokenBudgetPlanner(
+            client, context_tokens=full.prompt_tokens + MARGIN + MIN_COMPLETION - 1,
+            min_completion_tokens=MIN_COMPLETION, margin=MARGIN)
+        before = server.request_count
+        split = log_llm_pipeline.call_llm(window_text, meta, AnalysisType.DATABASE)
+        split_requests = server.request_count - before
+    finally:
+        llm_client.llm_client = original_client
+        token_budget.token_budget_planner = original_planner
+        log_llm_pipeline.PREFLIGHT_TOKEN_CHECK = original_check
+
+    split_parts = split["meta"].get("split_parts")
+    print(f"   전체 프롬프트 {full.prompt_tokens}토큰, 반쪽 최대 {half}토큰")
+    print(f"   축소: 요청 {clamp_requests}개, 생성 {clamp_tokens}토큰 (기대 {full.requested_max_tokens - 50})")
+    print(f"   분할: 요청 {split_requests}개, split_parts={split_parts}")
+    return (half < full.prompt_tokens
+            and clamp_requests == 1 and clamp_tokens == full.requested_max_tokens - 50
+            and "split_parts" not in clamped["meta"]
+            and split_requests == 2 and split_parts == 2)
+
+def main():
+    print("=== 토큰 예산 테스트 시작 ===\n")
+    # 항상 max_tokens까지 생성해 축소된 max_tokens가 그대로 보이도록 함
+    server = MockVLLMServer(0, MockServerConfig(ttft=0.0, ttft_jitter=0.0, output_tokens=100000,
+                                                output_tokens_jitter=0.0)).start()
+    results = {}
+
+    try:
+        client = LLMClient(base_url=server.base_url)
+        planner = TokenBudgetPlanner(client, context_tokens=CONTEXT, min_completion_tokens=MIN_COMPLETION, margin=MARGIN)
+        assert count_text_tokens("".join(m["content"] for m in make_messages(123))) == 123
+
+        print("🧪 1. 유지/축소/분할 경계 (정확한 토큰 수)")
+        results["결정 경계"] = check_decision_boundaries(planner)
+
+        print("\n🧪 2. 토크나이저 없을 때 추정치와 마진")
+        results["추정 마진"] = check_estimated_margin(server)
+
+        print("\n🧪 3. 윈도우 분할")
+        results["윈도우 분할"] = check_split_window_text()
+
+        print("\n🧪 4. call_llm 축소/분할 요청")
+        results["파이프라인 축소/분할"] = check_pipeline_clamp_and_split(server)
+    finally:
+        server.stop()
+
+    print("\n=== 테스트 결과 요약 ===")
+    for name, passed in results.items():
+        print(f"{name}: {'✅ 성공' if passed else '❌ 실패'}")
+    return all(results.values())
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
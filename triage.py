@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+트리아지 모듈 - 전체 분석 전에 짧은 yes/no 분류로 조치가 필요한 윈도우와 분석 타입을 먼저 판별 (2단계 캐스케이드)
+"""
+
+import math
+import time
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+import requests
+
+from prompt_templates import AnalysisType, get_prompt_templates
+from priority_scheduler import LEVEL_PATTERN
+from llm_client import LLMClient, get_llm_client
+from endpoint_pool import EndpointPool
+from config import (
+    MODEL, VLLM_ENDPOINTS, TRIAGE_MODEL, TRIAGE_ENDPOINTS, TRIAGE_MAX_TOKENS, TRIAGE_THRESHOLD,
+    TRIAGE_USE_LOGPROBS, DEFAULT_TIMEOUT
+)
+
+TRIAGE_SYSTEM_PROMPT = """You are a log triage classifier for an SRE team.
+Decide whether the log window contains an actionable problem (errors, failures, attacks, resource exhaustion, degraded performance).
+Routine INFO/DEBUG traffic and single recovered warnings are not actionable.
+Answer with exactly one line and nothing else:
+- "yes <category>" if actionable, where <category> is one of: {categories}
+- "no" if not actionable"""
+
+TRIAGE_USER_TEMPLATE = """[META]
+service={service} host={host}
+
+[LOG WINDOW]
+{log_content}
+
+Actionable? Answer "yes <category>" or "no"."""
+
+# 로그 레벨이 이 값이면 분류 결과와 상관없이 분석 (놓치면 안 되는 윈도우)
+FORCED_LEVELS = ("CRITICAL", "FATAL")
+
+@dataclass
+class TriageDecision:
+    """윈도우 하나의 트리아지 결과"""
+    actionable: bool
+    analysis_type: AnalysisType
+    score: float  # P(yes) - logprob이 없으면 응답 텍스트 기준 0 또는 1
+    forced: bool = False  # CRITICAL/FATAL 포함으로 분류 없이 분석
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+
+    def to_dict(self) -> Dict:
+        """결과 레코드 저장용 dict"""
+        data = asdict(self)
+        data["analysis_type"] = self.analysis_type.value
+        return data
+
+def _yes_probability(candidates: Dict[str, float]) -> Optional[float]:
+    """첫 토큰 후보 {토큰: logprob}에서 yes/(yes+no) 확률 계산 (둘 다 없으면 None)"""
+    yes = no = 0.0
+    for token, logprob in candidates.items():
+        word = token.strip().lower()
+        if not word:
+            continue
+        if word in ("y", "ye", "yes"):
+            yes += math.exp(logprob)
+        elif word in ("n", "no"):
+            no += math.exp(logprob)
+    if yes + no == 0:
+        return None
+    return yes / (yes + no)
+
+def _first_token_candidates(choice: Dict) -> Dict[str, float]:
+    """응답 choice의 첫 토큰 top logprobs - chat(content 목록)과 completions(top_logprobs 목록) 형식 모두 처리"""
+    logprobs = choice.get("logprobs") or {}
+    content = logprobs.get("content")
+    if content:
+        first = content[0]
+        candidates = {item["token"]: item["logprob"] for item in first.get("top_logprobs") or []}
+        candidates.setdefault(first["token"], first["logprob"])
+        return candidates
+    top_logprobs = logprobs.get("top_logprobs")
+    if top_logprobs and top_logprobs[0]:
+        return dict(top_logprobs[0])
+    return {}
+
+class TriageClassifier:
+    """짧은 분류 요청으로 윈도우가 전체 분석 대상인지 판별
+
+    TRIAGE_MODEL/TRIAGE_ENDPOINTS가 분석 설정과 같으면 분석 클라이언트(동시성 한도 포함)를 그대로 쓰고,
+    다르면 분류 전용 클라이언트를 만든다. 같은 서버의 다른 모델이면 동시성 한도는 공유한다.
+    """
+
+    def __init__(self, client: LLMClient = None, threshold: float = TRIAGE_THRESHOLD,
+                 use_logprobs: bool = TRIAGE_USE_LOGPROBS, max_tokens: int = TRIAGE_MAX_TOKENS):
+        self.client = client or self._create_client()
+        self.threshold = threshold
+        self.use_logprobs = use_logprobs
+        self.config = {"temperature": 0.0, "max_tokens": max_tokens, "timeout": DEFAULT_TIMEOUT}
+        self.system_prompt = TRIAGE_SYSTEM_PROMPT.format(
+            categories=", ".join(analysis_type.value for analysis_type in AnalysisType)
+        )
+
+    @staticmethod
+    def _create_client() -> LLMClient:
+        """분류용 클라이언트 - 설정이 분석과 같으면 공유"""
+        shared = get_llm_client()
+        if TRIAGE_MODEL == MODEL and TRIAGE_ENDPOINTS == VLLM_ENDPOINTS:
+            return shared
+        if TRIAGE_ENDPOINTS == VLLM_ENDPOINTS:
+            return LLMClient(model=TRIAGE_MODEL, pool=shared.pool, limiter=shared.limiter)
+        return LLMClient(model=TRIAGE_MODEL, pool=EndpointPool(TRIAGE_ENDPOINTS))
+
+    def build_messages(self, window_text: str, meta: Dict) -> List[Dict]:
+        """분류 요청 메시지"""
+        user_prompt = TRIAGE_USER_TEMPLATE.format(
+            service=meta.get("service", "[unknown]"),
+            host=meta.get("host", "[unknown]"),
+            log_content=window_text
+        )
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _decide(self, window_text: str, text: str, candidates: Dict[str, float]) -> Tuple[bool, float, AnalysisType]:
+        """응답 텍스트와 첫 토큰 logprob으로 (조치 필요 여부, 점수, 분석 타입) 결정"""
+        words = (text or "").strip().lower().replace(":", " ").replace(",", " ").split()
+        score = _yes_probability(candidates) if candidates else None
+        if score is None:
+            score = 1.0 if words and words[0].startswith("yes") else 0.0
+
+        categories = {analysis_type.value: analysis_type for analysis_type in AnalysisType}
+        analysis_type = next((categories[word] for word in words[1:] if word in categories), None)
+        # 분류 모델이 타입을 빠뜨리거나 잘못 쓴 경우 키워드 기반 감지로 보완
+        if analysis_type is None:
+            analysis_type = get_prompt_templates().detect_analysis_type(window_text)
+        return score >= self.threshold, score, analysis_type
+
+    def _forced_decision(self, window_text: str) -> Optional[TriageDecision]:
+        """CRITICAL/FATAL 로그가 있으면 분류 요청 없이 분석 대상으로 결정"""
+        for match in LEVEL_PATTERN.finditer(window_text):
+            if match.group(1) in FORCED_LEVELS:
+                analysis_type = get_prompt_templates().detect_analysis_type(window_text)
+                return TriageDecision(actionable=True, analysis_type=analysis_type, score=1.0, forced=True)
+        return None
+
+    def _logprob_params(self, chat: bool) -> Dict:
+        """첫 토큰 후보 확률 요청 파라미터 (chat/completions 형식이 다름)"""
+        if not self.use_logprobs:
+            return {}
+        return {"logprobs": True, "top_logprobs": 5} if chat else {"logprobs": 5}
+
+    def _request(self, request, chat: bool) -> Dict:
+        """logprobs 파라미터를 서버가 거부(400)하면 이후 요청부터 빼고 다시 요청"""
+        try:
+            return request(self._logprob_params(chat))
+        except requests.exceptions.HTTPError as e:
+            if not self.use_logprobs or e.response is None or e.response.status_code != 400:
+                raise
+            print("⚠️ 트리아지 logprobs 미지원 - 응답 텍스트로만 판별")
+            self.use_logprobs = False
+            return request({})
+
+    def classify(self, window_text: str, meta: Dict) -> TriageDecision:
+        """윈도우 하나 분류"""
+        forced = self._forced_decision(window_text)
+        if forced:
+            return forced
+
+        messages = self.build_messages(window_text, meta)
+        started = time.perf_counter()
+        data = self._request(
+            lambda params: self.client.chat_completion(
+                messages,
+                temperature=self.config["temperature"],
+                max_tokens=self.config["max_tokens"],
+                timeout=self.config["timeout"],
+                **params
+            ),
+            chat=True
+        )
+        choice = data["choices"][0]
+        usage = data.get("usage") or {}
+        actionable, score, analysis_type = self._decide(
+            window_text, choice["message"]["content"], _first_token_candidates(choice)
+        )
+        return TriageDecision(
+            actionable=actionable,
+            analysis_type=analysis_type,
+            score=score,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            latency=time.perf_counter() - started
+        )
+
+    def classify_batch(self, items: List[Tuple[str, Dict]]) -> List[TriageDecision]:
+        """여러 윈도우를 /v1/completions 한 요청으로 분류 - usage/지연시간은 윈도우 수로 나눠 기록
+
+        배치 요청이 실패하거나 응답이 누락된 윈도우는 classify로 개별 재요청한다.
+        """
+        decisions = [self._forced_decision(window_text) for window_text, _ in items]
+        positions = [position for position, decision in enumerate(decisions) if decision is None]
+        if not positions:
+            return decisions
+
+        renderer = self.client.get_renderer()
+        prompts = [renderer.render(self.build_messages(*items[position])) for position in positions]
+        started = time.perf_counter()
+        try:
+            data = self._request(
+                lambda params: self.client.completion(
+                    prompts,
+                    temperature=self.config["temperature"],
+                    max_tokens=self.config["max_tokens"],
+                    timeout=self.config["timeout"] * max(1, len(prompts) // 4 + 1),
+                    **params
+                ),
+                chat=False
+            )
+        except Exception as e:
+            print(f"⚠️ 트리아지 배치 요청 실패 ({len(prompts)}개 윈도우) - 윈도우별 요청으로 대체: {e}")
+            data = {}
+        latency = (time.perf_counter() - started) / len(prompts)
+        usage = data.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0) // len(prompts)
+        completion_tokens = usage.get("completion_tokens", 0) // len(prompts)
+
+        for order, choice in enumerate(data.get("choices", [])):
+            index = choice.get("index", order)
+            if not 0 <= index < len(positions) or choice.get("text") is None:
+                continue
+            position = positions[index]
+            window_text = items[position][0]
+            actionable, score, analysis_type = self._decide(window_text, choice["text"], _first_token_candidates(choice))
+            decisions[position] = TriageDecision(
+                actionable=actionable,
+                analysis_type=analysis_type,
+                score=score,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                latency=latency
+            )
+
+        for position, decision in enumerate(decisions):
+            if decision is None:
+                decisions[position] = self.classify(*items[position])
+        return decisions
+
+class CascadeStats:
+    """트리아지 캐스케이드 비용 집계 및 절감량 추정
+
+    GPU 시간은 요청 지연시간 합으로 근사한다. 트리아지가 없었을 때의 비용은
+    실제로 분석한 윈도우의 평균 분석 비용 x (분석 + 생략 윈도우 수)로 추정한다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.windows = 0
+        self.forced = 0
+        self.skipped = 0
+        self.analyzed = 0
+        self.triage_usage = {"prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0}
+        self.analysis_usage = {"prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0, "windows": 0}
+
+    def record_triage(self, decision: TriageDecision):
+        """트리아지 결과 반영"""
+        with self._lock:
+            self.windows += 1
+            self.forced += decision.forced
+            if decision.actionable:
+                self.analyzed += 1
+            else:
+                self.skipped += 1
+            self.triage_usage["prompt_tokens"] += decision.prompt_tokens
+            self.triage_usage["completion_tokens"] += decision.completion_tokens
+            self.triage_usage["seconds"] += decision.latency
+
+    def record_analysis(self, usage: Optional[Dict]):
+        """전체 분석 usage 반영 (usage가 없으면 평균 계산에서 제외)"""
+        if not usage:
+            return
+        with self._lock:
+            self.analysis_usage["prompt_tokens"] += usage.get("prompt_tokens", 0)
+            self.analysis_usage["completion_tokens"] += usage.get("completion_tokens", 0)
+            self.analysis_usage["seconds"] += usage.get("latency", 0.0)
+            self.analysis_usage["windows"] += 1
+
+    def get_report(self) -> Dict:
+        """실행 단위 절감량 리포트"""
+        with self._lock:
+            triage = dict(self.triage_usage)
+            analysis = dict(self.analysis_usage)
+            report = {
+                "windows": self.windows,
+                "analyzed": self.analyzed,
+                "skipped": self.skipped,
+                "forced": self.forced,
+                "triage": triage,
+                "analysis": analysis,
+                "estimated_baseline": None,
+                "saved": None
+            }
+
+        measured = analysis.pop("windows")
+        if measured:
+            keys = ("prompt_tokens", "completion_tokens", "seconds")
+            baseline = {key: analysis[key] / measured * (report["analyzed"] + report["skipped"]) for key in keys}
+            actual = {key: triage[key] + analysis[key] * report["analyzed"] / measured for key in keys}
+            report["estimated_baseline"] = baseline
+            report["saved"] = {key: baseline[key] - actual[key] for key in keys}
+        return report
+
+def print_cascade_report(report: Dict):
+    """캐스케이드 절감량 출력"""
+    print(f"🚦 트리아지: 윈도우 {report['windows']}개 중 분석 {report['analyzed']}개 "
+          f"(강제 {report['forced']}개), 생략 {report['skipped']}개")
+    triage = report["triage"]
+    print(f"   트리아지 비용: 토큰 {triage['prompt_tokens']}+{triage['completion_tokens']}, GPU {triage['seconds']:.1f}s")
+    saved = report["saved"]
+    if saved is None:
+        print("   절감량: 분석 usage가 없어 추정 불가")
+        return
+    baseline = report["estimated_baseline"]
+    saved_tokens = saved["prompt_tokens"] + saved["completion_tokens"]
+    baseline_tokens = baseline["prompt_tokens"] + baseline["completion_tokens"]
+    ratio = saved_tokens / baseline_tokens * 100 if baseline_tokens else 0.0
+    print(f"   추정 절감: 토큰 {saved_tokens:,.0f}개 ({ratio:.1f}%, 생성 {saved['completion_tokens']:,.0f}개), "
+          f"GPU {saved['seconds']:.1f}s (요청 지연시간 기준)")
+
+_triage_classifier = None
+_triage_lock = threading.Lock()
+
+def get_triage_classifier() -> TriageClassifier:
+    """트리아지 분류기 인스턴스 반환 (처음 사용할 때 생성)"""
+    global _triage_classifier
+    with _triage_lock:
+        if _triage_classifier is None:
+            _triage_classifier = TriageClassifier()
+        return _triage_classifier
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+트리아지 테스트 스크립트 - 첫 토큰 logprob 기반 P(yes) 임계값 판정과 배치/개별 요청 대체 경로 확인 (모의 서버 사용)
+"""
+
+import sys
+import math
+import requests
+
+from llm_client import LLMClient
+from triage import TriageClassifier, _yes_probability, _first_token_candidates
+from prompt_templates import AnalysisType
+from mock_vllm_server import MockVLLMServer, MockServerConfig
+
+META = {"service": "ordersvc", "host": "web-01"}
+ERROR_WINDOW = "\n".join([
+    "2025-09-12 13:35:26 ERROR [ordersvc] Database connection timeout after 30s",
+    "2025-09-12 13:35:27 ERROR [ordersvc] Connection pool exhausted (50/50)",
+])
+INFO_WINDOW = "2025-09-12 13:35:26 INFO [ordersvc] GET /orders 200 12ms"
+CRITICAL_WINDOW = "2025-09-12 13:35:26 CRITICAL [ordersvc] Out of memory: killed process 4242"
+
+class RejectLogprobsClient(LLMClient):
+    """logprobs 파라미터를 400으로 거부하는 서버 흉내 (구버전/다른 서빙 엔진)"""
+
+    def chat_completion(self, messages, temperature, max_tokens, timeout, **extra):
+        if extra.get("logprobs"):
+            response = requests.Response()
+            response.status_code = 400
+            raise requests.exceptions.HTTPError("400 Client Error: logprobs not supported", response=response)
+        return super().chat_completion(messages, temperature, max_tokens, timeout, **extra)
+
+class DropChoiceClient(LLMClient):
+    """배치 응답에서 choice 하나를 빠뜨리거나 배치 요청 자체가 실패하는 서버 흉내"""
+
+    def __init__(self, *args, fail_batch: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail_batch = fail_batch
+
+    def completion(self, prompts, temperature, max_tokens, timeout, **extra):
+        if self.fail_batch:
+            raise requests.exceptions.ConnectionError("mock batch failure")
+        data = super().completion(prompts, temperature, max_tokens, timeout, **extra)
+        data["choices"] = [choice for choice in data["choices"] if choice.get("index") != 0]
+        return data
+
+def logprobs(p_yes: float) -> dict:
+    """P(yes)가 p_yes인 yes/no 첫 토큰 후보"""
+    return {"yes": math.log(p_yes), "no": math.log(1 - p_yes)}
+
+def check_threshold_decision(server: MockVLLMServer) -> bool:
+    """응답 텍스트가 yes여도 P(yes)가 임계값보다 작으면 생략, 경계값(=임계값)은 분석"""
+    client = LLMClient(base_url=server.base_url)
+    cases = [
+        # (임계값, 응답 텍스트, 첫 토큰 후보, 기대 조치 필요, 기대 점수)
+        (0.5, "yes database", logprobs(0.3), False, 0.3),
+        (0.25, "yes database", logprobs(0.3), True, 0.3),
+        (0.5, "no", logprobs(0.5), True, 0.5),
+        (0.5, "no", {" Yes": math.log(0.2), "y": math.log(0.2), "No": math.log(0.1), ".": math.log(0.5)}, True, 0.8),
+        (0.5, "yes", {}, True, 1.0),
+        (0.5, "No.", {}, False, 0.0),
+    ]
+    passed = True
+    for threshold, text, candidates, actionable, score in cases:
+        classifier = TriageClassifier(client, threshold=threshold)
+        decided, decided_score, _ = classifier._decide(ERROR_WINDOW, text, candidates)
+        ok = decided == actionable and abs(decided_score - score) < 1e-9
+        passed = passed and ok
+        print(f"   임계값 {threshold}, 응답 {text!r}, 후보 {len(candidates)}개 → "
+              f"P(yes)={decided_score:.2f}, 분석={decided} {'✅' if ok else '❌'}")
+    return passed
+
+def check_candidates_and_category(server: MockVLLMServer) -> bool:
+    """chat/completions logprobs 형식 파싱, 분류 타입 파싱과 키워드 감지 보완"""
+    chat_choice = {"logprobs": {"content": [{
+        "token": "yes", "logprob": math.log(0.9),
+        "top_logprobs": [{"token": "no", "logprob": math.log(0.1)}]
+    }]}}
+    completion_choice = {"logprobs": {"tokens": ["no"], "top_logprobs": [logprobs(0.4)]}}
+    chat_score = _yes_probability(_first_token_candidates(chat_choice))
+    completion_score = _yes_probability(_first_token_candidates(completion_choice))
+    unknown = _yes_probability({"maybe": math.log(0.9)})
+
+    classifier = TriageClassifier(LLMClient(base_url=server.base_url), threshold=0.5)
+    _, _, named = classifier._decide(ERROR_WINDOW, "Yes: security,", {})
+    _, _, detected = classifier._decide(ERROR_WINDOW, "yes databse", {})
+    print(f"   chat P(yes)={chat_score:.2f}, completions P(yes)={completion_score:.2f}, yes/no 없음={unknown}")
+    print(f"   'Yes: security,' → {named.value}, 오타 타입 → 키워드 감지 {detected.value}")
+    return (abs(chat_score - 0.9) < 1e-9 and abs(completion_score - 0.4) < 1e-9 and unknown is None
+            and named == AnalysisType.SECURITY and detected == AnalysisType.DATABASE)
+
+def check_classify_requests(server: MockVLLMServer) -> bool:
+    """classify: 모의 서버 logprob으로 P(yes) >= 임계값 판정, CRITICAL 윈도우는 요청 없이 분석"""
+    classifier = TriageClassifier(LLMClient(base_url=server.base_url), threshold=0.5)
+    before = server.request_count
+    decisions = [classifier.classify(ERROR_WINDOW, META) for _ in range(20)]
+    sent = server.request_count - before
+    consistent = all(decision.actionable == (decision.score >= 0.5) for decision in decisions)
+    # 응답 텍스트(0/1)가 아니라 logprob으로 계산한 점수인지
+    graded = sum(0.0 < decision.score < 1.0 for decision in decisions)
+
+    before = server.request_count
+    forced = classifier.classify(CRITICAL_WINDOW, META)
+    forced_sent = server.request_count - before
+    print(f"   요청 {sent}개, 분석 {sum(d.actionable for d in decisions)}개, 중간 점수 {graded}개, 판정 일치 {consistent}")
+    print(f"   CRITICAL 윈도우: forced={forced.forced}, 분석={forced.actionable}, 요청 {forced_sent}개")
+    return (sent == 20 and consistent and graded == 20
+            and forced.forced and forced.actionable and forced_sent == 0)
+
+def check_logprobs_rejected(server: MockVLLMServer) -> bool:
+    """서버가 logprobs를 400으로 거부하면 이후로는 빼고 응답 텍스트로 판정"""
+    classifier = TriageClassifier(RejectLogprobsClient(base_url=server.base_url), threshold=0.5)
+    decision = classifier.classify(ERROR_WINDOW, META)
+    print(f"   use_logprobs={classifier.use_logprobs}, P(yes)={decision.score}")
+    return not classifier.use_logprobs and decision.score in (0.0, 1.0)
+
+def check_batch_fallbacks(server: MockVLLMServer) -> bool:
+    """classify_batch: 한 요청으로 분류, 빠진 choice와 실패한 배치는 윈도우별 요청으로 대체"""
+    items = [(ERROR_WINDOW, META), (CRITICAL_WINDOW, META), (INFO_WINDOW, META), (ERROR_WINDOW, META)]
+    classifier = TriageClassifier(LLMClient(base_url=server.base_url), threshold=0.5)
+    before = server.request_count
+    decisions = classifier.classify_batch(items)
+    batch_sent = server.request_count - before
+    consistent = all(d.forced or d.actionable == (d.score >= 0.5) for d in decisions)
+
+    dropped = TriageClassifier(DropChoiceClient(base_url=server.base_url), threshold=0.5)
+    before = server.request_count
+    dropped_decisions = dropped.classify_batch(items)
+    dropped_sent = server.request_count - before
+
+    failed = TriageClassifier(DropChoiceClient(base_url=server.base_url, fail_batch=True), threshold=0.5)
+    before = server.request_count
+    failed_decisions = failed.classify_batch(items)
+    failed_sent = server.request_count - before
+    print(f"   배치: 요청 {batch_sent}개, 결정 {len(decisions)}개, 강제 {[d.forced for d in decisions]}, 판정 일치 {consistent}")
+    print(f"   choice 누락: 요청 {dropped_sent}개 (배치 1 + 개별 1), 실패: 요청 {failed_sent}개 (개별 3)")
+    return (batch_sent == 1 and len(decisions) == 4 and decisions[1].forced and consistent
+            and dropped_sent == 2 and all(dropped_decisions)
+            and failed_sent == 3 and all(failed_decisions) and failed_decisions[1].forced)
+
+def main():
+    print("=== 트리아지 테스트 시작 ===\n")
+    # seed 고정 - 모의 서버의 P(yes)가 실행마다 같도록
+    server = MockVLLMServer(0, MockServerConfig(ttft=0.0, ttft_jitter=0.0, seed=7)).start()
+    results = {}
+
+    try:
+        print("🧪 1. P(yes) 임계값 판정")
+        results["임계값 판정"] = check_threshold_decision(server)
+
+        print("\n🧪 2. logprob 후보/분류 타입 파싱")
+        results["후보/타입 파싱"] = check_candidates_and_category(server)
+
+        print("\n🧪 3. 개별 분류 요청")
+        results["개별 분류"] = check_classify_requests(server)
+
+        print("\n🧪 4. logprobs 미지원 서버")
+        results["logprobs 거부"] = check_logprobs_rejected(server)
+
+        print("\n🧪 5. 배치 분류와 대체 경로")
+        results["배치 대체"] = check_batch_fallbacks(server)
+    finally:
+        server.stop()
+
+    print("\n=== 테스트 결과 요약 ===")
+    for name, passed in results.items():
+        print(f"{name}: {'✅ 성공' if passed else '❌ 실패'}")
+    return all(results.values())
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
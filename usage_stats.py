@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+LLM 사용량 집계 모듈 - 윈도우 결과의 usage(프롬프트/생성 토큰, 지연시간)를 분석 타입/서비스/실행 단위로 집계
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+from prompt_templates import get_prompt_templates, AnalysisType, OutputFormat
+
+def _new_bucket() -> Dict:
+    return {
+        "windows": 0,
+        "analyzed_windows": 0,
+        "requests": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "latency": 0.0,
+        "max_completion_tokens": 0,
+        "truncated": 0
+    }
+
+def _summarize_bucket(bucket: Dict) -> Dict:
+    """누적값에 요청당 평균과 처리량 추가"""
+    requests = bucket["requests"]
+    latency = bucket["latency"]
+    return {
+        **bucket,
+        "avg_prompt_tokens": bucket["prompt_tokens"] / requests if requests else 0.0,
+        "avg_completion_tokens": bucket["completion_tokens"] / requests if requests else 0.0,
+        "avg_latency": latency / requests if requests else 0.0,
+        # 요청 하나가 받은 생성 속도 (동시 요청을 합친 서버 처리량은 run 항목 참고)
+        "completion_tokens_per_second": bucket["completion_tokens"] / latency if latency else 0.0,
+        "truncated_ratio": bucket["truncated"] / requests if requests else 0.0
+    }
+
+class UsageStats:
+    """윈도우 결과 레코드의 usage 집계
+
+    usage가 없는 레코드(트리아지로 생략된 윈도우, usage 도입 전 결과)는 윈도우 수에만 포함한다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = _new_bucket()
+        self.by_analysis_type = {}
+        self.by_service = {}
+
+    def add_record(self, record: Dict):
+        """레코드 하나 반영"""
+        usage = record.get("usage")
+        analysis_type = record.get("analysis_type", "unknown")
+        service = record.get("meta", {}).get("service", "[unknown]")
+        with self._lock:
+            buckets = [
+                self.total,
+                self.by_analysis_type.setdefault(analysis_type, _new_bucket()),
+                self.by_service.setdefault(service, _new_bucket())
+            ]
+            for bucket in buckets:
+                bucket["windows"] += 1
+                if not usage:
+                    continue
+                bucket["analyzed_windows"] += 1
+                bucket["requests"] += usage.get("requests", 1)
+                bucket["prompt_tokens"] += usage.get("prompt_tokens", 0)
+                bucket["completion_tokens"] += usage.get("completion_tokens", 0)
+                bucket["latency"] += usage.get("latency", 0.0)
+                bucket["max_completion_tokens"] = max(
+                    bucket["max_completion_tokens"],
+                    usage.get("max_completion_tokens", usage.get("completion_tokens", 0))
+                )
+                bucket["truncated"] += usage.get("truncated", 0)
+
+    def add_records(self, records: Iterable[Dict]):
+        """레코드 여러 개 반영"""
+        for record in records:
+            self.add_record(record)
+
+    def get_report(self, output_format: OutputFormat = None) -> Dict:
+        """전체/분석 타입별/서비스별 집계 (분석 타입별 항목에는 설정된 max_tokens 포함)"""
+        prompt_templates = get_prompt_templates()
+        with self._lock:
+            total = dict(self.total)
+            by_analysis_type = {name: dict(bucket) for name, bucket in self.by_analysis_type.items()}
+            by_service = {name: dict(bucket) for name, bucket in self.by_service.items()}
+
+        type_report = {}
+        for name, bucket in sorted(by_analysis_type.items(), key=lambda item: -item[1]["completion_tokens"]):
+            entry = _summarize_bucket(bucket)
+            try:
+                max_tokens = prompt_templates.get_analysis_config(AnalysisType(name), output_format)["max_tokens"]
+            except ValueError:
+                max_tokens = None
+            entry["configured_max_tokens"] = max_tokens
+            entry["max_completion_ratio"] = bucket["max_completion_tokens"] / max_tokens if max_tokens else None
+            type_report[name] = entry
+
+        return {
+            "total": _summarize_bucket(total),
+            "by_analysis_type": type_report,
+            "by_service": {
+                name: _summarize_bucket(bucket)
+                for name, bucket in sorted(by_service.items(), key=lambda item: -item[1]["completion_tokens"])
+            }
+        }
+
+def get_run_throughput(stats: UsageStats, wall_seconds: float) -> Dict:
+    """실행 단위 처리량 - 이번 실행에서 분석한 윈도우의 토큰 합 / 실행 시간 (동시 요청 포함)"""
+    total = stats.get_report()["total"]
+    return {
+        "wall_seconds": wall_seconds,
+        "windows": total["windows"],
+        "requests": total["requests"],
+        "prompt_tokens": total["prompt_tokens"],
+        "completion_tokens": total["completion_tokens"],
+        "prompt_tokens_per_second": total["prompt_tokens"] / wall_seconds if wall_seconds else 0.0,
+        "completion_tokens_per_second": total["completion_tokens"] / wall_seconds if wall_seconds else 0.0
+    }
+
+def print_usage_report(report: Dict, run: Optional[Dict] = None):
+    """사용량 요약 출력"""
+    total = report["total"]
+    if not total["requests"]:
+        return
+    print(f"🧮 LLM 사용량: 요청 {total['requests']}개, 토큰 {total['prompt_tokens']:,}+{total['completion_tokens']:,} "
+          f"(요청당 평균 {total['avg_prompt_tokens']:.0f}+{total['avg_completion_tokens']:.0f}), "
+          f"생성 {total['completion_tokens_per_second']:.1f} tok/s/요청, 잘림 {total['truncated']}개")
+    if run and run["wall_seconds"]:
+        print(f"   이번 실행: {run['wall_seconds']:.1f}s 동안 생성 {run['completion_tokens_per_second']:.1f} tok/s, "
+              f"프롬프트 {run['prompt_tokens_per_second']:.1f} tok/s")
+    for name, entry in report["by_analysis_type"].items():
+        if not entry["requests"]:
+            continue
+        limit = f"/{entry['configured_max_tokens']}" if entry["configured_max_tokens"] else ""
+        print(f"   {name:<12} 요청 {entry['requests']:>4}개  평균 {entry['avg_prompt_tokens']:>6.0f}+{entry['avg_completion_tokens']:<5.0f} "
+              f"최대 생성 {entry['max_completion_tokens']}{limit}  평균 {entry['avg_latency']:.1f}s  잘림 {entry['truncated']}개")
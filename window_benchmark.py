@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+슬라이딩 윈도우 벤치마크 - 토큰 계산/윈도우 분할/오버랩 조정/병합/전처리/타입 감지/로그 라인 파싱의 CPU 처리량과 메모리 측정 및 기준 결과 대비 회귀 확인
+"""
+
+import gc
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from log_generator import LogGenerator
+from log_parser import LogParser
+from pipeline_timing import get_pipeline_timer
+from prompt_templates import get_prompt_templates, IncrementalTypeDetector
+from sliding_window import SlidingWindow, WindowConfig, WindowProcessor, WindowResult
+
+# 같은 크기면 항상 같은 로그가 생성되도록 시드와 시작 시각 고정
+CORPUS_SEED = 42
+CORPUS_BASE_TIME = datetime(2025, 1, 1, 0, 0, 0)
+
+BENCHMARKS = ["token_counter", "create_windows", "adjust_overlap", "merge_windows", "preprocess_lines",
+              "detect_rescan", "detect_incremental", "parse_strptime", "parse_lines"]
+
+def parse_size(value: str) -> int:
+    """10k, 1M 같은 라인 수 표기 변환"""
+    value = value.strip().lower()
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    if value and value[-1] in multipliers:
+        return int(float(value[:-1]) * multipliers[value[-1]])
+    return int(value)
+
+def build_corpus(num_lines: int, seed: int = CORPUS_SEED) -> List[str]:
+    """결정적 벤치마크 로그 생성"""
+    random.seed(seed)
+    return LogGenerator().generate_large_volume_logs(num_lines, base_time=CORPUS_BASE_TIME)
+
+def measure(func: Callable[[], object], repeat: int, memory: bool) -> Dict:
+    """repeat회 중 최소 시간과 (memory=True면) tracemalloc 최대 메모리 측정
+
+    tracemalloc은 할당마다 비용이 커서 시간 측정과 섞이지 않도록 별도로 한 번 더 실행한다.
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"seconds": best, "peak_memory_bytes": peak, "result": result}
+
+def detect_incremental(lines: List[str], windows: List[WindowResult]) -> int:
+    """윈도우 경계를 따라 새 라인만 한 번씩 스캔하며 타입 감지 (오버랩 라인 재스캔 없음, 파이프라인과 같은 방식)"""
+    detector = IncrementalTypeDetector()
+    next_line = 0
+    for window in windows:
+        detector.remove_oldest(window.start_line - (next_line - len(detector)))
+        if window.end_line >= next_line:
+            detector.add_text("\n".join(lines[next_line:window.end_line + 1]))
+            next_line = window.end_line + 1
+        detector.detect()
+    return len(windows)
+
+def parse_lines_strptime(lines: List[str]) -> List[Dict]:
+    """공용 파서 이전 방식 (라인마다 re.match + strptime) - parse_lines 비교 기준"""
+    parsed = []
+    for line in lines:
+        match = re.match(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (\w+) \[(\w+)\] (.+)', line.strip())
+        if match:
+            timestamp_str, level, service, message = match.groups()
+            parsed.append({
+                "timestamp": datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S"),
+                "level": level,
+                "service": service,
+                "message": message,
+                "raw": line.strip()
+            })
+    return parsed
+
+def run_size(lines: List[str], config: WindowConfig, repeat: int, memory: bool,
+             benchmarks: List[str]) -> Dict:
+    """코퍼스 하나에 대해 벤치마크 실행"""
+    sliding_window = SlidingWindow(config)
+    counter = sliding_window.token_counter
+    total_tokens = sum(counter.count_tokens(line) for line in lines)
+    windows = sliding_window.create_windows(lines)
+    window_lines = [window.content.split("\n") for window in windows]
+    prompt_templates = get_prompt_templates()
+    small_windows = SlidingWindow(WindowConfig(
+        max_tokens=max(1, config.max_tokens // 4), overlap_ratio=0.0, min_tokens=config.min_tokens,
+        tokenizer_type=config.tokenizer_type, encoding_name=config.encoding_name
+    )).create_windows(lines)
+
+    cases = {
+        "token_counter": (lambda: sum(counter.count_tokens(line) for line in lines), len(lines)),
+        "create_windows": (lambda: len(sliding_window.create_windows(lines)), len(lines)),
+        "adjust_overlap": (
+            lambda: sum(len(sliding_window._adjust_window_for_overlap(chunk, window.token_count)[0])
+                        for chunk, window in zip(window_lines, windows)),
+            sum(len(chunk) for chunk in window_lines)
+        ),
+        "merge_windows": (lambda: len(sliding_window.merge_windows(small_windows)),
+                          sum(window.end_line - window.start_line + 1 for window in small_windows)),
+        "preprocess_lines": (lambda: len(WindowProcessor.preprocess_lines(lines)), len(lines)),
+        # 두 감지 방식 모두 코퍼스 라인 수 기준 처리량 (rescan은 오버랩 라인을 윈도우마다 다시 스캔)
+        "detect_rescan": (lambda: len([prompt_templates.detect_analysis_type(window.content) for window in windows]),
+                          len(lines)),
+        "detect_incremental": (lambda: detect_incremental(lines, windows), len(lines)),
+        "parse_strptime": (lambda: len(parse_lines_strptime(lines)), len(lines)),
+        # 타임스탬프 캐시가 반복 측정 사이에 남지 않도록 매번 새 파서 사용
+        "parse_lines": (lambda: len(LogParser().parse_lines(lines)[0]), len(lines)),
+    }
+    # 속도를 비교하기 전에 공용 파서가 기존 strptime 파서와 같은 결과를 내는지 확인
+    if "parse_lines" in benchmarks and LogParser().parse_lines(lines)[0] != parse_lines_strptime(lines):
+        raise ValueError("parse_lines 결과가 기존 strptime 파서 결과와 다름")
+
+    results = {}
+    for name in benchmarks:
+        func, processed_lines = cases[name]
+        measured = measure(func, repeat, memory)
+        seconds = measured["seconds"]
+        entry = {
+            "seconds": seconds,
+            "lines": processed_lines,
+            "lines_per_second": processed_lines / seconds if seconds else 0.0,
+            "peak_memory_bytes": measured["peak_memory_bytes"]
+        }
+        if name in ("token_counter", "create_windows"):
+            entry["tokens_per_second"] = total_tokens / seconds if seconds else 0.0
+        if name in ("create_windows", "merge_windows"):
+            entry["windows"] = measured["result"]
+        results[name] = entry
+        memory_text = f", 최대 메모리 {entry['peak_memory_bytes'] / 1024 / 1024:.1f}MB" \
+            if entry["peak_memory_bytes"] is not None else ""
+        print(f"   {name:<18} {seconds:>8.3f}s  {entry['lines_per_second']:>12,.0f} lines/s{memory_text}")
+    return {"lines": len(lines), "tokens": total_tokens, "windows": len(windows), "benchmarks": results}
+
+def compare_with_baseline(report: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """기준 결과 대비 회귀 목록 - 처리량이 (1 - tolerance)배 미만이거나 메모리가 (1 + tolerance)배 초과"""
+    regressions = []
+    for size, current in report["results"].items():
+        base_size = baseline.get("results", {}).get(size)
+        if not base_size:
+            continue
+        for name, entry in current["benchmarks"].items():
+            base = base_size["benchmarks"].get(name)
+            if not base:
+                continue
+            checks = [("lines_per_second", entry["lines_per_second"], base["lines_per_second"], False)]
+            if entry["peak_memory_bytes"] is not None and base.get("peak_memory_bytes"):
+                checks.append(("peak_memory_bytes", entry["peak_memory_bytes"], base["peak_memory_bytes"], True))
+            for metric, value, base_value, lower_is_better in checks:
+                ratio = value / base_value if base_value else 1.0
+                regressed = ratio > 1 + tolerance if lower_is_better else ratio < 1 - tolerance
+                if regressed:
+                    regressions.append({"size": size, "benchmark": name, "metric": metric,
+                                        "baseline": base_value, "current": value, "ratio": ratio})
+    return regressions
+
+def load_baseline(path: str) -> Optional[Dict]:
+    """기준 결과 JSON 로드"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ 기준 결과를 읽을 수 없음: {path} ({e})")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="슬라이딩 윈도우 CPU 벤치마크")
+    parser.add_argument("--sizes", nargs="+", default=["10k", "100k", "1M"],
+                        help="코퍼스 라인 수 (예: 10k 100k 1M 10M)")
+    parser.add_argument("--benchmarks", nargs="+", default=BENCHMARKS, choices=BENCHMARKS, help="실행할 벤치마크")
+    parser.add_argument("--window-tokens", type=int, default=5000, help="윈도우 토큰 수")
+    parser.add_argument("--overlap-ratio", type=float, default=0.15, help="오버랩 비율")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (최소 시간 사용)")
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 메모리 측정 생략")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="허용 회귀 비율 (0.10=10%%)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: window_benchmark_<시각>.json)")
+    args = parser.parse_args()
+
+    # 벤치마크 대상 코드만 측정하도록 단계별 시간 측정은 끔
+    get_pipeline_timer().enabled = False
+    config = WindowConfig(max_tokens=args.window_tokens, overlap_ratio=args.overlap_ratio)
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "window_config": {"max_tokens": config.max_tokens, "overlap_ratio": config.overlap_ratio},
+        "tokenizer": SlidingWindow(config).token_counter.tokenizer_type.value,
+        "repeat": args.repeat,
+        "results": {}
+    }
+
+    for size in args.sizes:
+        num_lines = parse_size(size)
+        print(f"\n📦 {num_lines:,}라인 코퍼스 생성 중...")
+        lines = build_corpus(num_lines)
+        print(f"🏃 벤치마크 ({num_lines:,}라인, 반복 {args.repeat}회)")
+        report["results"][str(num_lines)] = run_size(lines, config, args.repeat, not args.no_memory, args.benchmarks)
+        del lines
+        gc.collect()
+
+    output = args.output or f"window_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 벤치마크 결과 저장: {output}")
+
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        if baseline is None:
+            sys.exit(2)
+        if baseline.get("tokenizer") != report["tokenizer"]:
+            print(f"⚠️ 토크나이저가 다름 (기준 {baseline.get('tokenizer')}, 현재 {report['tokenizer']}) - 비교 결과 참고용")
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ 기준 대비 회귀 {len(regressions)}건 (허용 {args.tolerance * 100:.0f}%)")
+            for item in regressions:
+                print(f"   {item['size']}라인 {item['benchmark']} {item['metric']}: "
+                      f"{item['baseline']:,.0f} -> {item['current']:,.0f} ({item['ratio'] * 100:.0f}%)")
+            sys.exit(1)
+        print(f"✅ 기준 대비 회귀 없음 (허용 {args.tolerance * 100:.0f}%)")
+
+if __name__ == "__main__":
+    main()